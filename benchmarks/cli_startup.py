@@ -0,0 +1,57 @@
+"""Measure the startup time of the hidori CLI applications.
+
+Every invocation builds the argument parsers of the application, so the
+cost of imports and parser setup is paid even for --help. Run it from the
+repository root:
+
+    python3 benchmarks/cli_startup.py --runs 20
+"""
+import argparse
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_PATH = pathlib.Path(__file__).resolve().parent.parent / "src"
+
+INVOCATIONS = {
+    "hidori --help": ("hidori_cli.apps.hidori", ["--help"]),
+    "hidori --version": ("hidori_cli.apps.hidori", ["--version"]),
+    "hidori-pipeline --help": ("hidori_cli.apps.pipeline", ["--help"]),
+    "hidori-pipeline run --help": ("hidori_cli.apps.pipeline", ["run", "--help"]),
+}
+APP_CODE = "import sys; from {module} import main; sys.exit(main())"
+
+
+def measure(code: str, args: list[str], runs: int) -> float:
+    env = {**os.environ, "PYTHONPATH": str(SRC_PATH)}
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", code, *args],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{sys.implementation.cache_tag}, median of {args.runs} runs")
+    print(f"{'interpreter only':<28} {measure('pass', [], args.runs):8.1f} ms")
+    for name, (module, app_args) in INVOCATIONS.items():
+        timing = measure(APP_CODE.format(module=module), app_args, args.runs)
+        print(f"{name:<28} {timing:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Measure how long the remote executor needs to load each module.
+
+The executor runs in a fresh interpreter for every task, so the import
+time of hidori_core and of the requested module is paid on every step.
+Run it from the repository root with the interpreter of interest:
+
+    python3 benchmarks/executor_startup.py --runs 20
+"""
+import argparse
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_PATH = pathlib.Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_PATH))
+
+from hidori_core.modules.base import BUILTIN_MODULES  # noqa: E402
+
+BASELINE_CODE = "pass"
+MODULE_CODE = "from hidori_core.modules import get_module; get_module({name!r})"
+EAGER_CODE = "; ".join(f"import {path}" for path in BUILTIN_MODULES.values())
+
+
+def measure(code: str, runs: int) -> float:
+    env = {**os.environ, "PYTHONPATH": str(SRC_PATH)}
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{sys.implementation.cache_tag}, median of {args.runs} runs")
+    print(f"{'interpreter only':<20} {measure(BASELINE_CODE, args.runs):8.1f} ms")
+    for name in BUILTIN_MODULES:
+        timing = measure(MODULE_CODE.format(name=name), args.runs)
+        print(f"{name:<20} {timing:8.1f} ms")
+    print(f"{'all modules':<20} {measure(EAGER_CODE, args.runs):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
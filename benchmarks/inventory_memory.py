@@ -0,0 +1,65 @@
+"""Measure the controller memory used by large pipeline inventories.
+
+A pipeline with the given number of destinations is loaded and every
+pipeline of the group is created, the same way a run does it, while the
+peak of allocated memory is tracked. Run it from the repository root:
+
+    python3 benchmarks/inventory_memory.py --destinations 100000
+"""
+import argparse
+import itertools
+import pathlib
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "src"))
+
+from hidori_pipelines.group import DEFAULT_BATCH_SIZE, PipelineGroup  # noqa: E402
+from hidori_pipelines.plan import PipelinePlan  # noqa: E402
+
+
+def create_data(destinations: int) -> dict:
+    return {
+        "destinations": {
+            f"vm{i}": {
+                "target": f"10.{i // 65536}.{i // 256 % 256}.{i % 256}",
+                "user": "root",
+            }
+            for i in range(destinations)
+        },
+        "tasks": {
+            "Say hello": {"module": "hello"},
+            "Set hostname": {"module": "hostname", "name": "vm"},
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--destinations", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    data = create_data(args.destinations)
+    tracemalloc.start()
+    start = time.perf_counter()
+    plan = PipelinePlan.from_data(data)
+    del data
+    loaded, _ = tracemalloc.get_traced_memory()
+
+    group = PipelineGroup(plan, batch_size=args.batch_size)
+    created = 0
+    while batch := list(itertools.islice(group, args.batch_size)):
+        created += len(batch)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+
+    print(f"{created} pipelines, batches of {args.batch_size}")
+    print(f"{'loaded plan':<16} {loaded / 2**20:8.1f} MiB")
+    print(f"{'peak':<16} {peak / 2**20:8.1f} MiB")
+    print(f"{'elapsed':<16} {elapsed:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
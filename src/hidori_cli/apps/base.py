@@ -1,7 +1,7 @@
 import argparse
 import re
 
-from hidori_cli.commands import COMMAND_REGISTRY, Command
+from hidori_cli.commands import Command, load_commands
 from hidori_cli.commands.base import BASE_COMMAND_NAME, BaseData
 
 
@@ -14,7 +14,7 @@ class BaseCLIApplication:
         self._register_commands()
 
     def _register_commands(self) -> None:
-        command_classes = COMMAND_REGISTRY[self.name].values()
+        command_classes = load_commands(self.name).values()
         # Conditionally create subparsers for the application parser only
         # if there are any subcommands defined for this application.
         if any([obj.name != BASE_COMMAND_NAME for obj in command_classes]):
@@ -22,7 +22,7 @@ class BaseCLIApplication:
         else:
             subparsers = None
 
-        for command_cls in COMMAND_REGISTRY[self.name].values():
+        for command_cls in command_classes:
             if command_cls.name == BASE_COMMAND_NAME:
                 parser_obj = self.parser
             else:
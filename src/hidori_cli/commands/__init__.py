@@ -1,12 +1,63 @@
-from hidori_cli.commands.base import COMMAND_REGISTRY, Command
-from hidori_cli.commands.hidori import HidoriCommand
-from hidori_cli.commands.pipeline import PipelineCommand
-from hidori_cli.commands.pipeline_run import PipelineRunCommand
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from hidori_cli.commands.base import COMMAND_REGISTRY, Command, CommandError
+
+if TYPE_CHECKING:
+    from hidori_cli.commands.hidori import HidoriCommand
+    from hidori_cli.commands.pipeline import PipelineCommand
+    from hidori_cli.commands.pipeline_compile import PipelineCompileCommand
+    from hidori_cli.commands.pipeline_history import PipelineHistoryCommand
+    from hidori_cli.commands.pipeline_run import PipelineRunCommand
+    from hidori_cli.commands.pipeline_watch import PipelineWatchCommand
+
+# Commands are imported only for the application that is being run,
+# which keeps the startup of each CLI application to a minimum.
+COMMAND_MODULES: dict[str, list[str]] = {
+    "hidori-hidori": ["hidori_cli.commands.hidori"],
+    "hidori-pipeline": [
+        "hidori_cli.commands.pipeline",
+        "hidori_cli.commands.pipeline_compile",
+        "hidori_cli.commands.pipeline_history",
+        "hidori_cli.commands.pipeline_run",
+        "hidori_cli.commands.pipeline_watch",
+    ],
+}
+
+_LAZY_ATTRIBUTES = {
+    "HidoriCommand": "hidori_cli.commands.hidori",
+    "PipelineCommand": "hidori_cli.commands.pipeline",
+    "PipelineCompileCommand": "hidori_cli.commands.pipeline_compile",
+    "PipelineHistoryCommand": "hidori_cli.commands.pipeline_history",
+    "PipelineRunCommand": "hidori_cli.commands.pipeline_run",
+    "PipelineWatchCommand": "hidori_cli.commands.pipeline_watch",
+}
+
+
+def load_commands(app_name: str) -> dict[str, type[Command[Any]]]:
+    for module_path in COMMAND_MODULES.get(app_name, []):
+        importlib.import_module(module_path)
+
+    return COMMAND_REGISTRY[app_name]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
+    "COMMAND_MODULES",
     "COMMAND_REGISTRY",
     "Command",
+    "CommandError",
+    "load_commands",
     "HidoriCommand",
     "PipelineCommand",
+    "PipelineCompileCommand",
+    "PipelineHistoryCommand",
     "PipelineRunCommand",
+    "PipelineWatchCommand",
 ]
@@ -14,6 +14,12 @@ BASE_COMMAND_NAME = "base"
 COMMAND_REGISTRY: defaultdict[str, dict[str, type[Command[Any]]]] = defaultdict(dict)
 
 
+class CommandError(Exception):
+    # Invalid input found once the command runs, it is reported by the parser
+    # of the command along with its usage.
+    pass
+
+
 @dataclass
 class BaseData:
     subparser_name: str | None
@@ -40,6 +46,7 @@ class Command(Generic[TD]):
         COMMAND_REGISTRY[app_name][cmd_name] = cls
 
     def __init__(self, parser_obj: argparse.ArgumentParser) -> None:
+        self._parser = parser_obj
         for field_name, field in self.data_cls.__dataclass_fields__.items():
             if field_name == "subparser_name":
                 continue
@@ -55,7 +62,10 @@ class Command(Generic[TD]):
     def run(self, parser_data: dict[str, Any]) -> None:
         cmd_data = {k: parser_data.get(k) for k in self.data_cls.__dataclass_fields__}
         data_obj = self.data_cls(**cmd_data)
-        self.execute(data_obj)
+        try:
+            self.execute(data_obj)
+        except CommandError as error:
+            self._parser.error(str(error))
 
     def execute(self, data: TD) -> None:
         ...
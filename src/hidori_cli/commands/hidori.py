@@ -1,22 +1,40 @@
-import asyncio
-import uuid
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
-from hidori_cli.commands.base import BaseData, Command
-from hidori_common import ConsolePrinter
-from hidori_runner.drivers import create_driver
+from hidori_cli.commands.base import BaseData, Command, CommandError
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from hidori_common.journal import JournalRun
+    from hidori_runner.drivers.base import Driver, PreparedExchange
+
+DEFAULT_CONCURRENCY = 32
+OUTCOMES = ("success", "affected", "error")
 
 
 @dataclass
 class HidoriData(BaseData):
     destination: str = field(
-        metadata={"help": "user and target information, e.g. user@host"}
+        metadata={
+            "help": "user and target information, e.g. user@host, a comma "
+            "separated list, ranges like user@web[01:64] or @file with one "
+            "destination per line"
+        }
     )
     module: str = field(metadata={"help": "module to be executed"})
     extra_data: list[str] = field(metadata={"help": "module data if any"})
     version: bool = field(
         default=False, metadata={"help": "show the installed version and exit"}
     )
+    concurrency: int = field(
+        default=DEFAULT_CONCURRENCY,
+        metadata={
+            "help": "maximum number of destinations called at once, "
+            f"defaults to {DEFAULT_CONCURRENCY}",
+            "is_positional": False,
+        },
+    )
 
 
 class HidoriCommand(Command[HidoriData]):
@@ -25,24 +43,145 @@ class HidoriCommand(Command[HidoriData]):
     data_cls = HidoriData
 
     def execute(self, data: HidoriData) -> None:
+        # Dependencies of the command are imported only once it is executed
+        # to keep the startup fast for other commands and --help.
+        import asyncio
+
         asyncio.run(self._main(data))
 
     async def _main(self, data: HidoriData) -> None:
-        user, target = data.destination.split("@")
+        import asyncio
+        import uuid
 
-        printer = ConsolePrinter(user=user, target=target)
-        driver = create_driver({"user": user, "target": target})
+        from hidori_cli.destinations import parse_destinations
+        from hidori_common.journal import Journal
+        from hidori_runner.drivers import create_driver
+
+        try:
+            destinations = parse_destinations(data.destination)
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error)) from error
+
+        drivers = [
+            create_driver({"user": user, "target": target})
+            for user, target in destinations
+        ]
         extra_data = {}
         for entry in data.extra_data:
             name, value = entry.split("=")
             extra_data[name] = value
 
         task_id = uuid.uuid4().hex
-        exchange = driver.prepare_call(
-            task_id=task_id,
-            task_json={"name": "Call", "data": {"module": data.module, **extra_data}},
-        )
-        await driver.finalize(exchange)
-        await driver.invoke_executor(exchange, task_id)
-        printer.print_all(exchange.messages)
-        exchange.messages.clear()
+        task_json = {"name": "Call", "data": {"module": data.module, **extra_data}}
+        limit = asyncio.Semaphore(data.concurrency or DEFAULT_CONCURRENCY)
+        exchanges: list[PreparedExchange] = []
+        journal = Journal()
+        journal_run = journal.start_run("call", data.module)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for driver in drivers:
+                    tg.create_task(self._connect(driver, limit, journal_run))
+
+            # The call is prepared once for each interpreter found among
+            # the destinations and shared by all destinations that use it.
+            prepared: dict[str | None, PreparedExchange] = {}
+            for driver in drivers:
+                cache_tag = driver.python_cache_tag
+                if cache_tag not in prepared:
+                    prepared[cache_tag] = driver.prepare_call(task_id, task_json)
+                exchanges.append(driver.share_exchange(prepared[cache_tag]))
+
+            async with asyncio.TaskGroup() as tg:
+                for driver, exchange in zip(drivers, exchanges):
+                    tg.create_task(
+                        self._call(driver, exchange, task_id, limit, journal_run)
+                    )
+        finally:
+            async with asyncio.TaskGroup() as tg:
+                for driver in drivers:
+                    tg.create_task(driver.disconnect())
+            journal_run.finish()
+            journal.close()
+
+        self._print_results(drivers, exchanges)
+
+    async def _connect(
+        self, driver: "Driver", limit: "asyncio.Semaphore", journal_run: "JournalRun"
+    ) -> None:
+        import time
+
+        async with limit:
+            started_at, start = time.time(), time.monotonic()
+            await driver.connect()
+            journal_run.record(
+                user=driver.user,
+                host=driver.target,
+                phase="connect",
+                task=None,
+                counts={},
+                started_at=started_at,
+                duration=time.monotonic() - start,
+                status="error" if driver.handshake_time is None else None,
+            )
+
+    async def _call(
+        self,
+        driver: "Driver",
+        exchange: "PreparedExchange",
+        task_id: str,
+        limit: "asyncio.Semaphore",
+        journal_run: "JournalRun",
+    ) -> None:
+        import time
+
+        async with limit:
+            started_at, start = time.time(), time.monotonic()
+            await driver.finalize(exchange, task_id)
+            journal_run.record(
+                user=driver.user,
+                host=driver.target,
+                phase="push",
+                task=journal_run.name,
+                counts=exchange.messages.counts,
+                started_at=started_at,
+                duration=time.monotonic() - start,
+            )
+
+    def _print_results(
+        self, drivers: list["Driver"], exchanges: list["PreparedExchange"]
+    ) -> None:
+        from hidori_common import ConsolePrinter
+        from hidori_common.cli import COLOR_MAP, STATUS_MAP, Colors, Modifiers
+
+        grouped: dict[str, list[tuple[Driver, PreparedExchange]]] = {
+            outcome: [] for outcome in OUTCOMES
+        }
+        for driver, exchange in zip(drivers, exchanges):
+            grouped[get_outcome(exchange)].append((driver, exchange))
+
+        for outcome, results in grouped.items():
+            if not results:
+                continue
+
+            # A single destination is printed just like before fan-out.
+            if len(drivers) > 1:
+                color = COLOR_MAP[outcome]
+                print(
+                    f"{Modifiers.BOLD}{color}{STATUS_MAP[outcome]} "
+                    f"({len(results)}/{len(drivers)})"
+                    f"{Colors.RESET if color else ''}{Modifiers.RESET}"
+                )
+            for driver, exchange in results:
+                if exchange.messages:
+                    printer = ConsolePrinter(user=driver.user, target=driver.target)
+                    printer.print_all(exchange.messages)
+                    exchange.messages.clear()
+
+
+def get_outcome(exchange: "PreparedExchange") -> str:
+    if exchange.has_errors:
+        return "error"
+    elif exchange.messages.count("affected"):
+        return "affected"
+    else:
+        return "success"
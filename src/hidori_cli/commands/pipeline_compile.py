@@ -0,0 +1,35 @@
+import pathlib
+from dataclasses import dataclass, field
+
+from hidori_cli.commands.base import BaseData, Command
+
+
+@dataclass
+class PipelineCompileData(BaseData):
+    pipeline_path: pathlib.Path = field(
+        metadata={"help": "Path to the TOML pipeline file"}
+    )
+    output: str = field(
+        metadata={
+            "help": "Path to the compiled plan, defaults to the pipeline path "
+            "with .plan suffix",
+            "is_positional": False,
+        }
+    )
+
+
+class PipelineCompileCommand(Command[PipelineCompileData]):
+    """pipeline-compile command"""
+
+    data_cls = PipelineCompileData
+
+    def execute(self, data: PipelineCompileData) -> None:
+        from hidori_pipelines.plan import PipelinePlan
+
+        plan = PipelinePlan.from_toml_path(data.pipeline_path)
+        output_path = (
+            pathlib.Path(data.output)
+            if data.output
+            else data.pipeline_path.with_suffix(".plan")
+        )
+        plan.dump(output_path)
@@ -0,0 +1,78 @@
+from dataclasses import dataclass, field
+
+from hidori_cli.commands.base import BaseData, Command, CommandError
+
+DEFAULT_LIMIT = 20
+SINCE_UNITS = {"m": 60, "h": 60 * 60, "d": 24 * 60 * 60, "w": 7 * 24 * 60 * 60}
+
+
+@dataclass
+class PipelineHistoryData(BaseData):
+    since: str = field(
+        metadata={
+            "help": "only runs within the given time, e.g. 30m, 12h, 7d or 2w",
+            "is_positional": False,
+        }
+    )
+    host: str = field(metadata={"help": "only the given host", "is_positional": False})
+    task: str = field(metadata={"help": "only the given task", "is_positional": False})
+    status: str = field(
+        metadata={
+            "help": "only results with the given status, i.e. success, "
+            "affected or error",
+            "is_positional": False,
+        }
+    )
+    slowest: bool = field(
+        metadata={"help": "order hosts by their average duration of a run"}
+    )
+    limit: int = field(
+        metadata={
+            "help": f"maximum number of hosts, defaults to {DEFAULT_LIMIT}",
+            "is_positional": False,
+        }
+    )
+
+
+class PipelineHistoryCommand(Command[PipelineHistoryData]):
+    """pipeline-history command"""
+
+    data_cls = PipelineHistoryData
+
+    def execute(self, data: PipelineHistoryData) -> None:
+        import datetime
+        import time
+
+        from hidori_common.journal import Journal
+
+        since = time.time() - parse_since(data.since) if data.since else None
+        journal = Journal()
+        try:
+            summaries = journal.query_hosts(
+                since=since,
+                host=data.host,
+                task=data.task,
+                status=data.status,
+                slowest=data.slowest,
+                limit=data.limit or DEFAULT_LIMIT,
+            )
+        finally:
+            journal.close()
+
+        print(
+            f"{'DESTINATION':<32} {'RUNS':>6} {'ERRORS':>6} {'AVG RUN':>10}  LAST SEEN"
+        )
+        for summary in summaries:
+            last_seen = datetime.datetime.fromtimestamp(summary.last_seen)
+            print(
+                f"{summary.user + '@' + summary.host:<32} {summary.runs:>6} "
+                f"{summary.errors:>6} {summary.duration:>9.2f}s  "
+                f"{last_seen:%b %d %H:%M:%S}"
+            )
+
+
+def parse_since(value: str) -> int:
+    unit = SINCE_UNITS.get(value[-1:])
+    if unit is None or not value[:-1].isdigit():
+        raise CommandError(f"{value} is not a valid time, expected e.g. 30m, 12h or 7d")
+    return int(value[:-1]) * unit
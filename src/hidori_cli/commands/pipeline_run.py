@@ -1,15 +1,20 @@
-import asyncio
 import pathlib
 from dataclasses import dataclass, field
 
 from hidori_cli.commands.base import BaseData, Command
-from hidori_pipelines import PipelineGroup
 
 
 @dataclass
 class PipelineRunData(BaseData):
     pipeline_path: pathlib.Path = field(
-        metadata={"help": "Path to the TOML pipeline file"}
+        metadata={"help": "Path to the TOML pipeline file or compiled plan"}
+    )
+    workers: int = field(
+        metadata={
+            "help": "number of worker processes the destinations are sharded "
+            "across, runs in a single process by default",
+            "is_positional": False,
+        }
     )
 
 
@@ -19,5 +24,31 @@ class PipelineRunCommand(Command[PipelineRunData]):
     data_cls = PipelineRunData
 
     def execute(self, data: PipelineRunData) -> None:
-        group = PipelineGroup.from_toml_path(str(data.pipeline_path))
-        asyncio.run(group.run())
+        import asyncio
+
+        from hidori_common.journal import Journal
+        from hidori_pipelines import PipelineGroup
+        from hidori_pipelines.plan import PipelinePlan
+        from hidori_pipelines.workers import run_workers
+
+        plan = PipelinePlan.from_path(data.pipeline_path)
+        journal = Journal()
+        journal_run = journal.start_run("pipeline", str(data.pipeline_path))
+        try:
+            if (data.workers and data.workers > 1) or plan.relays:
+                summary = asyncio.run(run_workers(plan, data.workers or 1, journal_run))
+            else:
+                group = PipelineGroup(plan, journal_run=journal_run)
+                asyncio.run(group.run())
+                summary = group.abort_summary
+        finally:
+            journal_run.finish()
+            journal.close()
+
+        if summary is not None:
+            print(
+                f"Pipeline aborted, {len(summary.interrupted)} destinations were "
+                f"interrupted and {len(summary.completed)} completed their step"
+            )
+            if summary.interrupted:
+                print(f"Interrupted: {', '.join(summary.interrupted)}")
@@ -0,0 +1,65 @@
+import pathlib
+from dataclasses import dataclass, field
+
+from hidori_cli.commands.base import BaseData, Command, CommandError
+
+DEFAULT_INTERVAL = 300
+
+
+@dataclass
+class PipelineWatchData(BaseData):
+    pipeline_path: pathlib.Path = field(
+        metadata={"help": "Path to the TOML pipeline file or compiled plan"}
+    )
+    interval: int = field(
+        metadata={
+            "help": "seconds between runs of the pipeline, "
+            f"defaults to {DEFAULT_INTERVAL}",
+            "is_positional": False,
+        }
+    )
+    iterations: int = field(
+        metadata={
+            "help": "number of runs before exit, runs until interrupted by default",
+            "is_positional": False,
+        }
+    )
+
+
+class PipelineWatchCommand(Command[PipelineWatchData]):
+    """pipeline-watch command"""
+
+    data_cls = PipelineWatchData
+
+    def execute(self, data: PipelineWatchData) -> None:
+        import asyncio
+        import functools
+
+        from hidori_common.journal import Journal
+        from hidori_pipelines import PipelineGroup
+        from hidori_pipelines.plan import PipelinePlan
+
+        plan = PipelinePlan.from_path(data.pipeline_path)
+        # Destinations behind relays are only reachable through their relay,
+        # which runs them once per run of its worker.
+        if plan.relays:
+            raise CommandError(
+                "pipelines with relays can't be watched, use hidori-pipeline run"
+            )
+
+        journal = Journal()
+        group = PipelineGroup(plan)
+        try:
+            asyncio.run(
+                group.watch(
+                    data.interval or DEFAULT_INTERVAL,
+                    data.iterations,
+                    functools.partial(
+                        journal.start_run, "watch", str(data.pipeline_path)
+                    ),
+                )
+            )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            journal.close()
@@ -0,0 +1,56 @@
+import pathlib
+import re
+
+RANGE_PATTERN = re.compile(r"\[(\d+):(\d+)\]")
+
+
+def parse_destinations(spec: str) -> list[tuple[str, str]]:
+    # Destinations are comma separated user@target entries, where targets may
+    # contain ranges like web[01:64], and @path refers to a file that lists
+    # one destination per line.
+    entries: list[str] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if part.startswith("@"):
+            entries.extend(read_destinations_file(pathlib.Path(part[1:])))
+        elif part:
+            entries.extend(expand_ranges(part))
+
+    destinations: dict[tuple[str, str], None] = {}
+    for entry in entries:
+        user, _, target = entry.rpartition("@")
+        if not user or not target:
+            raise ValueError(f"{entry} is not a valid destination, expected user@host")
+        destinations[(user, target)] = None
+
+    if not destinations:
+        raise ValueError("no destinations provided")
+    return list(destinations)
+
+
+def read_destinations_file(path: pathlib.Path) -> list[str]:
+    entries: list[str] = []
+    for line in path.read_text().splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            entries.extend(expand_ranges(line))
+    return entries
+
+
+def expand_ranges(entry: str) -> list[str]:
+    match = RANGE_PATTERN.search(entry)
+    if match is None:
+        return [entry]
+
+    start, end = match.group(1), match.group(2)
+    if int(start) > int(end):
+        raise ValueError(f"{match.group(0)} is not a valid range in {entry}")
+
+    # Leading zeros of the range start determine the width of the numbers.
+    width = len(start) if start.startswith("0") else 0
+    prefix, _, suffix = entry.partition(match.group(0))
+    return [
+        expanded
+        for number in range(int(start), int(end) + 1)
+        for expanded in expand_ranges(f"{prefix}{number:0{width}d}{suffix}")
+    ]
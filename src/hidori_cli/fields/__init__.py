@@ -6,6 +6,7 @@ from hidori_cli.fields.base import (
 from hidori_cli.fields.boolean import BooleanField
 from hidori_cli.fields.extra_data import ExtraDataField
 from hidori_cli.fields.filepath import FilePathField
+from hidori_cli.fields.integer import IntegerField
 from hidori_cli.fields.text import TextField
 from hidori_cli.fields.version import VersionField
 
@@ -16,6 +17,7 @@ __all__ = [
     "BooleanField",
     "ExtraDataField",
     "FilePathField",
+    "IntegerField",
     "TextField",
     "VersionField",
 ]
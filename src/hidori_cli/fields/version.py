@@ -1,10 +1,33 @@
 import argparse
-from typing import Any, Mapping
+from typing import Any, Mapping, Sequence
 
 from hidori_cli.fields.base import Field
 from hidori_common.cli import get_version
 
 
+class VersionAction(argparse.Action):
+    # Unlike the builtin version action, the installed version is only
+    # looked up when it is requested rather than whenever a parser is built.
+    def __init__(self, option_strings: Sequence[str], dest: str, **kwargs: Any):
+        super().__init__(
+            option_strings,
+            dest=argparse.SUPPRESS,
+            default=argparse.SUPPRESS,
+            nargs=0,
+            **kwargs,
+        )
+
+    def __call__(
+        self,
+        parser: argparse.ArgumentParser,
+        namespace: argparse.Namespace,
+        values: str | Sequence[Any] | None,
+        option_string: str | None = None,
+    ) -> None:
+        print(f"{parser.prog} {get_version()}")
+        parser.exit()
+
+
 class VersionField(Field, field_name="version"):
     @classmethod
     def add_to_parser(
@@ -16,7 +39,6 @@ class VersionField(Field, field_name="version"):
         parser_obj.add_argument(
             "-V",
             "--version",
-            action="version",
-            version=f"%(prog)s {get_version()}",
+            action=VersionAction,
             **cls.prepare_kwargs(field_metadata),
         )
@@ -1,5 +1,8 @@
 import datetime
-import importlib.metadata
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from hidori_core.utils import Message
 
 
 class Colors:
@@ -30,6 +33,9 @@ STATUS_MAP = {
 
 
 def get_version() -> str:
+    # importlib.metadata is slow to import and only needed for --version.
+    import importlib.metadata
+
     return importlib.metadata.version("hidori")
 
 
@@ -38,15 +44,16 @@ class ConsolePrinter:
         self.user = user
         self.target = target
 
-    def print_one(self, data: dict[str, str]) -> None:
-        self._print_header(data["task"])
-        self._print_entry(data["type"], data["message"])
+    def print_one(self, data: "Message") -> None:
+        self._print_header(data.task)
+        self._print_entry(data.type, data.message)
 
-    def print_all(self, data: list[dict[str, str]]) -> None:
+    def print_all(self, data: Iterable["Message"]) -> None:
         # TODO: Isn't it too naive?
-        self._print_header(data[0]["task"])
-        for entry_data in data:
-            self._print_entry(entry_data["type"], entry_data["message"])
+        for index, entry_data in enumerate(data):
+            if not index:
+                self._print_header(entry_data.task)
+            self._print_entry(entry_data.type, entry_data.message)
 
     def print_summary(self) -> None:
         print()
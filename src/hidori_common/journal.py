@@ -0,0 +1,196 @@
+import pathlib
+import sqlite3
+import time
+import uuid
+from typing import Mapping, NamedTuple
+
+from hidori_common.dirs import get_cache_home
+
+# Journal is append-only, runs are inserted once they are over and results
+# of each phase of a destination as soon as they are known. The host and time
+# indexes both cover aggregations per host, so queries for a host or a time
+# range are answered from a range of the index alone.
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    user TEXT NOT NULL,
+    host TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    task TEXT,
+    status TEXT NOT NULL,
+    successes INTEGER NOT NULL,
+    affected INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_host_idx
+    ON results (host, user, started_at, run_id, duration, status);
+CREATE INDEX IF NOT EXISTS results_time_idx
+    ON results (started_at, host, user, run_id, duration, status);
+CREATE INDEX IF NOT EXISTS results_task_idx ON results (task, status, started_at);
+"""
+
+FLUSH_THRESHOLD = 1000
+
+
+def get_journal_path() -> pathlib.Path:
+    return get_cache_home() / "journal.sqlite3"
+
+
+def get_status(counts: Mapping[str, int]) -> str:
+    if counts.get("error"):
+        return "error"
+    elif counts.get("affected"):
+        return "affected"
+    else:
+        return "success"
+
+
+class HostSummary(NamedTuple):
+    user: str
+    host: str
+    runs: int
+    errors: int
+    duration: float
+    last_seen: float
+
+
+class Journal:
+    def __init__(self, path: pathlib.Path | None = None) -> None:
+        path = path or get_journal_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(JOURNAL_SCHEMA)
+        self._pending: list[tuple[object, ...]] = []
+
+    def start_run(self, kind: str, name: str) -> "JournalRun":
+        return JournalRun(self, kind, name)
+
+    def add_result(self, result: tuple[object, ...]) -> None:
+        # Results are written in batches, so journaling of large inventories
+        # doesn't cost a transaction per destination.
+        self._pending.append(result)
+        if len(self._pending) >= FLUSH_THRESHOLD:
+            self.flush()
+
+    def add_run(self, run: "JournalRun", duration: float) -> None:
+        self.flush()
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?)",
+                (run.id, run.kind, run.name, run.started_at, duration),
+            )
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+        self._pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
+
+    def query_hosts(
+        self,
+        *,
+        since: float | None = None,
+        host: str | None = None,
+        task: str | None = None,
+        status: str | None = None,
+        slowest: bool = False,
+        limit: int = 20,
+    ) -> list[HostSummary]:
+        query, params = get_hosts_query(since, host, task, status, slowest)
+        rows = self._connection.execute(query, [*params, limit])
+        return [HostSummary(*row) for row in rows]
+
+
+def get_hosts_query(
+    since: float | None,
+    host: str | None,
+    task: str | None,
+    status: str | None,
+    slowest: bool,
+) -> tuple[str, list[str | float]]:
+    conditions, params = [], []
+    for column, operator, value in [
+        ("started_at", ">=", since),
+        ("host", "=", host),
+        ("task", "=", task),
+        ("status", "=", status),
+    ]:
+        if value is not None:
+            conditions.append(f"{column} {operator} ?")
+            params.append(value)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # Without statistics, SQLite prefers a full scan of the host index, whose
+    # order matches the grouping, over a range of the time index.
+    indexed_by = ""
+    if since is not None and host is None and task is None:
+        indexed_by = "INDEXED BY results_time_idx "
+    # Slowest hosts are ordered by their average duration of a run.
+    order = "SUM(duration) / COUNT(DISTINCT run_id)" if slowest else "MAX(started_at)"
+    query = (
+        "SELECT user, host, COUNT(DISTINCT run_id), "
+        "SUM(status = 'error'), SUM(duration) / COUNT(DISTINCT run_id), "
+        f"MAX(started_at) FROM results {indexed_by}{where} "
+        f"GROUP BY host, user ORDER BY {order} DESC LIMIT ?"
+    )
+    return query, params
+
+
+class JournalRun:
+    def __init__(self, journal: Journal, kind: str, name: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.name = name
+        self.started_at = time.time()
+        self._journal = journal
+        self._started = time.monotonic()
+
+    def record(
+        self,
+        *,
+        user: str,
+        host: str,
+        phase: str,
+        task: str | None,
+        counts: Mapping[str, int],
+        started_at: float,
+        duration: float,
+        status: str | None = None,
+    ) -> None:
+        self._journal.add_result(
+            (
+                self.id,
+                user,
+                host,
+                phase,
+                task,
+                status or get_status(counts),
+                counts.get("success", 0),
+                counts.get("affected", 0),
+                counts.get("error", 0),
+                started_at,
+                duration,
+            )
+        )
+
+    def finish(self) -> None:
+        self._journal.add_run(self, time.monotonic() - self._started)
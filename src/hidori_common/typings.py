@@ -1,9 +1,16 @@
 import pathlib
-from typing import Any, ClassVar, Iterable, Protocol, TypeVar
+from typing import Any, ClassVar, Iterable, Mapping, NamedTuple, Protocol, TypeVar
+
+from hidori_core.utils import Message
 
 DT = TypeVar("DT", bound="Driver")
 
 
+class Connection(NamedTuple):
+    handshake_time: float
+    python_cache_tag: str | None
+
+
 class PipelineStep(Protocol):
     @property
     def task_id(self) -> str:
@@ -13,6 +20,10 @@ class PipelineStep(Protocol):
     def task_json(self) -> dict[str, Any]:
         ...
 
+    @property
+    def task_bytes(self) -> bytes:
+        ...
+
 
 class Pipeline(Protocol):
     @property
@@ -33,6 +44,25 @@ class Driver(Protocol):
     ...
 
 
+class JournalRun(Protocol):
+    def record(
+        self,
+        *,
+        user: str,
+        host: str,
+        phase: str,
+        task: str | None,
+        counts: Mapping[str, int],
+        started_at: float,
+        duration: float,
+        status: str | None = None,
+    ) -> None:
+        ...
+
+    def finish(self) -> None:
+        ...
+
+
 class Transport(Protocol[DT]):
     # TODO: Add pre-flight env detection and verification
     _driver: DT
@@ -44,12 +74,34 @@ class Transport(Protocol[DT]):
     def __init__(self, driver: DT) -> None:
         self._driver = driver
 
-    async def push(
-        self, exchange_id: str, source: pathlib.Path
-    ) -> list[dict[str, str]]:
+    async def connect(self) -> Connection | None:
+        ...
+
+    async def disconnect(self) -> None:
+        ...
+
+    async def push(self, exchange_id: str, source: pathlib.Path) -> list[Message]:
         ...
 
     async def invoke(
         self, exchange_id: str, path: str, args: str
-    ) -> list[dict[str, str]]:
+    ) -> tuple[bool, list[Message]]:
+        ...
+
+    async def push_and_invoke(
+        self, exchange_id: str, source: pathlib.Path, path: str, args: str
+    ) -> tuple[bool, list[Message]]:
+        ...
+
+    async def get_file_signature(
+        self, exchange_id: str, path: str, digest: str
+    ) -> tuple[dict[str, Any] | None, list[Message]]:
+        ...
+
+    async def push_file(
+        self, exchange_id: str, source: pathlib.Path, path: str
+    ) -> list[Message]:
+        ...
+
+    def get_remote_command(self, exchange_id: str, command: str) -> str:
         ...
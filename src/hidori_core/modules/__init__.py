@@ -1,14 +1,38 @@
-from hidori_core.modules.apt import AptModule
-from hidori_core.modules.base import MODULES_REGISTRY
-from hidori_core.modules.dnf import DnfModule
-from hidori_core.modules.hello import HelloModule
-from hidori_core.modules.hostname import HostnameModule
-from hidori_core.modules.wait import WaitModule
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from hidori_core.modules.base import BUILTIN_MODULES, get_module
+
+if TYPE_CHECKING:
+    from hidori_core.modules.apt import AptModule
+    from hidori_core.modules.command import CommandModule
+    from hidori_core.modules.dnf import DnfModule
+    from hidori_core.modules.file import FileModule
+    from hidori_core.modules.hello import HelloModule
+    from hidori_core.modules.hostname import HostnameModule
+    from hidori_core.modules.wait import WaitModule
+
+# Classes of built-in modules are named after them, so they're exported
+# lazily from the same mapping that get_module imports them from.
+_LAZY_ATTRIBUTES = {
+    f"{name.capitalize()}Module": path for name, path in BUILTIN_MODULES.items()
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
-    "MODULES_REGISTRY",
+    "BUILTIN_MODULES",
+    "get_module",
     "AptModule",
+    "CommandModule",
     "DnfModule",
+    "FileModule",
     "HelloModule",
     "HostnameModule",
     "WaitModule",
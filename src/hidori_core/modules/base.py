@@ -1,4 +1,5 @@
-from typing import Any, Dict, Type
+import importlib
+from typing import Any, Dict, Optional, Type
 
 from hidori_core.schema import errors as schema_errors
 from hidori_core.schema.base import Schema
@@ -6,6 +7,25 @@ from hidori_core.utils.messenger import Messenger
 
 MODULES_REGISTRY: Dict[str, "Module"] = {}
 
+# Built-in modules are only imported when requested, so that running a task
+# does not pay for importing every other module and its system libraries.
+BUILTIN_MODULES: Dict[str, str] = {
+    "apt": "hidori_core.modules.apt",
+    "command": "hidori_core.modules.command",
+    "dnf": "hidori_core.modules.dnf",
+    "file": "hidori_core.modules.file",
+    "hello": "hidori_core.modules.hello",
+    "hostname": "hidori_core.modules.hostname",
+    "wait": "hidori_core.modules.wait",
+}
+
+
+def get_module(name: str) -> Optional["Module"]:
+    if name not in MODULES_REGISTRY and name in BUILTIN_MODULES:
+        importlib.import_module(BUILTIN_MODULES[name])
+
+    return MODULES_REGISTRY.get(name)
+
 
 class Module:
     def __init_subclass__(cls, *, name: str, schema_cls: Type[Schema]) -> None:
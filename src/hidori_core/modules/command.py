@@ -0,0 +1,217 @@
+import collections
+import os
+import selectors
+import signal
+import subprocess
+import time
+from typing import IO, Any, Deque, Dict, List, Optional
+
+from hidori_core.modules.base import Module
+from hidori_core.schema import Schema
+from hidori_core.utils import Messenger
+
+# Output above the limit is dropped from its middle, the head is streamed as
+# it comes and only the tail is kept until the command exits.
+DEFAULT_OUTPUT_LIMIT = 64 * 1024
+
+# Lines longer than this are split, so a command that never prints a newline
+# doesn't hold its whole output in a single line.
+LINE_LIMIT = 4096
+READ_SIZE = 64 * 1024
+
+# Commands that are timed out are killed if they don't exit in time after
+# SIGTERM.
+TERMINATE_TIMEOUT = 5.0
+
+
+class CommandSchema(Schema):
+    command: str
+    creates: Optional[str]
+    removes: Optional[str]
+    timeout: Optional[str]
+    output_limit: Optional[str]
+
+
+class CommandTimeout(Exception):
+    pass
+
+
+class OutputCapture:
+    def __init__(self, messenger: Messenger, limit: int) -> None:
+        self._messenger = messenger
+        self._head_left = limit // 2
+        self._tail_limit = limit - limit // 2
+        self._tail: Deque[str] = collections.deque()
+        self._tail_size = 0
+        self._omitted = 0
+
+    def add(self, line: str) -> None:
+        # Lines are charged along with their newline, so output of empty
+        # lines is capped as well.
+        if self._head_left > 0:
+            self._head_left -= len(line) + 1
+            self._messenger.queue_info(line)
+            return
+
+        self._tail.append(line)
+        self._tail_size += len(line) + 1
+        while self._tail_size > self._tail_limit:
+            dropped = self._tail.popleft()
+            self._tail_size -= len(dropped) + 1
+            self._omitted += len(dropped) + 1
+
+    def finish(self) -> None:
+        if self._omitted:
+            self._messenger.queue_info(f"... {self._omitted} characters omitted ...")
+        for line in self._tail:
+            self._messenger.queue_info(line)
+        self._tail.clear()
+
+
+class LineReader:
+    def __init__(self, capture: OutputCapture, prefix: str) -> None:
+        self._capture = capture
+        self._prefix = prefix
+        self._buffer = b""
+
+    def feed(self, chunk: bytes) -> None:
+        self._buffer += chunk
+        lines = self._buffer.split(b"\n")
+        self._buffer = lines.pop()
+        while len(self._buffer) >= LINE_LIMIT:
+            lines.append(self._buffer[:LINE_LIMIT])
+            self._buffer = self._buffer[LINE_LIMIT:]
+        for line in lines:
+            self._capture.add(self._prefix + line.decode(errors="replace"))
+
+    def close(self) -> None:
+        if self._buffer:
+            self._capture.add(self._prefix + self._buffer.decode(errors="replace"))
+            self._buffer = b""
+
+
+def terminate(process: "subprocess.Popen[bytes]") -> None:
+    # Command runs in a session of its own, so processes it started are
+    # terminated along with it.
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            process.wait(TERMINATE_TIMEOUT)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def get_remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise CommandTimeout()
+    return remaining
+
+
+def run_command(
+    command: str,
+    messenger: Messenger,
+    capture: OutputCapture,
+    timeout: Optional[int],
+) -> int:
+    deadline = None if timeout is None else time.monotonic() + timeout
+    process = subprocess.Popen(
+        command,
+        shell=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    streams: List[IO[bytes]] = []
+    try:
+        with selectors.DefaultSelector() as selector:
+            for stream, prefix in ((process.stdout, ""), (process.stderr, "stderr: ")):
+                assert stream
+                streams.append(stream)
+                selector.register(
+                    stream, selectors.EVENT_READ, LineReader(capture, prefix)
+                )
+
+            # Lines are flushed as soon as they're read, so the output of
+            # long running commands is streamed rather than held until exit.
+            while selector.get_map():
+                for key, _ in selector.select(get_remaining(deadline)):
+                    chunk = os.read(key.fd, READ_SIZE)
+                    if chunk:
+                        key.data.feed(chunk)
+                    else:
+                        key.data.close()
+                        selector.unregister(key.fileobj)
+                messenger.flush()
+
+        try:
+            return process.wait(get_remaining(deadline))
+        except subprocess.TimeoutExpired:
+            raise CommandTimeout()
+    except BaseException:
+        terminate(process)
+        raise
+    finally:
+        for stream in streams:
+            stream.close()
+
+
+def parse_limit(validated_data: Dict[str, Any], name: str) -> Optional[int]:
+    value = validated_data.get(name)
+    if value is None:
+        return None
+
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if limit <= 0:
+        raise ValueError(f"{name} must be a positive integer")
+    return limit
+
+
+class CommandModule(Module, name="command", schema_cls=CommandSchema):
+    def execute(self, validated_data: Dict[str, Any], messenger: Messenger) -> None:
+        # Guards are checked before anything is started, so commands that
+        # were already run cost a single stat.
+        creates = validated_data.get("creates")
+        if creates is not None and os.path.exists(creates):
+            messenger.queue_success(f"skipped, {creates} exists")
+            return
+
+        removes = validated_data.get("removes")
+        if removes is not None and not os.path.exists(removes):
+            messenger.queue_success(f"skipped, {removes} does not exist")
+            return
+
+        try:
+            timeout = parse_limit(validated_data, "timeout")
+            output_limit = parse_limit(validated_data, "output_limit")
+        except ValueError as e:
+            messenger.queue_error(str(e))
+            return
+
+        capture = OutputCapture(messenger, output_limit or DEFAULT_OUTPUT_LIMIT)
+        try:
+            returncode = run_command(
+                validated_data["command"], messenger, capture, timeout
+            )
+        except CommandTimeout:
+            capture.finish()
+            messenger.queue_error(f"command timed out after {timeout} seconds")
+            return
+
+        capture.finish()
+        if returncode != 0:
+            messenger.queue_error(f"command exited with code {returncode}")
+            return
+
+        messenger.queue_affected("command has been run")
@@ -0,0 +1,122 @@
+import contextlib
+import os
+import pathlib
+import stat
+import tempfile
+from typing import IO, Any, Dict, Optional
+
+from hidori_core.modules.base import Module
+from hidori_core.schema import Schema
+from hidori_core.utils import Messenger
+from hidori_core.utils.delta import (
+    DeltaError,
+    apply_delta,
+    get_cached_digest,
+    get_delta_path,
+    get_file_digest,
+    read_delta_header,
+    store_digest,
+)
+
+
+class FileSchema(Schema):
+    path: str
+    source: str
+    mode: Optional[str]
+
+
+def get_default_mode() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def set_mode(path: pathlib.Path, mode: Optional[int]) -> bool:
+    if mode is None or stat.S_IMODE(path.stat().st_mode) == mode:
+        return False
+
+    os.chmod(path, mode)
+    return True
+
+
+def write_file(
+    path: pathlib.Path, delta: IO[bytes], header: Dict[str, Any], mode: Optional[int]
+) -> int:
+    # Content is written to a temporary file next to the target, which
+    # replaces it only once complete, so the target is never seen partially.
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    temp_path = pathlib.Path(temp_name)
+    try:
+        with os.fdopen(fd, "wb") as output:
+            with contextlib.ExitStack() as stack:
+                base = None
+                if header["base"] is not None:
+                    base = stack.enter_context(open(path, "rb"))
+                sent = apply_delta(base, delta, output, header["block_size"])
+            output.flush()
+            os.fsync(output.fileno())
+
+        if get_file_digest(temp_path) != header["digest"]:
+            raise DeltaError(f"content of {path} does not match the source")
+
+        if header["base"] is None:
+            os.chmod(temp_path, get_default_mode() if mode is None else mode)
+        else:
+            path_stat = path.stat()
+            os.chmod(temp_path, stat.S_IMODE(path_stat.st_mode))
+            with contextlib.suppress(PermissionError):
+                os.chown(temp_path, path_stat.st_uid, path_stat.st_gid)
+            set_mode(temp_path, mode)
+
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink()
+        raise
+
+    store_digest(path, path.stat(), header["digest"])
+    return sent
+
+
+class FileModule(Module, name="file", schema_cls=FileSchema):
+    def execute(self, validated_data: Dict[str, Any], messenger: Messenger) -> None:
+        path = pathlib.Path(validated_data["path"])
+        mode = None
+        if validated_data.get("mode") is not None:
+            try:
+                mode = int(validated_data["mode"], 8)
+            except ValueError:
+                messenger.queue_error(f"mode {validated_data['mode']} is not octal")
+                return
+
+        if not path.parent.is_dir():
+            messenger.queue_error(f"directory of {path} does not exist")
+            return
+
+        # Delta against the current content was pushed by the controller
+        # right before the task, or left empty by the destination when the
+        # file already had the content, see hidori_pipelines.files.
+        delta_path = get_delta_path(str(path))
+        if not delta_path.exists():
+            messenger.queue_error(f"content of {path} was not pushed")
+            return
+
+        with open(delta_path, "rb") as delta:
+            try:
+                header = read_delta_header(delta)
+                base = get_cached_digest(path)
+                if base != header["base"]:
+                    raise DeltaError(f"{path} was changed since its content was pushed")
+
+                if base == header["digest"]:
+                    if set_mode(path, mode):
+                        messenger.queue_affected(f"mode of {path} has been changed")
+                    else:
+                        messenger.queue_success(f"{path} is up to date")
+                    return
+
+                sent = write_file(path, delta, header, mode)
+            except DeltaError as e:
+                messenger.queue_error(str(e))
+                return
+
+        messenger.queue_affected(f"{path} has been updated, {sent} bytes sent")
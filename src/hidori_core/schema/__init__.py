@@ -1,4 +1,11 @@
-from hidori_core.schema.base import Schema
+from hidori_core.schema.base import Schema, ValidationResult
 from hidori_core.schema.fields import Dictionary, OneOf, SubSchema, Text
 
-__all__ = ["Dictionary", "Schema", "Text", "OneOf", "SubSchema"]
+__all__ = [
+    "Dictionary",
+    "Schema",
+    "Text",
+    "OneOf",
+    "SubSchema",
+    "ValidationResult",
+]
@@ -1,5 +1,19 @@
 import abc
-from typing import Any, Callable, Dict, List, Optional, Type, TypeVar, Union, get_origin
+import copy
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_origin,
+)
 
 try:
     from types import UnionType
@@ -31,6 +45,14 @@ class Field(abc.ABC):
     ) -> Optional[TField]:
         raise NotImplementedError()
 
+    def with_required(self: TField, required: bool) -> TField:
+        if self.required is required:
+            return self
+
+        field = copy.copy(self)
+        field.required = required
+        return field
+
     def validate(self, value: Any) -> Any:
         if self.required and value is _sentinel:
             raise schema_errors.ValidationError("value for required field not provided")
@@ -45,15 +67,17 @@ class SchemaModifier(abc.ABC):
     def process_schema(self, annotations: Dict[str, Any]) -> None:
         raise NotImplementedError()
 
-    def apply(self, schema: "Schema", data: Dict[str, Any]) -> None:
+    def apply(self, fields: Dict[str, Field], data: Dict[str, Any]) -> None:
         for condition in self.data_conditions:
             if not condition(data):
                 return
 
-        self.apply_to_schema(schema, data)
+        self.apply_to_fields(fields, data)
 
     @abc.abstractmethod
-    def apply_to_schema(self, schema: "Schema", data: Dict[str, Any]) -> None:
+    def apply_to_fields(self, fields: Dict[str, Field], data: Dict[str, Any]) -> None:
+        # Fields are shared by every validation of the schema, so modifiers
+        # must replace the entries of the given mapping rather than mutate them.
         raise NotImplementedError()
 
 
@@ -98,10 +122,10 @@ class Definition:
             except schema_errors.ModifierError as e:
                 self._errors.append(str(e))
 
-    def apply_modifiers(self, schema: "Schema", data: Dict[str, Any]) -> None:
+    def apply_modifiers(self, fields: Dict[str, Field], data: Dict[str, Any]) -> None:
         for modifier in self.modifiers:
             if self._field_name in data:
-                modifier.apply(schema, data)
+                modifier.apply(fields, data)
 
     def apply_default(self, data: Dict[str, Any]) -> None:
         assert self._field_name
@@ -119,12 +143,23 @@ def define(
     return Definition(modifiers, default, default_factory)
 
 
+class ValidationResult(NamedTuple):
+    data: Optional[Dict[str, Any]]
+    errors: Optional[Dict[str, Any]]
+
+    @property
+    def is_valid(self) -> bool:
+        return self.errors is None
+
+
 class Schema:
     _internals_fields: Dict[str, Field]
+    _internals_definitions: List[Definition]
 
     def __init_subclass__(cls) -> None:
         # old pythons unfortunately
         cls.__annotations__.pop("_internals_fields", "")
+        cls.__annotations__.pop("_internals_definitions", "")
 
         for name in cls.__annotations__.keys():
             if name.startswith("_internals"):
@@ -133,6 +168,7 @@ class Schema:
                 )
 
         cls._internals_fields = {}
+        cls._internals_definitions = []
         errors = {}
 
         for name, annotation in cls.__annotations__.items():
@@ -146,11 +182,13 @@ class Schema:
                 if definition.errors:
                     errors[name] = definition.errors
                     continue
+                cls._internals_definitions.append(definition)
             # Assume that user provided a value to be used as a default.
             elif definition is not _sentinel:
                 field_definition = Definition(default=definition)
                 field_definition.field_name = name
                 setattr(cls, name, field_definition)
+                cls._internals_definitions.append(field_definition)
 
             cls._internals_fields[name] = field_from_annotation(annotation)
 
@@ -158,16 +196,36 @@ class Schema:
             raise schema_errors.SchemaError(errors)
 
     def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        validated_data, errors = self._validate(data)
+        if errors:
+            raise schema_errors.SchemaError(errors)
+
+        return validated_data
+
+    def validate_many(self, items: Iterable[Dict[str, Any]]) -> List[ValidationResult]:
+        results: List[ValidationResult] = []
+        for data in items:
+            validated_data, errors = self._validate(data)
+            if errors:
+                results.append(ValidationResult(data=None, errors=errors))
+            else:
+                results.append(ValidationResult(data=validated_data, errors=None))
+
+        return results
+
+    def _validate(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         errors: Dict[str, Any] = {}
         validated_data: Dict[str, Any] = {}
+        # Modifiers and defaults are applied to per-call copies, so that
+        # a validation never affects the following or concurrent ones.
+        fields = dict(self._internals_fields)
+        data = dict(data)
 
-        for name, field in self._internals_fields.items():
-            definition = getattr(self, name, None)
-            if isinstance(definition, Definition):
-                definition.apply_modifiers(self, data)
-                definition.apply_default(data)
+        for definition in self._internals_definitions:
+            definition.apply_modifiers(fields, data)
+            definition.apply_default(data)
 
-        for name, field in self._internals_fields.items():
+        for name, field in fields.items():
             try:
                 field_data = data.get(name, _sentinel)
                 validated_data[name] = field.validate(field_data)
@@ -179,19 +237,16 @@ class Schema:
             except schema_errors.SkipFieldError:
                 continue
 
-        if errors:
-            raise schema_errors.SchemaError(errors)
-
-        return validated_data
+        return validated_data, errors
 
 
 def field_from_annotation(annotation: Any, required: bool = True) -> Field:
     origin = get_origin(annotation)
     if origin in [Union, UnionType]:
         assert len(annotation.__args__) == 2
-        assert any([isinstance(None, ty) for ty in annotation.__args__])
+        assert type(None) in annotation.__args__
 
-        ty = annotation.__args__[0] or annotation.__args__[1]
+        ty = next(ty for ty in annotation.__args__ if ty is not type(None))
         return field_from_annotation(ty, required=False)
 
     for field_cls in FIELDS_REGISTRY:
@@ -1,4 +1,3 @@
-import inspect
 from typing import Any, Dict, Literal, Optional, Tuple, Type
 
 from hidori_core.schema import errors as schema_errors
@@ -68,7 +67,7 @@ class SubSchema(Field):
         cls, annotation: Any, required: bool = True
     ) -> Optional["SubSchema"]:
         if (
-            inspect.isclass(annotation)
+            isinstance(annotation, type)
             and issubclass(annotation, Schema)
             and annotation is not Schema
         ):
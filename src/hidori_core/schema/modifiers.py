@@ -1,7 +1,7 @@
 from typing import Any, Dict, List, Optional
 
 from hidori_core.schema import errors as schema_errors
-from hidori_core.schema.base import DataCondtion, Schema, SchemaModifier
+from hidori_core.schema.base import DataCondtion, Field, SchemaModifier
 
 
 class RequiresModifier(SchemaModifier):
@@ -23,6 +23,6 @@ class RequiresModifier(SchemaModifier):
                 "might be required but are undefined"
             )
 
-    def apply_to_schema(self, schema: Schema, data: Dict[str, Any]) -> None:
+    def apply_to_fields(self, fields: Dict[str, Field], data: Dict[str, Any]) -> None:
         for field_name in self.required_field_names:
-            schema._internals_fields[field_name].required = True
+            fields[field_name] = fields[field_name].with_required(True)
@@ -1,3 +1,3 @@
-from hidori_core.utils.messenger import Messenger
+from hidori_core.utils.messenger import Message, MessageList, Messenger
 
-__all__ = ["Messenger"]
+__all__ = ["Message", "MessageList", "Messenger"]
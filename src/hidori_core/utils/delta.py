@@ -0,0 +1,324 @@
+import contextlib
+import hashlib
+import io
+import json
+import math
+import os
+import pathlib
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from typing import IO, Any, Dict, List, Optional, Sequence
+
+# Files are compared in blocks of about the square root of their size, so the
+# number of checksums and the size of changed blocks grow together.
+MIN_BLOCK_SIZE = 2048
+MAX_BLOCK_SIZE = 128 * 1024
+
+# Adler-32 sums are kept modulo this prime, which lets the weak checksum of a
+# window be rolled forward by a byte, see get_delta.
+ADLER_MOD = 65521
+
+# Window is rolled in pure Python, which is slow on large files. Once this many
+# bytes were rolled over without a match, e.g. when the whole file changed,
+# the rest of the content is sent as data rather than rolled any further.
+ROLL_LIMIT = 1024 * 1024
+
+STRONG_DIGEST_SIZE = 8
+READ_SIZE = 1024 * 1024
+
+# Digests of files are cached on the destination along with their size and
+# modification time, so unchanged files aren't read again on every run.
+# Files modified within this many seconds aren't cached, as further changes
+# within the resolution of their modification time would go unnoticed.
+RACY_INTERVAL = 2.0
+
+# Deltas are a line of JSON with digests of the base and of the result,
+# followed by records that either copy blocks of the base or carry data.
+COPY_RECORD = b"C"
+DATA_RECORD = b"D"
+COPY_STRUCT = struct.Struct(">II")
+DATA_STRUCT = struct.Struct(">I")
+
+
+class DeltaError(Exception):
+    pass
+
+
+def get_block_size(size: int) -> int:
+    block_size = 1 << max(int(math.sqrt(size)) - 1, 0).bit_length()
+    return min(max(block_size, MIN_BLOCK_SIZE), MAX_BLOCK_SIZE)
+
+
+def get_strong_checksum(block: bytes) -> str:
+    return hashlib.blake2b(block, digest_size=STRONG_DIGEST_SIZE).hexdigest()
+
+
+def get_file_digest(path: pathlib.Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(READ_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_path_key(path: str) -> str:
+    return hashlib.sha256(path.encode()).hexdigest()[:32]
+
+
+def get_exchange_path() -> pathlib.Path:
+    # Core is pushed along with the exchange, so it is found next to it.
+    return pathlib.Path(__file__).resolve().parents[2]
+
+
+def get_delta_name(path: str) -> str:
+    # Deltas are pushed into the exchange under a name derived from the
+    # target, so both sides agree on it without passing it around.
+    return f"{get_path_key(path)}.delta"
+
+
+def get_delta_path(path: str) -> pathlib.Path:
+    return get_exchange_path() / "files" / get_delta_name(path)
+
+
+def get_digest_cache_path(path: str) -> pathlib.Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return pathlib.Path(cache_home) / "hidori" / "digests" / get_path_key(path)
+
+
+def get_stat_key(path_stat: os.stat_result) -> List[int]:
+    return [path_stat.st_size, path_stat.st_mtime_ns, path_stat.st_ino]
+
+
+def lookup_digest(path: pathlib.Path) -> Optional[str]:
+    try:
+        path_stat = path.stat()
+        with open(get_digest_cache_path(str(path))) as cache_file:
+            cached = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(cached, dict) or cached.get("stat") != get_stat_key(path_stat):
+        return None
+    digest: Optional[str] = cached.get("digest")
+    return digest
+
+
+def store_digest(path: pathlib.Path, path_stat: os.stat_result, digest: str) -> None:
+    # Cache is only an optimization, so it's skipped when it can't be written.
+    if time.time() - path_stat.st_mtime < RACY_INTERVAL:
+        return
+
+    cache_path = get_digest_cache_path(str(path))
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=cache_path.parent)
+        with os.fdopen(fd, "w") as cache_file:
+            json.dump({"stat": get_stat_key(path_stat), "digest": digest}, cache_file)
+        os.replace(temp_name, cache_path)
+    except OSError:
+        pass
+
+
+def get_cached_digest(path: pathlib.Path) -> Optional[str]:
+    digest = lookup_digest(path)
+    if digest is not None:
+        return digest
+
+    try:
+        path_stat = path.stat()
+    except FileNotFoundError:
+        return None
+    digest = get_file_digest(path)
+    store_digest(path, path_stat, digest)
+    return digest
+
+
+def get_signature(path: pathlib.Path) -> Optional[Dict[str, Any]]:
+    # Only whole blocks are signed, the remainder is always sent as data.
+    try:
+        path_stat = path.stat()
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+    block_size = get_block_size(path_stat.st_size)
+    digest = hashlib.sha256()
+    weak: List[int] = []
+    strong: List[str] = []
+    with file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+            if len(block) == block_size:
+                weak.append(zlib.adler32(block))
+                strong.append(get_strong_checksum(block))
+
+    store_digest(path, path_stat, digest.hexdigest())
+    return {
+        "digest": digest.hexdigest(),
+        "block_size": block_size,
+        "weak": weak,
+        "strong": strong,
+    }
+
+
+def get_delta(signature: Optional[Dict[str, Any]], data: bytes) -> bytes:
+    delta = io.BytesIO()
+    header = {
+        "base": signature["digest"] if signature else None,
+        "digest": hashlib.sha256(data).hexdigest(),
+        "block_size": signature["block_size"] if signature else 0,
+    }
+    delta.write(json.dumps(header).encode() + b"\n")
+
+    # Without blocks to match, e.g. for a file smaller than a block, the
+    # whole content is sent rather than rolled over byte by byte.
+    if signature is None or not signature["weak"]:
+        write_data(delta, data)
+        return delta.getvalue()
+
+    block_size: int = signature["block_size"]
+    blocks: Dict[int, Dict[str, int]] = {}
+    for index, (weak, strong) in enumerate(zip(signature["weak"], signature["strong"])):
+        blocks.setdefault(weak, {}).setdefault(strong, index)
+
+    # Runs of consecutive blocks are copied by a single record.
+    copy_start = copy_count = 0
+    literal_start = position = 0
+    weak_checksum: Optional[int] = None
+    end = len(data)
+    while position + block_size <= end:
+        window_end = position + block_size
+        if weak_checksum is None:
+            weak_checksum = zlib.adler32(data[position:window_end])
+
+        candidates = blocks.get(weak_checksum)
+        matched = None
+        if candidates is not None:
+            matched = candidates.get(get_strong_checksum(data[position:window_end]))
+
+        if matched is not None:
+            if literal_start < position:
+                write_copy(delta, copy_start, copy_count)
+                copy_count = 0
+                write_data(delta, data[literal_start:position])
+            if copy_count and copy_start + copy_count == matched:
+                copy_count += 1
+            else:
+                write_copy(delta, copy_start, copy_count)
+                copy_start, copy_count = matched, 1
+            position = literal_start = window_end
+            weak_checksum = None
+            continue
+
+        if position - literal_start >= ROLL_LIMIT:
+            break
+
+        # Window moves by a byte, with both sums of Adler-32 rolled forward
+        # rather than computed again over the whole window.
+        if window_end < end:
+            removed, added = data[position], data[window_end]
+            low = weak_checksum & 0xFFFF
+            high = weak_checksum >> 16
+            low = (low - removed + added) % ADLER_MOD
+            high = (high - block_size * removed + low - 1) % ADLER_MOD
+            weak_checksum = (high << 16) | low
+        position += 1
+
+    write_copy(delta, copy_start, copy_count)
+    write_data(delta, data[literal_start:])
+    return delta.getvalue()
+
+
+def write_copy(delta: IO[bytes], start: int, count: int) -> None:
+    if count:
+        delta.write(COPY_RECORD + COPY_STRUCT.pack(start, count))
+
+
+def write_data(delta: IO[bytes], data: bytes) -> None:
+    if data:
+        delta.write(DATA_RECORD + DATA_STRUCT.pack(len(data)) + data)
+
+
+def read_delta_header(delta: IO[bytes]) -> Dict[str, Any]:
+    try:
+        header: Dict[str, Any] = json.loads(delta.readline())
+    except ValueError:
+        raise DeltaError("delta header is invalid")
+    return header
+
+
+def apply_delta(
+    base: Optional[IO[bytes]], delta: IO[bytes], output: IO[bytes], block_size: int
+) -> int:
+    # Delta is read after its header, the number of bytes sent as data is
+    # returned so it can be reported.
+    sent = 0
+    while True:
+        record = delta.read(1)
+        if not record:
+            return sent
+
+        if record == COPY_RECORD:
+            if base is None:
+                raise DeltaError("delta copies blocks of a missing file")
+            start, count = read_struct(delta, COPY_STRUCT)
+            base.seek(start * block_size)
+            remaining = count * block_size
+            while remaining:
+                chunk = base.read(min(remaining, READ_SIZE))
+                if not chunk:
+                    raise DeltaError("delta copies blocks past the end of the file")
+                output.write(chunk)
+                remaining -= len(chunk)
+        elif record == DATA_RECORD:
+            (length,) = read_struct(delta, DATA_STRUCT)
+            data = delta.read(length)
+            if len(data) != length:
+                raise DeltaError("delta is truncated")
+            output.write(data)
+            sent += length
+        else:
+            raise DeltaError("delta record is invalid")
+
+
+def read_struct(delta: IO[bytes], record_struct: struct.Struct) -> Sequence[int]:
+    data = delta.read(record_struct.size)
+    if len(data) != record_struct.size:
+        raise DeltaError("delta is truncated")
+    return record_struct.unpack(data)
+
+
+def prepare_transfer(path: pathlib.Path, digest: str) -> Optional[Dict[str, Any]]:
+    # Controller sends the digest of its content first. When the file already
+    # has it, an empty delta is written right away and nothing is sent, the
+    # file is signed for the delta otherwise.
+    delta_path = get_delta_path(str(path))
+    with contextlib.suppress(FileNotFoundError):
+        delta_path.unlink()
+
+    if lookup_digest(path) != digest:
+        signature = get_signature(path)
+        if signature is None or signature["digest"] != digest:
+            return signature
+
+    delta_path.parent.mkdir(exist_ok=True)
+    header = {"base": digest, "digest": digest, "block_size": 0}
+    delta_path.write_bytes(json.dumps(header).encode() + b"\n")
+    return {"digest": digest, "block_size": 0, "weak": [], "strong": []}
+
+
+def main(argv: Sequence[str]) -> None:
+    # Transfers are prepared by the controller from the pushed exchange.
+    if len(argv) != 3 or argv[0] != "prepare":
+        raise SystemExit(
+            "usage: python3 -m hidori_core.utils.delta prepare PATH DIGEST"
+        )
+
+    print(json.dumps(prepare_transfer(pathlib.Path(argv[1]), argv[2])))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,11 +1,81 @@
 import json
-from typing import Dict, List
+import sys
+from typing import Any, Dict, Iterable, Iterator, List
+
+
+class Message:
+    # Messages are created for every result of every task on every
+    # destination, so they are kept as compact as possible.
+    __slots__ = ("type", "task", "message")
+
+    def __init__(self, type: str, task: str, message: str) -> None:
+        self.type = type
+        self.task = task
+        self.message = message
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Message":
+        return cls(data["type"], data["task"], data["message"])
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"type": self.type, "task": self.task, "message": self.message}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Message):
+            return NotImplemented
+        return (self.type, self.task, self.message) == (
+            other.type,
+            other.task,
+            other.message,
+        )
+
+    def __repr__(self) -> str:
+        return f"Message({self.type!r}, {self.task!r}, {self.message!r})"
+
+
+class MessageList:
+    # Counts by type are kept along with messages, so checks for errors
+    # don't have to go through all of them.
+    __slots__ = ("_messages", "_counts")
+
+    def __init__(self, messages: Iterable[Message] = ()) -> None:
+        self._messages: List[Message] = []
+        self._counts: Dict[str, int] = {}
+        self.extend(messages)
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return dict(self._counts)
+
+    def count(self, message_type: str) -> int:
+        return self._counts.get(message_type, 0)
+
+    def append(self, message: Message) -> None:
+        self._messages.append(message)
+        self._counts[message.type] = self._counts.get(message.type, 0) + 1
+
+    def extend(self, messages: Iterable[Message]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def clear(self) -> None:
+        self._messages.clear()
+        self._counts.clear()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._messages)
+
+    def __getitem__(self, index: int) -> Message:
+        return self._messages[index]
 
 
 class Messenger:
     def __init__(self, task_name: str) -> None:
         self._task: str = task_name
-        self._messages: List[Dict[str, str]] = []
+        self._messages = MessageList()
 
     @property
     def is_empty(self) -> bool:
@@ -13,16 +83,10 @@ class Messenger:
 
     @property
     def has_errors(self) -> bool:
-        return any([m["type"] == "error" for m in self._messages])
+        return self._messages.count("error") > 0
 
     def queue(self, ty: str, message: str) -> None:
-        self._messages.append(
-            {
-                "type": ty,
-                "task": self._task,
-                "message": message,
-            }
-        )
+        self._messages.append(Message(ty, self._task, message))
 
     def queue_success(self, message: str) -> None:
         self.queue(ty="success", message=message)
@@ -37,7 +101,13 @@ class Messenger:
         self.queue(ty="info", message=message)
 
     def flush(self) -> None:
-        while self._messages:
-            print(json.dumps(self._messages.pop(0)))
+        # Modules may flush while they run, so their messages are streamed
+        # rather than held in the buffer of stdout.
+        if not self._messages:
+            return
+
+        for message in self._messages:
+            print(json.dumps(message.to_dict()))
+        sys.stdout.flush()
 
-        self._messages = []
+        self._messages.clear()
@@ -1,3 +1,10 @@
+from hidori_pipelines.api import HostResult, PipelineResult, TaskResult, run_pipeline
 from hidori_pipelines.group import PipelineGroup
 
-__all__ = ["PipelineGroup"]
+__all__ = [
+    "HostResult",
+    "PipelineGroup",
+    "PipelineResult",
+    "TaskResult",
+    "run_pipeline",
+]
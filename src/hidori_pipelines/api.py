@@ -0,0 +1,141 @@
+import asyncio
+from typing import TYPE_CHECKING, Mapping, NamedTuple
+
+from hidori_common.journal import get_status
+from hidori_core.utils import Message
+from hidori_pipelines.group import AbortSummary, PipelineGroup
+from hidori_pipelines.pipeline import MessageSink, Pipeline
+from hidori_pipelines.plan import PipelinePlan
+
+if TYPE_CHECKING:
+    from hidori_common.typings import JournalRun
+
+
+class TaskResult(NamedTuple):
+    name: str
+    phase: str
+    status: str
+    counts: dict[str, int]
+    duration: float
+    messages: list[Message]
+
+
+class HostResult(NamedTuple):
+    name: str
+    user: str
+    status: str
+    tasks: list[TaskResult]
+
+
+class PipelineResult(NamedTuple):
+    hosts: dict[str, HostResult]
+    skipped: list[str]
+    abort_summary: AbortSummary | None
+
+    @property
+    def status(self) -> str:
+        statuses = {host.status for host in self.hosts.values()}
+        if self.abort_summary is not None or "interrupted" in statuses:
+            return "error"
+        return get_status({status: 1 for status in statuses})
+
+
+class ResultCollector:
+    # Collects results of a group as both its sink and its journal run.
+    # Messages of a step are passed to the sink before the step is recorded,
+    # so they are kept until then and attached to the result of the step.
+    def __init__(
+        self,
+        sink: MessageSink | None = None,
+        journal_run: "JournalRun | None" = None,
+    ) -> None:
+        self._sink = sink
+        self._journal_run = journal_run
+        self._users: dict[str, str] = {}
+        self._tasks: dict[str, list[TaskResult]] = {}
+        self._messages: dict[str, list[Message]] = {}
+
+    def send(self, pipeline: Pipeline, messages: list[Message]) -> None:
+        self._messages.setdefault(pipeline.target, []).extend(messages)
+        if self._sink is not None:
+            self._sink(pipeline, messages)
+
+    def record(
+        self,
+        *,
+        user: str,
+        host: str,
+        phase: str,
+        task: str | None,
+        counts: Mapping[str, int],
+        started_at: float,
+        duration: float,
+        status: str | None = None,
+    ) -> None:
+        if self._journal_run is not None:
+            self._journal_run.record(
+                user=user,
+                host=host,
+                phase=phase,
+                task=task,
+                counts=counts,
+                started_at=started_at,
+                duration=duration,
+                status=status,
+            )
+
+        self._users[host] = user
+        tasks = self._tasks.setdefault(host, [])
+        # Connection and preparation have no task of their own, failures are
+        # reported by the push that follows them.
+        if task is None:
+            return
+
+        tasks.append(
+            TaskResult(
+                name=task,
+                phase=phase,
+                status=status or get_status(counts),
+                counts=dict(counts),
+                duration=duration,
+                messages=self._messages.pop(host, []),
+            )
+        )
+
+    def finish(self) -> None:
+        # Journal run of the caller is finished by the caller.
+        pass
+
+    def get_hosts(self) -> dict[str, HostResult]:
+        hosts = {}
+        for host, tasks in self._tasks.items():
+            status = get_status({task.status: 1 for task in tasks})
+            if any(task.status == "interrupted" for task in tasks):
+                status = "interrupted"
+            hosts[host] = HostResult(host, self._users[host], status, tasks)
+        return hosts
+
+
+async def run_pipeline(
+    plan: PipelinePlan,
+    *,
+    sink: MessageSink | None = None,
+    limiter: asyncio.Semaphore | None = None,
+    journal_run: "JournalRun | None" = None,
+) -> PipelineResult:
+    # Runs the pipeline on the running event loop of the caller and returns
+    # its results instead of printing them. Messages are passed to the sink
+    # as soon as they're known, and the limiter can be shared by concurrent
+    # runs to bound the number of destinations run at once across all of them.
+    if plan.relays:
+        raise ValueError("pipelines with relays can only be run by workers")
+
+    collector = ResultCollector(sink, journal_run)
+    group = PipelineGroup(
+        plan, journal_run=collector, limiter=limiter, sink=collector.send
+    )
+    await group.run()
+
+    hosts = collector.get_hosts()
+    skipped = [d.name for d in plan.destinations if d.name not in hosts]
+    return PipelineResult(hosts, skipped, group.abort_summary)
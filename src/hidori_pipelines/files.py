@@ -0,0 +1,82 @@
+import asyncio
+import functools
+import json
+import pathlib
+from typing import Any
+
+from hidori_core.utils import Message
+from hidori_core.utils.delta import get_delta, get_delta_name, get_file_digest
+from hidori_runner.drivers.base import PreparedExchange
+
+# Destinations mostly have the same content of a file, so its delta against
+# them is computed once rather than for each of them.
+DELTA_CACHE_SIZE = 16
+DIGEST_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(DIGEST_CACHE_SIZE)
+def get_source_digest(source: str, size: int, mtime_ns: int) -> str:
+    return get_file_digest(pathlib.Path(source))
+
+
+@functools.lru_cache(DELTA_CACHE_SIZE)
+def get_cached_delta(source: str, size: int, mtime_ns: int, signature: str) -> bytes:
+    # Size and modification time of the source are part of the key, so its
+    # changes are picked up, e.g. between runs of a watched pipeline.
+    return get_delta(json.loads(signature), pathlib.Path(source).read_bytes())
+
+
+def write_delta(
+    localpath: pathlib.Path,
+    source: pathlib.Path,
+    path: str,
+    signature: dict[str, Any] | None,
+) -> pathlib.Path:
+    source_stat = source.stat()
+    delta = get_cached_delta(
+        str(source), source_stat.st_size, source_stat.st_mtime_ns, json.dumps(signature)
+    )
+    delta_path = localpath / "files" / get_delta_name(path)
+    delta_path.parent.mkdir(exist_ok=True)
+    delta_path.write_bytes(delta)
+    return delta_path
+
+
+async def push_file_delta(
+    exchange: PreparedExchange, task: str, source: pathlib.Path, path: str
+) -> list[Message]:
+    # Digest of the source is sent first, and the file on the destination
+    # is signed only when it doesn't have the same digest, so that only
+    # blocks that differ from the source are pushed.
+    if not source.is_file():
+        return [Message("error", task, f"source {source} is not a file")]
+
+    loop = asyncio.get_running_loop()
+    try:
+        source_stat = source.stat()
+        digest = await loop.run_in_executor(
+            None,
+            get_source_digest,
+            str(source),
+            source_stat.st_size,
+            source_stat.st_mtime_ns,
+        )
+    except OSError as e:
+        return [Message("error", task, f"unable to read source {source}: {e}")]
+
+    transport = exchange.transport
+    signature, messages = await transport.get_file_signature(exchange.id, path, digest)
+    if messages:
+        return messages
+    if signature is not None and signature["digest"] == digest:
+        return []
+
+    try:
+        delta_path = await loop.run_in_executor(
+            None, write_delta, exchange.localpath, source, path, signature
+        )
+    except OSError as e:
+        return [Message("error", task, f"unable to read source {source}: {e}")]
+
+    remote_path = delta_path.relative_to(exchange.localpath).as_posix()
+    return await transport.push_file(exchange.id, delta_path, remote_path)
@@ -1,80 +1,345 @@
 import asyncio
-import tomllib
-from typing import Any, Iterable, Iterator, Literal
+import concurrent.futures
+import contextlib
+import pathlib
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Coroutine,
+    Iterable,
+    Iterator,
+    NamedTuple,
+)
 
-from hidori_core.schema import Schema
-from hidori_pipelines.pipeline import DestinationData, Pipeline
+from hidori_common.journal import get_status
+from hidori_pipelines.pipeline import MessageSink, Pipeline
+from hidori_pipelines.plan import PipelinePlan
+from hidori_pipelines.templates import StepRenderer
 from hidori_runner.drivers import create_driver
 
+if TYPE_CHECKING:
+    from hidori_common.typings import JournalRun
 
-class PipelineConfig(Schema):
-    on_fail: Literal["abort-failed", "abort-all", "continue"]
+DEFAULT_WINDOW_SIZE = 256
+DEFAULT_CONNECT_LIMIT = 32
+DEFAULT_PREPARE_WORKERS = 8
+DEFAULT_PUSH_LIMIT = 64
 
 
-class PipelineSchema(Schema):
-    config: PipelineConfig | None
-    destinations: dict[str, dict[str, Any]]
-    tasks: dict[str, dict[str, Any]]
+class AbortSummary(NamedTuple):
+    interrupted: list[str]
+    completed: list[str]
 
 
 class PipelineGroup(Iterable[Pipeline]):
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> "PipelineGroup":
+        return cls(PipelinePlan.from_data(data))
+
+    @classmethod
+    def from_path(cls, path: str) -> "PipelineGroup":
+        return cls(PipelinePlan.from_path(pathlib.Path(path)))
+
     @classmethod
     def from_toml_path(cls, path: str) -> "PipelineGroup":
-        with open(path, "rb") as f:
-            return cls(tomllib.load(f))
-
-    def __init__(self, data: dict[str, Any]) -> None:
-        schema = PipelineSchema()
-        schema.validate(data)
-
-        self._config = data.get("config", {"on_fail": "abort-failed"})
-        self._destinations_data: list[DestinationData] = [
-            {"target": target, "driver": create_driver(destination_data)}
-            for target, destination_data in data["destinations"].items()
-        ]
-        self._pipeline_data = data["tasks"]
+        return cls(PipelinePlan.from_toml_path(pathlib.Path(path)))
+
+    def __init__(
+        self,
+        plan: PipelinePlan,
+        connect_limit: int = DEFAULT_CONNECT_LIMIT,
+        journal_run: "JournalRun | None" = None,
+        limiter: asyncio.Semaphore | None = None,
+        prepare_workers: int = DEFAULT_PREPARE_WORKERS,
+        push_limit: int = DEFAULT_PUSH_LIMIT,
+        sink: MessageSink | None = None,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+    ) -> None:
+        self._config = plan.config
+        self._destinations = plan.destinations
+        self._renderer = StepRenderer(plan.steps)
+        self._window_size = window_size
+        self._connect_limit = asyncio.Semaphore(connect_limit)
+        self._push_limit = asyncio.Semaphore(push_limit)
+        self._prepare_workers = prepare_workers
+        self._limiter = limiter
+        self._journal_run = journal_run
+        self._sink = sink
+        self._step_names = [step.task_json["name"] for step in plan.steps]
         self._current = 0
+        self._keep_alive: float | None = None
+        self._aborted = False
+        self._running: set[asyncio.Task[None]] = set()
+        self._interrupted: list[str] = []
+        self._completed: list[str] = []
 
     def __iter__(self) -> Iterator[Pipeline]:
         return self
 
     def __next__(self) -> Pipeline:
-        if self._current >= len(self._destinations_data):
+        if self._current >= len(self._destinations):
             raise StopIteration()
 
-        destination_data = self._destinations_data[self._current]
+        # Drivers are created on demand, so only pipelines of the window being
+        # run are kept in memory, no matter how large the inventory is.
+        destination = self._destinations[self._current]
         self._current += 1
-        return Pipeline(destination_data, self._pipeline_data)
+        config = destination.config
+        steps = self._renderer.render(config.pop("vars", {}))
+        pipeline = Pipeline(
+            {
+                "target": destination.name,
+                "driver": create_driver(config, validated=True),
+            },
+            steps,
+        )
+        pipeline.sink = self._sink
+        return pipeline
+
+    @property
+    def aborted(self) -> bool:
+        return self._aborted
+
+    @property
+    def abort_summary(self) -> AbortSummary | None:
+        if not self._aborted:
+            return None
+        return AbortSummary(list(self._interrupted), list(self._completed))
+
+    def abort(self) -> None:
+        # Steps still running on other destinations are cancelled rather than
+        # waited for, which terminates their transport subprocesses.
+        self._aborted = True
+        current = asyncio.current_task()
+        for task in list(self._running):
+            if task is not current:
+                task.cancel()
 
     async def run(self) -> None:
-        pipelines = list(self.prepare_pipelines())
-        async with asyncio.TaskGroup() as tg:
-            for pipeline in pipelines:
-                tg.create_task(pipeline.finalize())
+        # Pipelines are created as the window slides, a new one is started
+        # as soon as another one finishes, so a slow destination never holds
+        # up the others and only pipelines of the window are kept in memory.
+        window = asyncio.Semaphore(self._window_size)
+        with self._create_executor() as executor:
+            async with asyncio.TaskGroup() as tg:
+                while True:
+                    await window.acquire()
+                    if self._aborted or (pipeline := next(self, None)) is None:
+                        break
+                    self._start_task(
+                        tg, self._run_in_window(pipeline, executor, window)
+                    )
+
+    async def watch(
+        self,
+        interval: float,
+        iterations: int | None = None,
+        start_journal_run: "Callable[[], JournalRun] | None" = None,
+    ) -> None:
+        # All destinations are kept connected and their exchanges pushed
+        # between iterations, so every iteration after the first one only
+        # runs the steps again, and only hosts whose state changed are shown.
+        # Connections must outlive the interval, as they're idle meanwhile.
+        self._keep_alive = interval
+        pipelines = list(self)
+        outcomes: list[str | None] = [None] * len(pipelines)
+        for pipeline in pipelines:
+            pipeline.hold_messages = True
+
+        iteration = 0
+        try:
+            while iterations is None or iteration < iterations:
+                if iteration:
+                    await asyncio.sleep(interval)
+                iteration += 1
 
-        pipelines = self._filter_out_failed_pipelines(pipelines, critical_task=True)
-        while not all([p.has_completed for p in pipelines]):
+                self._aborted = False
+                self._interrupted.clear()
+                self._completed.clear()
+                if start_journal_run is not None:
+                    self._journal_run = start_journal_run()
+                try:
+                    await self._run_iteration(pipelines)
+                finally:
+                    if self._journal_run is not None:
+                        self._journal_run.finish()
+
+                for index, pipeline in enumerate(pipelines):
+                    # Hosts are reported when something was changed or
+                    # failed, and once more when they're back to success.
+                    previous = outcomes[index]
+                    outcomes[index] = get_status(pipeline.held_counts)
+                    pipeline.release_messages(
+                        print_messages=outcomes[index] != "success"
+                        or previous not in (None, "success")
+                    )
+        finally:
+            await self._disconnect_pipelines(pipelines)
+
+    async def _run_iteration(self, pipelines: list[Pipeline]) -> None:
+        # Pipelines are run in the same window as by run, but stay connected
+        # once done, as they're run again by the next iteration.
+        window = asyncio.Semaphore(self._window_size)
+        with self._create_executor() as executor:
             async with asyncio.TaskGroup() as tg:
                 for pipeline in pipelines:
-                    tg.create_task(pipeline.invoke_step())
-            pipelines = self._filter_out_failed_pipelines(pipelines)
-
-    def prepare_pipelines(self) -> Iterator[Pipeline]:
-        for pipeline in self:
-            pipeline.prepare()
-            yield pipeline
-
-    def _filter_out_failed_pipelines(
-        self, pipelines: list[Pipeline], critical_task: bool = False
-    ) -> list[Pipeline]:
-        has_any_failed = any([p.has_failed for p in pipelines])
-        if has_any_failed and self._config["on_fail"] == "abort-all":
-            return []
-        elif has_any_failed and self._config["on_fail"] == "abort-failed":
-            return [p for p in pipelines if not p.has_failed]
-        elif has_any_failed and critical_task:
-            return [p for p in pipelines if not p.has_failed]
-        elif self._config["on_fail"] == "continue":
-            return pipelines
-        else:
-            return pipelines
+                    await window.acquire()
+                    if self._aborted:
+                        break
+                    self._start_task(
+                        tg,
+                        self._run_in_window(
+                            pipeline, executor, window, disconnect=False
+                        ),
+                    )
+
+    def _create_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        # Preparation runs on a thread pool, so the event loop never blocks
+        # on file operations while other pipelines are pushed.
+        return concurrent.futures.ThreadPoolExecutor(
+            self._prepare_workers, thread_name_prefix="hidori-prepare"
+        )
+
+    async def _run_in_window(
+        self,
+        pipeline: Pipeline,
+        executor: concurrent.futures.Executor,
+        window: asyncio.Semaphore,
+        disconnect: bool = True,
+    ) -> None:
+        try:
+            await self._run_pipeline(pipeline, executor)
+        finally:
+            try:
+                if disconnect:
+                    await pipeline.driver.disconnect()
+            finally:
+                window.release()
+
+    async def _run_pipeline(
+        self, pipeline: Pipeline, executor: concurrent.futures.Executor
+    ) -> None:
+        # Limiter may be shared with other groups, so it bounds destinations
+        # run at once across all of them.
+        async with self._limiter or contextlib.nullcontext():
+            if pipeline.is_prepared and pipeline.has_pushed:
+                pipeline.restart()
+            else:
+                await self._start_pipeline(pipeline, executor)
+
+            while (
+                not self._aborted
+                and not pipeline.has_completed
+                and self._can_continue(pipeline)
+            ):
+                await self._invoke_step(pipeline)
+
+        # Pipelines of an aborted group may have been cancelled before they
+        # were prepared, only those that ran a step are reported.
+        if self._aborted and pipeline.invoked_steps and not pipeline.is_interrupted:
+            self._completed.append(pipeline.target)
+
+    def _start_task(
+        self, tg: asyncio.TaskGroup, coro: Coroutine[Any, Any, None]
+    ) -> None:
+        # Tasks are tracked only so they can be cancelled by abort, tasks
+        # started after abort are cancelled right away.
+        task = tg.create_task(coro)
+        if self._aborted:
+            task.cancel()
+            return
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _disconnect_pipelines(self, pipelines: list[Pipeline]) -> None:
+        async with asyncio.TaskGroup() as tg:
+            for pipeline in pipelines:
+                tg.create_task(pipeline.driver.disconnect())
+
+    async def _start_pipeline(
+        self, pipeline: Pipeline, executor: concurrent.futures.Executor
+    ) -> None:
+        # Connections are opened at a bounded rate, so handshakes overlap
+        # with the preparation and pushes of other pipelines.
+        async with self._connect_limit:
+            started_at, start = time.time(), time.monotonic()
+            await pipeline.driver.connect(keep_alive=self._keep_alive)
+            self._record(
+                pipeline,
+                "connect",
+                started_at,
+                start,
+                status="error" if pipeline.driver.handshake_time is None else None,
+            )
+
+        started_at, start = time.time(), time.monotonic()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, pipeline.prepare)
+        self._record(pipeline, "prepare", started_at, start)
+
+        # The first step is run along with the push of the exchange.
+        async with self._push_limit:
+            await self._run_step(pipeline, "push", pipeline.finalize())
+
+    async def _invoke_step(self, pipeline: Pipeline) -> None:
+        await self._run_step(pipeline, "task", pipeline.invoke_step())
+
+    async def _run_step(
+        self, pipeline: Pipeline, phase: str, step: Coroutine[Any, Any, None]
+    ) -> None:
+        started_at, start = time.time(), time.monotonic()
+        try:
+            await step
+        except asyncio.CancelledError:
+            # Outcome of a step that was cancelled on its way is unknown,
+            # so the destination is reported apart from those that completed.
+            pipeline.interrupt()
+            self._interrupted.append(pipeline.target)
+            self._record(
+                pipeline,
+                phase,
+                started_at,
+                start,
+                status="interrupted",
+                with_step=True,
+            )
+            raise
+
+        self._record(pipeline, phase, started_at, start, with_step=True)
+        if pipeline.has_failed and self._config["on_fail"] == "abort-all":
+            self.abort()
+
+    def _record(
+        self,
+        pipeline: Pipeline,
+        phase: str,
+        started_at: float,
+        start: float,
+        status: str | None = None,
+        with_step: bool = False,
+    ) -> None:
+        if self._journal_run is None:
+            return
+
+        task = None
+        if with_step and pipeline.invoked_steps:
+            task = self._step_names[pipeline.invoked_steps - 1]
+        self._journal_run.record(
+            user=pipeline.driver.user,
+            host=pipeline.target,
+            phase=phase,
+            task=task,
+            counts=pipeline.last_counts if with_step else {},
+            started_at=started_at,
+            duration=time.monotonic() - start,
+            status=status,
+        )
+
+    def _can_continue(self, pipeline: Pipeline) -> bool:
+        # With abort-all, the group is already aborted by the failed step.
+        if pipeline.has_failed and self._config["on_fail"] != "continue":
+            return False
+        # Pipelines that couldn't be pushed have nothing to continue with.
+        return pipeline.has_pushed
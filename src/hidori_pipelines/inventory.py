@@ -0,0 +1,69 @@
+import array
+import sys
+from typing import Any, Iterator
+
+
+class Destination:
+    __slots__ = ("name", "config")
+
+    def __init__(self, name: str, config: dict[str, Any]) -> None:
+        self.name = name
+        self.config = config
+
+
+class Inventory:
+    # Destinations are kept column-wise rather than as a dict per destination.
+    # Each destination holds only its name and a tuple of config values, while
+    # config keys are shared through layouts and equal strings are interned.
+    __slots__ = ("_names", "_values", "_layouts", "_layout_ids", "_layout_index")
+
+    def __init__(self) -> None:
+        self._names: list[str] = []
+        self._values: list[tuple[Any, ...]] = []
+        self._layouts: list[tuple[str, ...]] = []
+        self._layout_ids: dict[tuple[str, ...], int] = {}
+        self._layout_index = array.array("I")
+
+    @classmethod
+    def from_dict(cls, destinations: dict[str, dict[str, Any]]) -> "Inventory":
+        inventory = cls()
+        for name, config in destinations.items():
+            inventory.add(name, config)
+        return inventory
+
+    def add(self, name: str, config: dict[str, Any]) -> None:
+        layout = tuple(config)
+        layout_id = self._layout_ids.get(layout)
+        if layout_id is None:
+            layout_id = self._layout_ids[layout] = len(self._layouts)
+            self._layouts.append(layout)
+
+        self._names.append(sys.intern(name))
+        self._values.append(
+            tuple(sys.intern(v) if isinstance(v, str) else v for v in config.values())
+        )
+        self._layout_index.append(layout_id)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __getitem__(self, index: int) -> Destination:
+        layout = self._layouts[self._layout_index[index]]
+        config = dict(zip(layout, self._values[index]))
+        return Destination(self._names[index], config)
+
+    def __iter__(self) -> Iterator[Destination]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def shard(self, index: int, count: int) -> "Inventory":
+        # Destinations are dealt round-robin, so shards stay balanced even
+        # when similar destinations are listed next to each other.
+        inventory = Inventory()
+        for position in range(index, len(self), count):
+            destination = self[position]
+            inventory.add(destination.name, destination.config)
+        return inventory
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        return {destination.name: destination.config for destination in self}
@@ -1,44 +1,140 @@
-import uuid
-from typing import Any, TypedDict
+import hashlib
+import json
+import pathlib
+from collections import defaultdict
+from typing import Any, Callable, ClassVar, Collection, Sequence, TypedDict
 
 from hidori_common import ConsolePrinter
-from hidori_core.modules import MODULES_REGISTRY
+from hidori_core.modules import get_module
+from hidori_core.schema import Schema
+from hidori_core.schema import errors as schema_errors
+from hidori_core.utils import Message
+from hidori_pipelines.files import push_file_delta
 from hidori_runner.drivers.base import Driver, PreparedExchange
 
 PIPELINE_MODULES_REGISTRY: dict[str, type["PipelineStep"]] = {}
 
+# Receives messages of a pipeline instead of the console, once they are known.
+MessageSink = Callable[["Pipeline", list[Message]], None]
+
+
+class TaskDataSchema(Schema):
+    module: str
+
+
+def validate_tasks(
+    tasks_data: dict[str, dict[str, Any]], templated: Collection[str] = ()
+) -> None:
+    # Catch invalid tasks on the controller before anything is sent out.
+    # The remote executor still validates each task on its own. Data of
+    # templated tasks is validated once rendered for a destination.
+    errors: dict[str, Any] = {}
+    tasks_by_module: defaultdict[str, list[str]] = defaultdict(list)
+    results = TaskDataSchema().validate_many(tasks_data.values())
+    for task_name, result in zip(tasks_data, results):
+        if result.errors:
+            errors[task_name] = result.errors
+            continue
+
+        module_name = tasks_data[task_name]["module"]
+        if get_module(module_name) is None:
+            errors[task_name] = {"module": f"{module_name} module does not exist"}
+            continue
+
+        if task_name not in templated:
+            tasks_by_module[module_name].append(task_name)
+
+    for module_name, task_names in tasks_by_module.items():
+        module = get_module(module_name)
+        assert module
+        results = module.schema.validate_many(tasks_data[n] for n in task_names)
+        for task_name, result in zip(task_names, results):
+            if result.errors:
+                errors[task_name] = result.errors
+
+    if errors:
+        raise schema_errors.SchemaError({"tasks": errors})
+
 
 class PipelineStep:
+    # Steps are compiled once per group and shared by pipelines of every
+    # destination, so they must stay immutable after creation.
+    __slots__ = ("_task_id", "_task_bytes")
+
+    # Steps whose modules need files of the controller push them into the
+    # pushed exchange right before they are invoked.
+    pushes_files: ClassVar[bool] = False
+
     def __init_subclass__(cls, *, module_name: str) -> None:
         super().__init_subclass__()
 
-        if module_name not in MODULES_REGISTRY and module_name != "*":
+        if module_name != "*" and get_module(module_name) is None:
             raise RuntimeError(f"{module_name} module does not exist.")
 
         if module_name in PIPELINE_MODULES_REGISTRY:
             raise RuntimeError(f"{module_name} module name is already registered.")
         PIPELINE_MODULES_REGISTRY[module_name] = cls
 
-    def __init__(self, task_name: str, task_data: dict[str, Any]) -> None:
-        self._task_name = task_name
-        self._task_id = uuid.uuid4().hex
-        self._task_data = task_data
-
+    @classmethod
+    def compile(cls, task_name: str, task_data: dict[str, Any]) -> "PipelineStep":
         module_name = task_data["module"]
-        if module_name not in MODULES_REGISTRY:
+        if get_module(module_name) is None:
             raise RuntimeError(f"{module_name} module does not exist.")
 
+        task_json = {"name": task_name, "data": task_data}
+        return cls.from_bytes(json.dumps(task_json, sort_keys=True).encode())
+
+    @classmethod
+    def from_bytes(cls, task_bytes: bytes) -> "PipelineStep":
+        return cls(hashlib.sha256(task_bytes).hexdigest()[:32], task_bytes)
+
+    def __init__(self, task_id: str, task_bytes: bytes) -> None:
+        self._task_id = task_id
+        self._task_bytes = task_bytes
+
     @property
     def task_id(self) -> str:
         return self._task_id
 
     @property
     def task_json(self) -> dict[str, Any]:
-        return {"name": self._task_name, "data": self._task_data}
+        task_json: dict[str, Any] = json.loads(self._task_bytes)
+        return task_json
+
+    @property
+    def task_bytes(self) -> bytes:
+        return self._task_bytes
+
+    async def push_files(self, exchange: PreparedExchange) -> list[Message]:
+        return []
 
 
 class DefaultPipelineStep(PipelineStep, module_name="*"):
-    ...
+    __slots__ = ()
+
+
+class FilePipelineStep(PipelineStep, module_name="file"):
+    __slots__ = ()
+
+    pushes_files = True
+
+    async def push_files(self, exchange: PreparedExchange) -> list[Message]:
+        task_json = self.task_json
+        data = task_json["data"]
+        return await push_file_delta(
+            exchange, task_json["name"], pathlib.Path(data["source"]), data["path"]
+        )
+
+
+def get_step_cls(module_name: str) -> type[PipelineStep]:
+    return PIPELINE_MODULES_REGISTRY.get(module_name, PIPELINE_MODULES_REGISTRY["*"])
+
+
+def compile_steps(tasks_data: dict[str, dict[str, Any]]) -> tuple[PipelineStep, ...]:
+    return tuple(
+        get_step_cls(data["module"]).compile(name, data)
+        for name, data in tasks_data.items()
+    )
 
 
 class DestinationData(TypedDict):
@@ -48,60 +144,134 @@ class DestinationData(TypedDict):
 
 class Pipeline:
     def __init__(
-        self, destination_data: DestinationData, tasks_data: dict[str, Any]
+        self, destination_data: DestinationData, steps: Sequence[PipelineStep]
     ) -> None:
-        self._steps: list[PipelineStep] = self._create_steps(tasks_data)
+        self._steps = steps
+        self._next_step = 0
         self._exchange: PreparedExchange | None = None
+        self.last_counts: dict[str, int] = {}
+        self.hold_messages = False
+        self.is_interrupted = False
+        self.sink: MessageSink | None = None
+        self._held_messages: list[list[Message]] = []
         self.target = destination_data["target"]
         self.driver = destination_data["driver"]
         self._printer = ConsolePrinter(user=self.driver.user, target=self.target)
 
     @property
-    def steps(self) -> list[PipelineStep]:
+    def steps(self) -> Sequence[PipelineStep]:
         return self._steps
 
+    @property
+    def invoked_steps(self) -> int:
+        return self._next_step
+
     @property
     def has_completed(self) -> bool:
-        return not self._steps
+        return self._next_step >= len(self._steps)
+
+    @property
+    def is_prepared(self) -> bool:
+        return self._exchange is not None
 
     @property
     def has_failed(self) -> bool:
         assert self._exchange
         return self._exchange.status == "failed"
 
-    def _create_steps(self, tasks_data: dict[str, Any]) -> list[PipelineStep]:
-        steps: list[PipelineStep] = []
-        for name, data in tasks_data.items():
-            module_name = data["module"]
-            steps.append(
-                PIPELINE_MODULES_REGISTRY.get(
-                    module_name, PIPELINE_MODULES_REGISTRY["*"]
-                )(name, data)
-            )
-        return steps
+    @property
+    def has_pushed(self) -> bool:
+        assert self._exchange
+        return self._exchange.pushed
 
     def prepare(self) -> None:
         self._exchange = self.driver.prepare_pipeline(self)
 
+    def restart(self) -> None:
+        # Pushed exchange stays on the destination, so steps can be run again
+        # without another push.
+        if not self._exchange:
+            raise RuntimeError("pipeline is not prepared")
+
+        self._next_step = 0
+        self.is_interrupted = False
+        self._exchange.status = "pending"
+
+    def interrupt(self) -> None:
+        # Step was cancelled while it was running on the destination, so it
+        # may have been applied only partially.
+        if not self._exchange:
+            raise RuntimeError("pipeline is not prepared")
+
+        self.is_interrupted = True
+        self._exchange.status = "failed"
+        task = "system"
+        if self._next_step:
+            task = self._steps[self._next_step - 1].task_json["name"]
+        self._exchange.messages.append(
+            Message("info", task, "interrupted by abort of the pipeline group")
+        )
+        self.handle_messages()
+
     async def finalize(self) -> None:
         if not self._exchange:
             raise RuntimeError("pipeline is not prepared")
 
-        await self.driver.finalize(self._exchange)
+        # Files of a step are pushed into the exchange, so the exchange is
+        # pushed on its own before a first step that pushes files.
+        step = None if self.has_completed else self._steps[self._next_step]
+        if step is None or step.pushes_files:
+            await self.driver.finalize(self._exchange)
+            if step is not None and self._exchange.pushed:
+                await self._invoke_next_step()
+        else:
+            self._next_step += 1
+            await self.driver.finalize(self._exchange, step.task_id)
         self.handle_messages()
 
     async def invoke_step(self) -> None:
         if not self._exchange:
             raise RuntimeError("pipeline is not prepared")
 
-        step = self._steps.pop(0)
-        await self.driver.invoke_executor(self._exchange, step.task_id)
+        await self._invoke_next_step()
         self.handle_messages()
 
+    async def _invoke_next_step(self) -> None:
+        assert self._exchange
+        step = self._steps[self._next_step]
+        self._next_step += 1
+        push_messages = await step.push_files(self._exchange)
+        self._exchange.messages.extend(push_messages)
+        if any(message.type == "error" for message in push_messages):
+            self._exchange.status = "failed"
+            return
+
+        await self.driver.invoke_executor(self._exchange, step.task_id)
+
     def handle_messages(self) -> None:
         if not self._exchange:
             raise RuntimeError("pipeline is not prepared")
 
+        self.last_counts = self._exchange.messages.counts
         if self._exchange.messages:
-            self._printer.print_all(self._exchange.messages)
+            if self.hold_messages:
+                self._held_messages.append(list(self._exchange.messages))
+            elif self.sink is not None:
+                self.sink(self, list(self._exchange.messages))
+            else:
+                self._printer.print_all(self._exchange.messages)
             self._exchange.messages.clear()
+
+    @property
+    def held_counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for messages in self._held_messages:
+            for message in messages:
+                counts[message.type] = counts.get(message.type, 0) + 1
+        return counts
+
+    def release_messages(self, print_messages: bool) -> None:
+        if print_messages:
+            for messages in self._held_messages:
+                self._printer.print_all(messages)
+        self._held_messages.clear()
@@ -0,0 +1,206 @@
+import dataclasses
+import json
+import pathlib
+import tomllib
+from typing import Any, Literal
+
+from hidori_core.schema import Schema
+from hidori_core.schema import errors as schema_errors
+from hidori_pipelines.inventory import Inventory
+from hidori_pipelines.pipeline import (
+    PipelineStep,
+    compile_steps,
+    get_step_cls,
+    validate_tasks,
+)
+from hidori_pipelines.templates import StepRenderer, has_variables
+from hidori_runner.drivers import resolve_destination
+from hidori_runner.drivers.bundle import get_core_hash
+
+PLAN_FORMAT = "hidori-plan"
+PLAN_VERSION = 2
+DEFAULT_CONFIG = {"on_fail": "abort-failed"}
+
+
+class PipelineConfig(Schema):
+    on_fail: Literal["abort-failed", "abort-all", "continue"]
+
+
+class PipelineSchema(Schema):
+    config: PipelineConfig | None
+    relays: dict[str, dict[str, Any]] | None
+    destinations: dict[str, dict[str, Any]]
+    tasks: dict[str, dict[str, Any]]
+
+
+@dataclasses.dataclass(frozen=True)
+class PipelinePlan:
+    config: dict[str, Any]
+    destinations: Inventory
+    steps: tuple[PipelineStep, ...]
+    bundle_hash: str
+    relays: dict[str, dict[str, Any]] = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> "PipelinePlan":
+        schema = PipelineSchema()
+        schema.validate(data)
+        # Tasks with variables are validated once rendered, for every distinct
+        # combination of values among destinations.
+        validate_tasks(
+            data["tasks"],
+            templated=[n for n, d in data["tasks"].items() if has_variables(d)],
+        )
+        steps = compile_steps(data["tasks"])
+        renderer = StepRenderer(steps)
+
+        relays = {
+            name: resolve_destination(relay_data)
+            for name, relay_data in data.get("relays", {}).items()
+        }
+        # Sources of files are read from the controller, which relays can't.
+        file_tasks = [s.task_json["name"] for s in steps if s.pushes_files]
+        destinations = Inventory()
+        errors: dict[str, Any] = {}
+        rendered: set[tuple[Any, ...]] = set()
+        for name, destination_data in data["destinations"].items():
+            config = resolve_destination(destination_data)
+            # Relay is not a part of the driver config, destinations keep it
+            # until the plan is split between the controller and its relays.
+            if (relay := destination_data.get("relay")) is not None:
+                if relay not in relays:
+                    errors[name] = {"relay": f"{relay} relay does not exist"}
+                elif file_tasks:
+                    errors[name] = {
+                        "relay": f"{', '.join(file_tasks)} can't be run through "
+                        "relays, as they push files of the controller"
+                    }
+                config["relay"] = relay
+            # Only variables used by tasks are kept along with the destination.
+            if renderer.variables:
+                variables = destination_data.get("vars", {})
+                if error := validate_variables(renderer, variables, rendered):
+                    errors[name] = error
+                else:
+                    config["vars"] = {v: variables[v] for v in renderer.variables}
+            destinations.add(name, config)
+
+        if errors:
+            raise schema_errors.SchemaError({"destinations": errors})
+
+        return cls(
+            config=data.get("config", DEFAULT_CONFIG),
+            destinations=destinations,
+            steps=steps,
+            bundle_hash=get_core_hash(),
+            relays=relays,
+        )
+
+    @classmethod
+    def from_toml_path(cls, path: pathlib.Path) -> "PipelinePlan":
+        with open(path, "rb") as f:
+            return cls.from_data(tomllib.load(f))
+
+    @classmethod
+    def from_plan_path(cls, path: pathlib.Path) -> "PipelinePlan":
+        # A compiled plan is trusted to be valid, only its compatibility
+        # with the installed hidori is verified.
+        with open(path, "rb") as f:
+            plan_data = json.load(f)
+
+        if (
+            plan_data.get("format") != PLAN_FORMAT
+            or plan_data.get("version") != PLAN_VERSION
+        ):
+            raise RuntimeError(f"{path} is not a supported pipeline plan")
+        if plan_data["bundle_hash"] != get_core_hash():
+            raise RuntimeError(
+                f"{path} was compiled for a different hidori version, compile it again"
+            )
+
+        return cls(
+            config=plan_data["config"],
+            destinations=Inventory.from_dict(plan_data["destinations"]),
+            steps=tuple(
+                get_step_cls(task["module"])(task["id"], task["json"].encode())
+                for task in plan_data["tasks"]
+            ),
+            bundle_hash=plan_data["bundle_hash"],
+            relays=plan_data["relays"],
+        )
+
+    @classmethod
+    def from_path(cls, path: pathlib.Path) -> "PipelinePlan":
+        # TOML documents cannot start with a brace, unlike compiled plans.
+        with open(path, "rb") as f:
+            is_plan = f.read(64).lstrip().startswith(b"{")
+
+        return cls.from_plan_path(path) if is_plan else cls.from_toml_path(path)
+
+    def split_relays(self) -> tuple["PipelinePlan", dict[str, "PipelinePlan"]]:
+        # Returns the plan of destinations run by the controller itself and
+        # a plan for each relay with destinations that are run through it.
+        direct = Inventory()
+        relayed = {name: Inventory() for name in self.relays}
+        for destination in self.destinations:
+            config = dict(destination.config)
+            relay = config.pop("relay", None)
+            inventory = direct if relay is None else relayed[relay]
+            inventory.add(destination.name, config)
+
+        return dataclasses.replace(self, destinations=direct, relays={}), {
+            name: dataclasses.replace(self, destinations=inventory, relays={})
+            for name, inventory in relayed.items()
+            if len(inventory)
+        }
+
+    def dump(self, path: pathlib.Path) -> None:
+        plan_data = {
+            "format": PLAN_FORMAT,
+            "version": PLAN_VERSION,
+            "bundle_hash": self.bundle_hash,
+            "config": self.config,
+            "relays": self.relays,
+            "destinations": self.destinations.to_dict(),
+            "tasks": [
+                {
+                    "id": step.task_id,
+                    "module": step.task_json["data"]["module"],
+                    "json": step.task_bytes.decode(),
+                }
+                for step in self.steps
+            ],
+        }
+        with open(path, "w") as f:
+            json.dump(plan_data, f)
+
+
+def validate_variables(
+    renderer: StepRenderer, variables: Any, rendered: set[tuple[Any, ...]]
+) -> dict[str, Any] | None:
+    if not isinstance(variables, dict) or not all(
+        isinstance(value, (str, int, float)) for value in variables.values()
+    ):
+        return {"vars": "must be a table of strings and numbers"}
+
+    missing = [name for name in renderer.variables if name not in variables]
+    if missing:
+        return {"vars": f"{', '.join(missing)} not defined"}
+
+    # Each distinct combination of values is rendered and validated once.
+    key = tuple(variables[name] for name in renderer.variables)
+    if key in rendered:
+        return None
+    rendered.add(key)
+    steps = renderer.render(variables)
+    try:
+        validate_tasks(
+            {
+                step.task_json["name"]: step.task_json["data"]
+                for step, template in zip(steps, renderer.templates)
+                if template is not None
+            }
+        )
+    except schema_errors.SchemaError as e:
+        return e.errors
+    return None
@@ -0,0 +1,87 @@
+import importlib
+import pathlib
+import shutil
+import tempfile
+import time
+import uuid
+from typing import Any, Iterator
+
+from hidori_common import ConsolePrinter
+from hidori_core.utils import Message
+from hidori_pipelines.plan import PipelinePlan
+from hidori_runner.drivers import create_driver
+
+# Relays run a worker of their own, so they receive everything needed to
+# run a pipeline except the CLI. Relays require the same Python as controller.
+RELAY_PACKAGES = ("hidori_common", "hidori_core", "hidori_pipelines", "hidori_runner")
+RELAY_WORKER_COMMAND = (
+    "mkdir -p cache && XDG_CACHE_HOME=$PWD/cache PYTHONPATH=$PWD "
+    "python3 -m hidori_pipelines.workers plan.json --shard 0/1"
+)
+
+
+def build_relay_bundle(path: pathlib.Path, plan: PipelinePlan) -> None:
+    for package in RELAY_PACKAGES:
+        package_path = pathlib.Path(importlib.import_module(package).__path__[0])
+        shutil.copytree(
+            package_path,
+            path / package,
+            ignore=shutil.ignore_patterns("__pycache__", "*.pyc"),
+        )
+    plan.dump(path / "plan.json")
+
+
+class Relay:
+    def __init__(self, name: str, config: dict[str, Any], plan: PipelinePlan) -> None:
+        self.name = name
+        self.driver = create_driver(config, validated=True)
+        self.plan = plan
+        self.exchange_id = uuid.uuid4().hex
+        self.is_pushed = False
+
+    async def push(self) -> None:
+        # The bundle is pushed once per relay, destinations behind the relay
+        # receive their exchanges from the relay itself.
+        await self.driver.connect()
+        transport = self.driver.transport_cls(self.driver)
+        with tempfile.TemporaryDirectory(prefix="hidori-relay-") as directory:
+            bundle_path = pathlib.Path(directory) / "bundle"
+            build_relay_bundle(bundle_path, self.plan)
+            messages = await transport.push(self.exchange_id, bundle_path)
+
+        self.is_pushed = not any(m.type == "error" for m in messages)
+        if messages:
+            printer = ConsolePrinter(user=self.driver.user, target=self.name)
+            printer.print_all(messages)
+
+    def get_worker_command(self) -> str:
+        transport = self.driver.transport_cls(self.driver)
+        return transport.get_remote_command(self.exchange_id, RELAY_WORKER_COMMAND)
+
+    def get_failure_events(self) -> Iterator[dict[str, Any]]:
+        # Destinations behind a relay that couldn't be pushed are reported as
+        # failed by the coordinator, just like those that failed in a worker.
+        started_at = time.time()
+        message = Message("error", "system", f"relay {self.name} could not be pushed")
+        for destination in self.plan.destinations:
+            user = create_driver(destination.config, validated=True).user
+            yield {
+                "event": "messages",
+                "user": user,
+                "target": destination.name,
+                "messages": [message.to_dict()],
+            }
+            yield {
+                "event": "result",
+                "user": user,
+                "host": destination.name,
+                "phase": "push",
+                "task": None,
+                "counts": {"error": 1},
+                "started_at": started_at,
+                "duration": 0.0,
+                "status": "error",
+            }
+
+        if self.plan.config["on_fail"] == "abort-all":
+            yield {"event": "aborted"}
@@ -0,0 +1,80 @@
+import functools
+import json
+import re
+from typing import Any, Callable, Mapping, Sequence
+
+from hidori_pipelines.pipeline import PipelineStep
+
+VARIABLE_PATTERN = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+# Steps rendered for the most recent combinations of values are kept, so
+# destinations that share their values share their steps, while inventories
+# with a distinct value per destination don't keep a copy of each.
+RENDER_CACHE_SIZE = 1024
+
+
+class Template:
+    # Templates are parsed once into literal chunks and variable names that
+    # alternate, so rendering is a single join.
+    __slots__ = ("_chunks", "_names", "variables")
+
+    def __init__(self, text: str) -> None:
+        parts = VARIABLE_PATTERN.split(text)
+        self._chunks = tuple(parts[0::2])
+        self._names = tuple(parts[1::2])
+        self.variables = tuple(sorted(set(self._names)))
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        # Templates of steps are encoded JSON, where variables may only be
+        # placed within strings, so values are escaped as JSON strings.
+        rendered = [self._chunks[0]]
+        for name, chunk in zip(self._names, self._chunks[1:]):
+            rendered.append(json.dumps(str(values[name]))[1:-1])
+            rendered.append(chunk)
+        return "".join(rendered)
+
+
+def has_variables(task_data: dict[str, Any]) -> bool:
+    return VARIABLE_PATTERN.search(json.dumps(task_data)) is not None
+
+
+class StepRenderer:
+    # Steps with variables are parsed once per group, and each of them is
+    # rendered once for every distinct combination of values it uses.
+    def __init__(self, steps: Sequence[PipelineStep]) -> None:
+        self._steps = tuple(steps)
+        self.templates: list[Template | None] = []
+        self._renders: list[Callable[[tuple[Any, ...]], PipelineStep] | None] = []
+        variables: set[str] = set()
+        for step in steps:
+            template = Template(step.task_bytes.decode())
+            if not template.variables:
+                self.templates.append(None)
+                self._renders.append(None)
+                continue
+
+            self.templates.append(template)
+            render = functools.partial(render_step, type(step), template)
+            self._renders.append(functools.lru_cache(RENDER_CACHE_SIZE)(render))
+            variables.update(template.variables)
+
+        self.variables = tuple(sorted(variables))
+
+    def render(self, values: Mapping[str, Any]) -> tuple[PipelineStep, ...]:
+        if not self.variables:
+            return self._steps
+
+        steps = []
+        for step, template, render in zip(self._steps, self.templates, self._renders):
+            if template is None or render is None:
+                steps.append(step)
+            else:
+                steps.append(render(tuple(values[v] for v in template.variables)))
+        return tuple(steps)
+
+
+def render_step(
+    step_cls: type[PipelineStep], template: Template, key: tuple[Any, ...]
+) -> PipelineStep:
+    values = dict(zip(template.variables, key))
+    return step_cls.from_bytes(template.render(values).encode())
@@ -0,0 +1,231 @@
+import argparse
+import asyncio
+import dataclasses
+import json
+import pathlib
+import shlex
+import sys
+import tempfile
+from typing import TYPE_CHECKING, Any, Mapping, Sequence
+
+from hidori_common import ConsolePrinter
+from hidori_core.utils import Message
+from hidori_pipelines.group import AbortSummary
+
+if TYPE_CHECKING:
+    from hidori_common.typings import JournalRun
+    from hidori_pipelines.pipeline import Pipeline
+    from hidori_pipelines.plan import PipelinePlan
+
+WORKER_MODULE = "hidori_pipelines.workers"
+ABORT_COMMAND = b"abort\n"
+
+# Events hold all messages of a step, e.g. the capped output of a command,
+# so lines read from workers may be much longer than the default limit.
+EVENT_SIZE_LIMIT = 64 * 1024 * 1024
+
+
+# Workers stream their events to the coordinator as JSON lines on stdout,
+# and the coordinator sends commands back to them on stdin. Events of one
+# destination are written at once, so output of workers never interleaves.
+def write_event(event: dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(event) + "\n")
+    sys.stdout.flush()
+
+
+def get_worker_command(plan_path: pathlib.Path | str, index: int, count: int) -> str:
+    return shlex.join(
+        [
+            sys.executable,
+            "-m",
+            WORKER_MODULE,
+            str(plan_path),
+            "--shard",
+            f"{index}/{count}",
+        ]
+    )
+
+
+class EventJournalRun:
+    # Stands for the journal run of the coordinator, so results are recorded
+    # by the coordinator no matter where the worker runs.
+    def record(self, **result: Any) -> None:
+        write_event({"event": "result", **result})
+
+    def finish(self) -> None:
+        pass
+
+
+class Coordinator:
+    def __init__(
+        self,
+        commands: Mapping[str, str],
+        journal_run: "JournalRun | None" = None,
+    ) -> None:
+        self._commands = commands
+        self._journal_run = journal_run
+        self._processes: list[asyncio.subprocess.Process] = []
+        self._aborted = False
+        self._interrupted: list[str] = []
+        self._completed: list[str] = []
+
+    @property
+    def aborted(self) -> bool:
+        return self._aborted
+
+    @property
+    def abort_summary(self) -> AbortSummary | None:
+        if not self._aborted:
+            return None
+        return AbortSummary(self._interrupted, self._completed)
+
+    async def run(self) -> None:
+        # Group may be aborted before any worker is started.
+        if self._aborted:
+            return
+
+        for command in self._commands.values():
+            self._processes.append(
+                await asyncio.create_subprocess_shell(
+                    command,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    limit=EVENT_SIZE_LIMIT,
+                )
+            )
+
+        codes = await asyncio.gather(*map(self._relay, self._processes))
+        failed = [name for name, code in zip(self._commands, codes) if code]
+        if failed:
+            raise RuntimeError(f"{', '.join(failed)} exited with an error")
+
+    def abort(self) -> None:
+        # With abort-all, a failure in one shard stops all of them.
+        if self._aborted:
+            return
+
+        self._aborted = True
+        for process in self._processes:
+            if process.returncode is None and process.stdin is not None:
+                try:
+                    process.stdin.write(ABORT_COMMAND)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+    async def _relay(self, process: asyncio.subprocess.Process) -> int:
+        assert process.stdout
+        async for line in process.stdout:
+            self.handle_event(json.loads(line))
+        return await process.wait()
+
+    def handle_event(self, event: dict[str, Any]) -> None:
+        event_type = event.pop("event")
+        if event_type == "messages":
+            printer = ConsolePrinter(user=event["user"], target=event["target"])
+            printer.print_all([Message.from_dict(m) for m in event["messages"]])
+        elif event_type == "result" and self._journal_run is not None:
+            self._journal_run.record(**event)
+        elif event_type == "aborted":
+            self.abort()
+        elif event_type == "summary":
+            self._interrupted.extend(event["interrupted"])
+            self._completed.extend(event["completed"])
+
+
+async def run_workers(
+    plan: "PipelinePlan", workers: int, journal_run: "JournalRun | None" = None
+) -> AbortSummary | None:
+    from hidori_pipelines.relays import Relay
+
+    # Destinations of the controller are sharded between local workers,
+    # each running its own share on its own event loop, while destinations
+    # behind relays are run by a worker on each relay.
+    direct, relayed = plan.split_relays()
+    relays = [Relay(name, plan.relays[name], p) for name, p in relayed.items()]
+    commands = {}
+    with tempfile.TemporaryDirectory(prefix="hidori-workers-") as directory:
+        if len(direct.destinations):
+            plan_path = pathlib.Path(directory) / "plan.json"
+            direct.dump(plan_path)
+            for index in range(workers):
+                commands[f"worker {index}"] = get_worker_command(
+                    plan_path, index, workers
+                )
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for relay in relays:
+                    tg.create_task(relay.push())
+            for relay in relays:
+                if relay.is_pushed:
+                    commands[f"relay {relay.name}"] = relay.get_worker_command()
+            coordinator = Coordinator(commands, journal_run)
+            failed = [relay for relay in relays if not relay.is_pushed]
+            for relay in failed:
+                for event in relay.get_failure_events():
+                    coordinator.handle_event(event)
+            await coordinator.run()
+            if failed:
+                names = ", ".join(f"relay {relay.name}" for relay in failed)
+                raise RuntimeError(f"{names} could not be pushed")
+            return coordinator.abort_summary
+        finally:
+            async with asyncio.TaskGroup() as tg:
+                for relay in relays:
+                    tg.create_task(relay.driver.disconnect())
+
+
+async def run_worker(plan_path: pathlib.Path, index: int, count: int) -> None:
+    from hidori_pipelines.group import PipelineGroup
+    from hidori_pipelines.plan import PipelinePlan
+
+    plan = PipelinePlan.from_path(plan_path)
+    plan = dataclasses.replace(plan, destinations=plan.destinations.shard(index, count))
+    abort_all = plan.config["on_fail"] == "abort-all"
+
+    def sink(pipeline: "Pipeline", messages: list[Message]) -> None:
+        write_event(
+            {
+                "event": "messages",
+                "user": pipeline.driver.user,
+                "target": pipeline.target,
+                "messages": [message.to_dict() for message in messages],
+            }
+        )
+        if abort_all and pipeline.has_failed:
+            write_event({"event": "aborted"})
+
+    group = PipelineGroup(plan, journal_run=EventJournalRun(), sink=sink)
+
+    reader = asyncio.StreamReader()
+    await asyncio.get_running_loop().connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+    )
+
+    async def read_commands() -> None:
+        async for line in reader:
+            if line == ABORT_COMMAND:
+                group.abort()
+
+    commands = asyncio.create_task(read_commands())
+    try:
+        await group.run()
+    finally:
+        commands.cancel()
+
+    if (summary := group.abort_summary) is not None:
+        write_event({"event": "summary", **summary._asdict()})
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog=f"python -m {WORKER_MODULE}")
+    parser.add_argument("plan_path", type=pathlib.Path)
+    parser.add_argument("--shard", required=True, help="INDEX/COUNT")
+    args = parser.parse_args(argv)
+
+    index, _, count = args.shard.partition("/")
+    asyncio.run(run_worker(args.plan_path, int(index), int(count)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from hidori_runner.drivers.base import create_driver
+from hidori_runner.drivers.base import create_driver, resolve_destination
 from hidori_runner.drivers.ssh import SSHDriver
 
-__all__ = ["SSHDriver", "create_driver"]
+__all__ = ["SSHDriver", "create_driver", "resolve_destination"]
@@ -9,6 +9,8 @@ from typing import Any, Literal, Self
 
 from hidori_common.typings import Pipeline, Transport
 from hidori_core.schema.base import Schema
+from hidori_core.utils import MessageList
+from hidori_runner.drivers.bundle import get_bytecode_bundle, get_core_path
 from hidori_runner.drivers.utils import create_call_dir, create_pipeline_dir
 
 ExchangeStatus = Literal["pending", "running", "failed"]
@@ -24,7 +26,8 @@ class PreparedExchange:
     localpath: pathlib.Path
     transport: Transport[Any]
     status: ExchangeStatus = dataclasses.field(default="pending")
-    messages: list[dict[str, str]] = dataclasses.field(default_factory=list)
+    pushed: bool = dataclasses.field(default=False)
+    messages: MessageList = dataclasses.field(default_factory=MessageList)
 
     @classmethod
     def gen_id(cls) -> str:
@@ -32,7 +35,7 @@ class PreparedExchange:
 
     @property
     def has_errors(self) -> bool:
-        return any([m["type"] == "error" for m in self.messages])
+        return self.messages.count("error") > 0
 
 
 class Driver:
@@ -60,8 +63,12 @@ class Driver:
             )
         DRIVERS_REGISTRY[name] = cls
 
-    def __init__(self, config: Any) -> None:
-        validated_config = self.schema.validate(config)
+    def __init__(self, config: Any, *, validated: bool = False) -> None:
+        validated_config = config if validated else self.schema.validate(config)
+        self.python_cache_tag: str | None = None
+        self.handshake_time: float | None = None
+        self.keep_alive: float | None = None
+        self._connected = False
         self.init(validated_config)
 
     @abc.abstractmethod
@@ -78,6 +85,31 @@ class Driver:
     def target(self) -> str:
         ...
 
+    async def connect(self: Self, keep_alive: float | None = None) -> None:
+        # Connection is established up front, so it can happen in parallel
+        # for many destinations rather than as part of the first push.
+        # With keep_alive, it is expected to stay idle for that many seconds
+        # between runs and transports keep it open for at least as long.
+        if self._connected:
+            return
+
+        transport = self.transport_cls(self)
+        self._connected = True
+        self.keep_alive = keep_alive
+        # The target interpreter is detected by the same command, and it
+        # determines whether the core can be shipped as precompiled bytecode.
+        connection = await transport.connect()
+        if connection is not None:
+            self.handshake_time, self.python_cache_tag = connection
+
+    async def disconnect(self: Self) -> None:
+        if not self._connected:
+            return
+
+        transport = self.transport_cls(self)
+        self._connected = False
+        await transport.disconnect()
+
     def prepare_pipeline(self: Self, pipeline: Pipeline) -> PreparedExchange:
         exchange_id = PreparedExchange.gen_id()
         localpath = create_pipeline_dir(exchange_id, self.target)
@@ -100,17 +132,48 @@ class Driver:
             id=exchange_id, localpath=localpath, transport=self.transport_cls(self)
         )
 
-    async def finalize(self, exchange: PreparedExchange) -> None:
+    def share_exchange(self: Self, exchange: PreparedExchange) -> PreparedExchange:
+        # Exchanges prepared for a call are the same for all destinations
+        # with the same interpreter, so a single local copy is pushed to each.
+        # Each destination gets its own remote directory, since several users
+        # may share the same host.
+        return PreparedExchange(
+            id=PreparedExchange.gen_id(),
+            localpath=exchange.localpath,
+            transport=self.transport_cls(self),
+        )
+
+    async def finalize(
+        self, exchange: PreparedExchange, task_id: str | None = None
+    ) -> None:
         transport = exchange.transport
-        push_messages = await transport.push(exchange.id, exchange.localpath)
-        exchange.messages.extend(push_messages)
+        if task_id is None:
+            push_messages = await transport.push(exchange.id, exchange.localpath)
+            exchange.messages.extend(push_messages)
+            exchange.pushed = not exchange.has_errors
+        else:
+            # The first task is run right after the exchange is pushed.
+            exchange.status = "running"
+            exchange.pushed, invoke_messages = await transport.push_and_invoke(
+                exchange.id, exchange.localpath, "executor.py", task_id
+            )
+            exchange.messages.extend(invoke_messages)
+
         if exchange.has_errors:
             exchange.status = "failed"
 
     async def invoke_executor(self, exchange: PreparedExchange, task_id: str) -> None:
         exchange.status = "running"
         transport = exchange.transport
-        invoke_messages = await transport.invoke(exchange.id, "executor.py", task_id)
+        found, invoke_messages = await transport.invoke(
+            exchange.id, "executor.py", task_id
+        )
+        if not found:
+            # Exchange is gone from the destination since it was pushed, so
+            # it is pushed again along with the step.
+            exchange.pushed, invoke_messages = await transport.push_and_invoke(
+                exchange.id, exchange.localpath, "executor.py", task_id
+            )
         exchange.messages.extend(invoke_messages)
         if exchange.has_errors:
             exchange.status = "failed"
@@ -119,7 +182,11 @@ class Driver:
         # TODO: Driver should only pick required modules.
         # Use MODULES_REGISTRY and delivered modules for that
         # It will also allow third parties to define their own modules.
-        self._copy_core_tree(localpath / "hidori_core")
+        bundle_path = get_bytecode_bundle(self.python_cache_tag)
+        if bundle_path is None:
+            self._copy_core_tree(localpath / "hidori_core")
+        else:
+            shutil.copytree(bundle_path, localpath / "hidori_core", dirs_exist_ok=True)
 
     def prepare_executor(self, localpath: pathlib.Path) -> None:
         # TODO: Use appropriate executor instead of a hardcoded remote
@@ -130,8 +197,7 @@ class Driver:
     def prepare_tasks(self, localpath: pathlib.Path, pipeline: Pipeline) -> None:
         for step in pipeline.steps:
             local_task_path = localpath / f"task-{step.task_id}.json"
-            with open(local_task_path, "w") as task_file:
-                json.dump(step.task_json, task_file)
+            local_task_path.write_bytes(step.task_bytes)
 
     def prepare_call_task(
         self, localpath: pathlib.Path, task_id: str, task_json: dict[str, Any]
@@ -141,12 +207,19 @@ class Driver:
             json.dump(task_json, task_file)
 
     def _copy_core_tree(self, dest: pathlib.Path) -> None:
-        core_module = importlib.import_module("hidori_core")
-        core_package_path = pathlib.Path(core_module.__path__[0])
+        core_package_path = get_core_path()
         ignores = shutil.ignore_patterns("*.pyc", "__pycache__")
         shutil.copytree(core_package_path, dest, ignore=ignores, dirs_exist_ok=True)
 
 
-def create_driver(destination_data: dict[str, Any]) -> Driver:
-    driver_name = destination_data.pop("driver", DEFAULT_DRIVER)
-    return DRIVERS_REGISTRY[driver_name](destination_data)
+def resolve_destination(destination_data: dict[str, Any]) -> dict[str, Any]:
+    driver_name = destination_data.get("driver", DEFAULT_DRIVER)
+    driver_cls = DRIVERS_REGISTRY[driver_name]
+    config = {k: v for k, v in destination_data.items() if k != "driver"}
+    return {"driver": driver_name, **driver_cls.schema.validate(config)}
+
+
+def create_driver(destination_data: dict[str, Any], validated: bool = False) -> Driver:
+    driver_name = destination_data.get("driver", DEFAULT_DRIVER)
+    config = {k: v for k, v in destination_data.items() if k != "driver"}
+    return DRIVERS_REGISTRY[driver_name](config, validated=validated)
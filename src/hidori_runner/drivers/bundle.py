@@ -0,0 +1,120 @@
+import functools
+import hashlib
+import importlib
+import os
+import pathlib
+import py_compile
+import shutil
+import sys
+import tarfile
+import tempfile
+import threading
+
+from hidori_runner.drivers.utils import get_bundles_path
+
+# Archives are built on executor threads, concurrent pushes wait for the one
+# that builds it instead of building the same archive again.
+CORE_ARCHIVE_LOCK = threading.Lock()
+
+
+def get_core_path() -> pathlib.Path:
+    core_module = importlib.import_module("hidori_core")
+    return pathlib.Path(core_module.__path__[0])
+
+
+def iter_core_sources() -> list[pathlib.Path]:
+    core_path = get_core_path()
+    return sorted(
+        path
+        for path in core_path.rglob("*")
+        if path.is_file()
+        and "__pycache__" not in path.parts
+        and path.suffix not in (".pyc", ".pyo")
+    )
+
+
+@functools.cache
+def get_core_hash() -> str:
+    core_path = get_core_path()
+    core_hash = hashlib.sha256()
+    for path in iter_core_sources():
+        core_hash.update(str(path.relative_to(core_path)).encode())
+        core_hash.update(b"\0")
+        core_hash.update(path.read_bytes())
+        core_hash.update(b"\0")
+    return core_hash.hexdigest()
+
+
+def get_bytecode_bundle(cache_tag: str | None) -> pathlib.Path | None:
+    # Bytecode can only be compiled for the running interpreter, so targets
+    # with any other Python version receive the sources instead.
+    if cache_tag is None or cache_tag != sys.implementation.cache_tag:
+        return None
+
+    bundle_path = get_bundles_path() / f"{cache_tag}-{get_core_hash()[:16]}"
+    if not bundle_path.exists():
+        build_bytecode_bundle(bundle_path)
+    return bundle_path / "hidori_core"
+
+
+def build_bytecode_bundle(bundle_path: pathlib.Path) -> None:
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    core_path = get_core_path()
+    build_path = pathlib.Path(tempfile.mkdtemp(dir=bundle_path.parent))
+    try:
+        for path in iter_core_sources():
+            relative_path = path.relative_to(core_path)
+            dest = build_path / "hidori_core" / relative_path
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if path.suffix == ".py":
+                # Sourceless bytecode is placed where the source would be.
+                py_compile.compile(
+                    str(path),
+                    cfile=str(dest.with_suffix(".pyc")),
+                    dfile=str(pathlib.Path("hidori_core") / relative_path),
+                    doraise=True,
+                )
+            else:
+                shutil.copyfile(path, dest)
+
+        # Concurrent builds of the same bundle are identical, so whichever
+        # finishes first is kept and the others are discarded.
+        try:
+            os.rename(build_path, bundle_path)
+        except OSError:
+            if not bundle_path.exists():
+                raise
+    finally:
+        shutil.rmtree(build_path, ignore_errors=True)
+
+
+def get_core_archive(cache_tag: str | None) -> pathlib.Path:
+    # The core shipped to a destination is the same for every exchange, so
+    # it is compressed once and the archive is reused by compressed pushes.
+    with CORE_ARCHIVE_LOCK:
+        bundle_path = get_bytecode_bundle(cache_tag)
+        kind = "source" if bundle_path is None else cache_tag
+        archive_path = get_bundles_path() / f"{kind}-{get_core_hash()[:16]}.tar.gz"
+        if not archive_path.exists():
+            build_core_archive(archive_path, bundle_path)
+    return archive_path
+
+
+def build_core_archive(
+    archive_path: pathlib.Path, bundle_path: pathlib.Path | None
+) -> None:
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, build_path = tempfile.mkstemp(dir=archive_path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f, tarfile.open(fileobj=f, mode="w:gz") as tar:
+            if bundle_path is None:
+                core_path = get_core_path()
+                for path in iter_core_sources():
+                    relative_path = path.relative_to(core_path)
+                    tar.add(path, arcname=f"./hidori_core/{relative_path}")
+            else:
+                tar.add(bundle_path, arcname="./hidori_core")
+        os.replace(build_path, archive_path)
+    finally:
+        if os.path.exists(build_path):
+            os.remove(build_path)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from hidori_core.schema import Schema
 from hidori_runner import transports
@@ -10,6 +10,7 @@ class SSHSchema(Schema):
     target: str
     user: str
     port: Optional[str]
+    compression: Optional[Literal["none", "ssh", "gzip", "auto"]]
 
 
 class SSHDriver(Driver, name="ssh"):
@@ -20,6 +21,7 @@ class SSHDriver(Driver, name="ssh"):
         self.ssh_target = config["target"]
         self.ssh_user = config["user"]
         self.ssh_port = config.get("port", "22")
+        self.ssh_compression = config.get("compression", "auto")
 
     @property
     def user(self) -> str:
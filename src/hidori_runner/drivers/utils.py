@@ -11,6 +11,10 @@ def get_calls_path() -> pathlib.Path:
     return get_cache_home() / "calls"
 
 
+def get_bundles_path() -> pathlib.Path:
+    return get_cache_home() / "bundles"
+
+
 def create_pipeline_dir(exchange_id: str, target: str) -> pathlib.Path:
     dirname = f"hidori-{exchange_id}"
     path = get_pipelines_path() / target / dirname
@@ -4,7 +4,7 @@ import sys
 import traceback
 from typing import NoReturn
 
-from hidori_core.modules import MODULES_REGISTRY
+from hidori_core.modules import get_module
 from hidori_core.schema import Schema
 from hidori_core.schema import errors as schema_errors
 from hidori_core.utils import Messenger
@@ -56,7 +56,7 @@ def main() -> None:
             system_messenger, f"internal error - invalid task structure: {e}"
         )
 
-    module = MODULES_REGISTRY.get(data["data"]["module"])
+    module = get_module(data["data"]["module"])
     if module is None:
         exit_with_error(
             system_messenger, "internal error - specified module does not exist"
@@ -1,38 +1,124 @@
 import asyncio
+import json
+import math
+import os
 import pathlib
-from typing import TYPE_CHECKING
+import re
+import shlex
+import shutil
+import signal
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any
 
 from hidori_common.dirs import get_tmp_home
-from hidori_common.typings import Transport
+from hidori_common.typings import Connection, Transport
+from hidori_core.utils import Message
 from hidori_runner.transports.utils import get_messages
 
 if TYPE_CHECKING:
     # TODO: Seems to be https://github.com/PyCQA/pyflakes/issues/567
     from hidori_runner.drivers import SSHDriver  # noqa: F401
 
-SSH_OPTIONS = " ".join(
-    [
-        "-o ControlMaster=auto",
-        "-o ControlPath=~/.ssh/control-%r@%h:%p",
-        "-o ControlPersist=yes",
-    ]
-)
+# Masters are closed once the run is over, the timeout only makes sure
+# that they don't outlive a controller that was killed. Drivers that are kept
+# connected between runs extend it by the time they are expected to be idle.
+CONTROL_PERSIST = 60
+
+CACHE_TAG_PATTERN = re.compile(r"^[a-z]+-\d+$")
+
+# Compression is used for destinations whose handshake took longer than
+# this, as they are rarely on the same network as the controller.
+AUTO_COMPRESSION_HANDSHAKE_TIME = 0.15
+
+# Exit codes of the remote command when the streamed exchange couldn't be
+# unpacked or when the exchange to invoke is gone, 255 is used by ssh itself
+# when the connection failed.
+PUSH_FAILED_CODE = 97
+EXCHANGE_MISSING_CODE = 98
+SSH_FAILED_CODE = 255
+
+# Cancelled commands are killed if they don't exit in time after SIGTERM.
+TERMINATE_TIMEOUT = 5.0
 
 
 async def run_command(popen_cmd: str) -> tuple[bool, str]:
+    returncode, output = await run_command_status(popen_cmd)
+    return returncode == 0, output
+
+
+async def run_command_status(popen_cmd: str) -> tuple[int | None, str]:
+    # Commands run in a session of their own, so all processes of a pipeline
+    # can be terminated together when the command is cancelled.
     proc = await asyncio.create_subprocess_shell(
         popen_cmd,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
     )
-    stdout, stderr = await proc.communicate()
+    try:
+        stdout, stderr = await proc.communicate()
+    except asyncio.CancelledError:
+        await terminate_process(proc)
+        raise
     stdout, stderr = stdout.strip(), stderr.strip()
     if proc.returncode == 0:
         output = stdout
     else:
         output = stderr if stderr else stdout
 
-    return proc.returncode == 0, (output or b"").decode()
+    return proc.returncode, (output or b"").decode()
+
+
+async def terminate_process(proc: asyncio.subprocess.Process) -> None:
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(proc.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(proc.wait(), TERMINATE_TIMEOUT)
+            return
+        except asyncio.TimeoutError:
+            continue
+
+
+class ControlMasters:
+    # Control sockets of a run are kept in a directory of their own, which is
+    # removed once the last master is closed.
+    def __init__(self) -> None:
+        self._path: pathlib.Path | None = None
+        self._connections = 0
+
+    @property
+    def path(self) -> pathlib.Path:
+        if self._path is None:
+            self._path = pathlib.Path(tempfile.mkdtemp(prefix="hidori-ssh-"))
+        return self._path
+
+    def acquire(self) -> None:
+        self._connections += 1
+
+    def release(self) -> None:
+        self._connections -= 1
+        if self._connections == 0 and self._path is not None:
+            shutil.rmtree(self._path, ignore_errors=True)
+            self._path = None
+
+
+CONTROL_MASTERS = ControlMasters()
+
+
+def get_ssh_options(persist: int = CONTROL_PERSIST) -> str:
+    return " ".join(
+        [
+            "-o ControlMaster=auto",
+            # %C is a hash of the connection details, so paths are short
+            # enough for unix sockets.
+            f"-o ControlPath={CONTROL_MASTERS.path}/%C",
+            f"-o ControlPersist={persist}",
+        ]
+    )
 
 
 def get_exchange_dir_path(exchange_id: str) -> pathlib.Path:
@@ -40,16 +126,76 @@ def get_exchange_dir_path(exchange_id: str) -> pathlib.Path:
 
 
 class SSHTransport(Transport["SSHDriver"], name="ssh"):
-    async def push(
-        self, exchange_id: str, source: pathlib.Path
-    ) -> list[dict[str, str]]:
+    def _get_ssh_options(self) -> str:
+        # Every command may have to open the master again if it was lost, so
+        # all of them request the same persist time.
+        persist = CONTROL_PERSIST
+        if self._driver.keep_alive is not None:
+            persist += math.ceil(self._driver.keep_alive)
+        # Compression of ssh applies to the master connection, so it is
+        # requested by every command rather than decided per push.
+        if self._driver.ssh_compression == "ssh":
+            return f"{get_ssh_options(persist)} -C"
+        return get_ssh_options(persist)
+
+    def _get_compression(self) -> str:
+        compression = self._driver.ssh_compression
+        if compression == "auto":
+            handshake_time = self._driver.handshake_time
+            if (
+                handshake_time is not None
+                and handshake_time >= AUTO_COMPRESSION_HANDSHAKE_TIME
+            ):
+                return "gzip"
+            return "none"
+        return compression
+
+    async def connect(self) -> Connection | None:
+        ssh_user = self._driver.ssh_user
+        ssh_target = self._driver.ssh_target
+        ssh_port = self._driver.ssh_port
+
+        # The first command opens the master connection that is reused by
+        # all following commands, so the handshake is paid only here. It
+        # prints the cache tag of the target interpreter along the way, which
+        # is left out when there is no python3.
+        CONTROL_MASTERS.acquire()
+        cmd = (
+            f"ssh {self._get_ssh_options()} -qT -p {ssh_port} {ssh_user}@{ssh_target} "
+            "\"python3 -c 'import sys; print(sys.implementation.cache_tag)' "
+            '2>/dev/null || true"'
+        )
+        start = time.perf_counter()
+        success, output = await run_command(cmd)
+        if not success:
+            return None
+
+        elapsed = time.perf_counter() - start
+        cache_tag = output if CACHE_TAG_PATTERN.match(output) else None
+        return Connection(elapsed, cache_tag)
+
+    async def disconnect(self) -> None:
+        ssh_user = self._driver.ssh_user
+        ssh_target = self._driver.ssh_target
+        ssh_port = self._driver.ssh_port
+
+        cmd = (
+            f"ssh {self._get_ssh_options()} -q -O exit -p {ssh_port} "
+            f"{ssh_user}@{ssh_target}"
+        )
+        try:
+            await run_command(cmd)
+        finally:
+            CONTROL_MASTERS.release()
+
+    async def push(self, exchange_id: str, source: pathlib.Path) -> list[Message]:
         ssh_user = self._driver.ssh_user
         ssh_target = self._driver.ssh_target
         ssh_port = self._driver.ssh_port
         exchange_path = get_exchange_dir_path(exchange_id)
 
         cmd = (
-            f"scp {SSH_OPTIONS} -prq -P {ssh_port} {source} "
+            f"scp {self._get_ssh_options()} -prq -P {ssh_port} {source} "
             f"{ssh_user}@{ssh_target}:{exchange_path}"
         )
         # TO THE STARS!
@@ -58,16 +204,114 @@ class SSHTransport(Transport["SSHDriver"], name="ssh"):
 
     async def invoke(
         self, exchange_id: str, path: str, args: str
-    ) -> list[dict[str, str]]:
+    ) -> tuple[bool, list[Message]]:
         ssh_user = self._driver.ssh_user
         ssh_target = self._driver.ssh_target
         ssh_port = self._driver.ssh_port
         invoked_path = get_exchange_dir_path(exchange_id) / path
 
+        # Temporary directory of the destination may have been cleared since
+        # the push, e.g. by a reboot, which is told apart from other errors.
+        cmd = (
+            f"ssh {self._get_ssh_options()} -qT -p {ssh_port} "
+            f'{ssh_user}@{ssh_target} "test -f {invoked_path} '
+            f'|| exit {EXCHANGE_MISSING_CODE}; python3 {invoked_path} {args}"'
+        )
+        returncode, output = await run_command_status(cmd)
+        if returncode == EXCHANGE_MISSING_CODE:
+            return False, []
+        return True, get_messages(output, self.name, ignore_parse_error=returncode == 0)
+
+    async def push_and_invoke(
+        self, exchange_id: str, source: pathlib.Path, path: str, args: str
+    ) -> tuple[bool, list[Message]]:
+        ssh_user = self._driver.ssh_user
+        ssh_target = self._driver.ssh_target
+        ssh_port = self._driver.ssh_port
+        exchange_path = get_exchange_dir_path(exchange_id)
+        invoked_path = exchange_path / path
+
+        # The exchange is streamed over the same connection that runs the
+        # executor, which saves a round trip compared to push and invoke.
+        if self._get_compression() == "gzip":
+            from hidori_runner.drivers.bundle import get_core_archive
+
+            # Concatenated archives are read with --ignore-zeros, the core is
+            # taken from a cached archive and only the rest is compressed.
+            # The archive may have to be built first, which is done on a thread
+            # so pushes to other destinations aren't held up.
+            loop = asyncio.get_running_loop()
+            core_archive = await loop.run_in_executor(
+                None, get_core_archive, self._driver.python_cache_tag
+            )
+            archive_cmd = (
+                f"{{ cat {core_archive}; "
+                f"tar -C {source} --exclude=./hidori_core -czf - .; }}"
+            )
+            extract_flags = "-xzif"
+        else:
+            archive_cmd = f"tar -C {source} -cf - ."
+            extract_flags = "-xf"
+
         cmd = (
-            f"ssh {SSH_OPTIONS} -qT -p {ssh_port} "
-            f"{ssh_user}@{ssh_target} python3 {invoked_path} "
-            f"{args}"
+            f"{archive_cmd} | "
+            f"ssh {self._get_ssh_options()} -qT -p {ssh_port} {ssh_user}@{ssh_target} "
+            f'"mkdir -p {exchange_path} && tar {extract_flags} - -C {exchange_path} '
+            f'|| exit {PUSH_FAILED_CODE}; python3 {invoked_path} {args}"'
+        )
+        returncode, output = await run_command_status(cmd)
+        pushed = returncode not in (PUSH_FAILED_CODE, SSH_FAILED_CODE)
+        return pushed, get_messages(
+            output, self.name, ignore_parse_error=returncode == 0
+        )
+
+    def get_remote_command(self, exchange_id: str, command: str) -> str:
+        ssh_user = self._driver.ssh_user
+        ssh_target = self._driver.ssh_target
+        ssh_port = self._driver.ssh_port
+        exchange_path = get_exchange_dir_path(exchange_id)
+
+        # Command is run from the pushed exchange, with its stdin and stdout
+        # kept open for the caller.
+        return (
+            f"ssh {self._get_ssh_options()} -qT -p {ssh_port} {ssh_user}@{ssh_target} "
+            f"{shlex.quote(f'cd {exchange_path} && {command}')}"
+        )
+
+    async def get_file_signature(
+        self, exchange_id: str, path: str, digest: str
+    ) -> tuple[dict[str, Any] | None, list[Message]]:
+        # Block checksums of the file on the destination are computed by the
+        # pushed core, signature is None when the file doesn't exist yet.
+        # Only the digest is sent back when the file already has the content.
+        cmd = self.get_remote_command(
+            exchange_id,
+            f"python3 -m hidori_core.utils.delta prepare {shlex.quote(path)} {digest}",
         )
         success, output = await run_command(cmd)
-        return get_messages(output, self.name, ignore_parse_error=success)
+        if success:
+            try:
+                return json.loads(output), []
+            except json.JSONDecodeError:
+                pass
+
+        messages = get_messages(output, self.name, ignore_parse_error=False)
+        return None, messages or [
+            Message("error", "system", f"unable to read signature of {path}")
+        ]
+
+    async def push_file(
+        self, exchange_id: str, source: pathlib.Path, path: str
+    ) -> list[Message]:
+        # Single file is pushed to a path relative to the pushed exchange.
+        remote_path = pathlib.PurePosixPath(path)
+        cmd = self.get_remote_command(
+            exchange_id,
+            f"mkdir -p {shlex.quote(str(remote_path.parent))} "
+            f"&& cat > {shlex.quote(path)}",
+        )
+        success, output = await run_command(f"{cmd} < {shlex.quote(str(source))}")
+        messages = get_messages(output, self.name, ignore_parse_error=success)
+        if not success and not messages:
+            messages.append(Message("error", "system", f"unable to push {path}"))
+        return messages
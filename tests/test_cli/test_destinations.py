@@ -0,0 +1,57 @@
+import pathlib
+
+import pytest
+
+from hidori_cli.destinations import parse_destinations
+
+
+def test_parse_single_destination():
+    assert parse_destinations("root@127.0.0.1") == [("root", "127.0.0.1")]
+
+
+def test_parse_destinations_list():
+    assert parse_destinations("root@vm1, admin@vm2,root@vm1") == [
+        ("root", "vm1"),
+        ("admin", "vm2"),
+    ]
+
+
+def test_parse_destinations_ranges():
+    assert parse_destinations("root@web[08:10]") == [
+        ("root", "web08"),
+        ("root", "web09"),
+        ("root", "web10"),
+    ]
+    assert parse_destinations("root@10.0.[1:2].[9:10]") == [
+        ("root", "10.0.1.9"),
+        ("root", "10.0.1.10"),
+        ("root", "10.0.2.9"),
+        ("root", "10.0.2.10"),
+    ]
+
+
+def test_parse_destinations_file(tmp_path: pathlib.Path):
+    path = tmp_path / "hosts"
+    path.write_text("# web servers\nroot@web[1:2]\n\nadmin@db  # primary\n")
+    assert parse_destinations(f"@{path},root@vm") == [
+        ("root", "web1"),
+        ("root", "web2"),
+        ("admin", "db"),
+        ("root", "vm"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "spec,message",
+    [
+        ("vm1", "vm1 is not a valid destination, expected user@host"),
+        ("root@", "root@ is not a valid destination, expected user@host"),
+        ("root@web[3:1]", "[3:1] is not a valid range in root@web[3:1]"),
+        (" , ", "no destinations provided"),
+    ],
+)
+def test_parse_destinations_error(spec: str, message: str):
+    with pytest.raises(ValueError) as e:
+        parse_destinations(spec)
+
+    assert str(e.value) == message
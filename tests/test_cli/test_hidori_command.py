@@ -0,0 +1,85 @@
+import argparse
+import pathlib
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from hidori_cli.commands.hidori import HidoriCommand, HidoriData
+from hidori_common.journal import Journal
+from hidori_core.utils import Message
+from hidori_runner.drivers.base import PreparedExchange
+
+
+def create_driver_mock(destination_data: dict[str, str]) -> Mock:
+    target = destination_data["target"]
+    driver = Mock(user=destination_data["user"], target=target)
+    driver.python_cache_tag = "cpython-38" if target != "old" else None
+    driver.connect = AsyncMock()
+    driver.disconnect = AsyncMock()
+    driver.prepare_call.side_effect = lambda task_id, task_json: Mock(
+        id=task_id, localpath=f"/exchanges/{driver.python_cache_tag}"
+    )
+    driver.share_exchange.side_effect = lambda exchange: PreparedExchange(
+        id=exchange.id, localpath=exchange.localpath, transport=Mock()
+    )
+
+    async def finalize(exchange: PreparedExchange, task_id: str) -> None:
+        message_type = "error" if target == "web02" else "success"
+        exchange.messages.append(Message(message_type, "Call", target))
+
+    driver.finalize = AsyncMock(side_effect=finalize)
+    return driver
+
+
+@pytest.mark.asyncio
+async def test_hidori_call_fan_out(
+    capsys: pytest.CaptureFixture[str], tmp_path: pathlib.Path
+):
+    command = HidoriCommand(argparse.ArgumentParser())
+    data = HidoriData(
+        subparser_name=None,
+        destination="root@web[01:03],root@old",
+        module="hello",
+        extra_data=[],
+        concurrency=2,
+    )
+    drivers: list[Mock] = []
+
+    def create_driver(destination_data: dict[str, str]) -> Mock:
+        drivers.append(create_driver_mock(destination_data))
+        return drivers[-1]
+
+    journal_path = tmp_path / "journal.sqlite3"
+    with patch("hidori_runner.drivers.create_driver", side_effect=create_driver), patch(
+        "hidori_common.journal.get_journal_path", return_value=journal_path
+    ):
+        await command._main(data)
+
+    assert [d.target for d in drivers] == ["web01", "web02", "web03", "old"]
+    assert [d.prepare_call.call_count for d in drivers] == [1, 0, 0, 1]
+    for driver in drivers:
+        driver.connect.assert_awaited_once()
+        driver.finalize.assert_awaited_once()
+        driver.disconnect.assert_awaited_once()
+
+    shared_exchanges = [d.share_exchange.call_args.args[0] for d in drivers]
+    assert shared_exchanges[0] is shared_exchanges[1] is shared_exchanges[2]
+    assert shared_exchanges[3] is not shared_exchanges[0]
+
+    out = capsys.readouterr().out
+    assert out.index("OK (3/4)") < out.index("web01") < out.index("ERROR (1/4)")
+    assert out.index("ERROR (1/4)") < out.index("web02")
+
+    journal = Journal(journal_path)
+    failed = journal.query_hosts(task="hello", status="error")
+    assert [(s.host, s.runs) for s in failed] == [("web02", 1)]
+
+
+def test_hidori_invalid_destination_error(capsys: pytest.CaptureFixture[str]):
+    command = HidoriCommand(argparse.ArgumentParser(prog="hidori"))
+    with pytest.raises(SystemExit) as exc_info:
+        command.run({"destination": "web01", "module": "hello", "extra_data": []})
+
+    assert exc_info.value.code == 2
+    err = capsys.readouterr().err
+    assert "hidori: error: web01 is not a valid destination, expected user@host" in err
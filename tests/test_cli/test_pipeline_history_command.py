@@ -0,0 +1,22 @@
+import argparse
+from unittest.mock import patch
+
+import pytest
+
+from hidori_cli.commands.pipeline_history import PipelineHistoryCommand, parse_since
+
+
+def test_parse_since():
+    assert parse_since("30m") == 30 * 60
+    assert parse_since("2w") == 2 * 7 * 24 * 60 * 60
+
+
+def test_pipeline_history_rejects_invalid_since(capsys: pytest.CaptureFixture[str]):
+    command = PipelineHistoryCommand(argparse.ArgumentParser(prog="hidori-pipeline"))
+    with patch("hidori_common.journal.Journal") as journal_cls:
+        with pytest.raises(SystemExit) as exc_info:
+            command.run({"since": "7x"})
+
+    assert exc_info.value.code == 2
+    assert "7x is not a valid time" in capsys.readouterr().err
+    journal_cls.assert_not_called()
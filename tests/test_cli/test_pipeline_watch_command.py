@@ -0,0 +1,36 @@
+import argparse
+import pathlib
+from unittest.mock import patch
+
+import pytest
+
+from hidori_cli.commands.pipeline_watch import PipelineWatchCommand
+
+PIPELINE = """
+[relays.bastion]
+target = "203.0.113.7"
+user = "hidori"
+
+[destinations.vm1]
+target = "10.0.0.11"
+user = "root"
+relay = "bastion"
+
+[tasks."Say hello"]
+module = "hello"
+"""
+
+
+def test_pipeline_watch_rejects_relays(
+    tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]
+):
+    pipeline_path = tmp_path / "pipeline.toml"
+    pipeline_path.write_text(PIPELINE)
+    command = PipelineWatchCommand(argparse.ArgumentParser(prog="hidori-pipeline"))
+    with patch("hidori_pipelines.PipelineGroup") as group_cls:
+        with pytest.raises(SystemExit) as exc_info:
+            command.run({"pipeline_path": pipeline_path})
+
+    assert exc_info.value.code == 2
+    assert "pipelines with relays can't be watched" in capsys.readouterr().err
+    group_cls.assert_not_called()
@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import pathlib
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+import hidori_cli
+from hidori_cli.fields.version import VersionField
+
+SRC_PATH = pathlib.Path(hidori_cli.__path__[0]).parent
+HEAVY_MODULES = [
+    "asyncio",
+    "importlib.metadata",
+    "tomllib",
+    "hidori_core",
+    "hidori_pipelines",
+    "hidori_runner",
+]
+
+
+def get_imported_modules(app_module: str) -> list[str]:
+    code = (
+        "import json, sys\n"
+        f"from {app_module} import main\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(json.dumps(sorted(sys.modules)), file=sys.stderr)"
+    )
+    env = {**os.environ, "PYTHONPATH": str(SRC_PATH)}
+    result = subprocess.run(
+        [sys.executable, "-c", code, "--help"],
+        env=env,
+        capture_output=True,
+        check=True,
+    )
+    return json.loads(result.stderr)
+
+
+@pytest.mark.parametrize(
+    "app_module", ["hidori_cli.apps.hidori", "hidori_cli.apps.pipeline"]
+)
+def test_help_does_not_import_command_dependencies(app_module: str):
+    imported = get_imported_modules(app_module)
+    for module_name in HEAVY_MODULES:
+        assert module_name not in imported
+
+
+def test_version_is_looked_up_when_requested(capsys: pytest.CaptureFixture[str]):
+    parser = argparse.ArgumentParser(prog="hidori")
+    with patch("hidori_cli.fields.version.get_version", return_value="1.2.3") as ver:
+        VersionField.add_to_parser(parser, "version", {})
+        assert ver.call_count == 0
+
+        with pytest.raises(SystemExit) as e:
+            parser.parse_args(["--version"])
+
+    assert e.value.code == 0
+    assert ver.call_count == 1
+    assert capsys.readouterr().out == "hidori 1.2.3\n"
+
+
+def test_version_not_requested():
+    parser = argparse.ArgumentParser(prog="hidori")
+    VersionField.add_to_parser(parser, "version", {})
+    assert "version" not in vars(parser.parse_args([]))
@@ -2,6 +2,7 @@ import freezegun
 import pytest
 
 from hidori_common.cli import ConsolePrinter
+from hidori_core.utils import Message
 
 
 @pytest.fixture(scope="module")
@@ -20,7 +21,7 @@ def test_print_summary_stub(
 def test_print_single_message(
     capsys: pytest.CaptureFixture[str], printer: ConsolePrinter
 ):
-    data = {"task": "Hello World", "type": "success", "message": "It worked"}
+    data = Message("success", "Hello World", "It worked")
 
     printer.print_one(data)
     output = capsys.readouterr().out.splitlines()
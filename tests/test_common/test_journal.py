@@ -0,0 +1,103 @@
+import pathlib
+import sqlite3
+
+import pytest
+
+from hidori_common.journal import HostSummary, Journal, get_hosts_query, get_status
+
+
+@pytest.fixture(scope="function")
+def journal(tmp_path: pathlib.Path):
+    journal = Journal(tmp_path / "journal.sqlite3")
+    yield journal
+    journal.close()
+
+
+def record(journal: Journal, host: str, task: str, status: str, duration: float):
+    run = journal.start_run("pipeline", "pipeline.toml")
+    run.record(
+        user="root",
+        host=host,
+        phase="task",
+        task=task,
+        counts={status: 1},
+        started_at=run.started_at,
+        duration=duration,
+    )
+    run.finish()
+
+
+@pytest.mark.parametrize(
+    "counts,status",
+    [
+        ({}, "success"),
+        ({"success": 2, "info": 1}, "success"),
+        ({"success": 1, "affected": 1}, "affected"),
+        ({"affected": 1, "error": 1}, "error"),
+    ],
+)
+def test_journal_status(counts: dict[str, int], status: str):
+    assert get_status(counts) == status
+
+
+def test_journal_records_runs_and_results(tmp_path: pathlib.Path, journal: Journal):
+    record(journal, "vm1", "Say hello", "success", 1.0)
+    journal.flush()
+
+    connection = sqlite3.connect(tmp_path / "journal.sqlite3")
+    assert connection.execute("SELECT kind, name FROM runs").fetchall() == [
+        ("pipeline", "pipeline.toml")
+    ]
+    assert connection.execute(
+        "SELECT host, phase, task, status, successes, errors FROM results"
+    ).fetchall() == [("vm1", "task", "Say hello", "success", 1, 0)]
+
+
+def test_journal_query_failed_hosts(journal: Journal):
+    record(journal, "vm1", "Install vim", "error", 1.0)
+    record(journal, "vm2", "Install vim", "success", 1.0)
+    record(journal, "vm3", "Say hello", "error", 1.0)
+    summaries = journal.query_hosts(task="Install vim", status="error")
+    assert [(s.host, s.runs, s.errors) for s in summaries] == [("vm1", 1, 1)]
+
+
+def test_journal_query_slowest_hosts(journal: Journal):
+    record(journal, "vm1", "Say hello", "success", 1.0)
+    record(journal, "vm2", "Say hello", "success", 3.0)
+    record(journal, "vm2", "Say hello", "success", 1.0)
+    record(journal, "vm3", "Say hello", "success", 0.5)
+    summaries = journal.query_hosts(slowest=True, limit=2)
+    assert [(s.host, s.runs, s.duration) for s in summaries] == [
+        ("vm2", 2, 2.0),
+        ("vm1", 1, 1.0),
+    ]
+    assert all(isinstance(s, HostSummary) for s in summaries)
+
+
+def test_journal_query_since(journal: Journal):
+    record(journal, "vm1", "Say hello", "success", 1.0)
+    assert journal.query_hosts(since=0)
+    assert journal.query_hosts(since=float("inf")) == []
+
+
+@pytest.mark.parametrize(
+    "filters,plan",
+    [
+        ({"host": "vm1"}, "USING COVERING INDEX results_host_idx (host=?)"),
+        ({"since": 0}, "USING COVERING INDEX results_time_idx (started_at>?)"),
+        (
+            {"since": 0, "status": "error"},
+            "USING COVERING INDEX results_time_idx (started_at>?)",
+        ),
+        ({"task": "Say hello"}, "USING INDEX results_task_idx (task=?)"),
+    ],
+)
+def test_journal_query_uses_index(
+    journal: Journal, filters: dict[str, object], plan: str
+):
+    query, params = get_hosts_query(
+        **{"since": None, "host": None, "task": None, "status": None, **filters},
+        slowest=False,
+    )
+    rows = journal._connection.execute(f"EXPLAIN QUERY PLAN {query}", [*params, 20])
+    assert f"SEARCH results {plan}" in [row[3] for row in rows]
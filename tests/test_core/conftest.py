@@ -0,0 +1,10 @@
+import pathlib
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def digest_cache_home(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    cache_home = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    return cache_home
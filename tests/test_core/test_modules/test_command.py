@@ -0,0 +1,99 @@
+import json
+import pathlib
+import time
+from unittest.mock import patch
+
+import pytest
+
+from hidori_core.modules import get_module
+from hidori_core.utils import Messenger
+
+
+def run_command_task(
+    data: dict[str, str], capsys: pytest.CaptureFixture
+) -> list[tuple[str, str]]:
+    module = get_module("command")
+    assert module
+    messenger = Messenger("Run command")
+    module.execute(data, messenger)
+    messenger.flush()
+    return [
+        (message["type"], message["message"])
+        for message in map(json.loads, capsys.readouterr().out.splitlines())
+    ]
+
+
+def test_command_streams_output(capsys: pytest.CaptureFixture):
+    messages = run_command_task(
+        {"command": "echo first; echo second >&2; printf last"}, capsys
+    )
+    assert messages == [
+        ("info", "first"),
+        ("info", "stderr: second"),
+        ("info", "last"),
+        ("affected", "command has been run"),
+    ]
+
+
+def test_command_exit_code(capsys: pytest.CaptureFixture):
+    messages = run_command_task({"command": "exit 3"}, capsys)
+    assert messages == [("error", "command exited with code 3")]
+
+
+def test_command_output_keeps_head_and_tail(capsys: pytest.CaptureFixture):
+    messages = run_command_task(
+        {"command": "seq 1000 1999", "output_limit": "100"}, capsys
+    )
+    # Lines are charged with their newline, so each half of the limit keeps
+    # 10 lines of 5 characters.
+    assert messages[:10] == [("info", str(n)) for n in range(1000, 1010)]
+    assert messages[10] == (
+        "info",
+        f"... {(1000 - 20) * 5} characters omitted ...",
+    )
+    assert messages[11:-1] == [("info", str(n)) for n in range(1990, 2000)]
+    assert messages[-1] == ("affected", "command has been run")
+
+
+def test_command_output_of_empty_lines_is_capped(capsys: pytest.CaptureFixture):
+    messages = run_command_task(
+        {"command": "yes '' | head -n 100000", "output_limit": "100"}, capsys
+    )
+    assert len(messages) == 102
+    assert messages[50] == ("info", f"... {100000 - 100} characters omitted ...")
+
+
+def test_command_timeout(capsys: pytest.CaptureFixture):
+    start = time.monotonic()
+    messages = run_command_task(
+        {"command": "echo started; sleep 30", "timeout": "1"}, capsys
+    )
+    assert time.monotonic() - start < 10
+    assert messages == [
+        ("info", "started"),
+        ("error", "command timed out after 1 seconds"),
+    ]
+
+
+def test_command_invalid_limit(capsys: pytest.CaptureFixture):
+    messages = run_command_task({"command": "true", "timeout": "soon"}, capsys)
+    assert messages == [("error", "timeout must be a positive integer")]
+
+
+def test_command_guards_skip_without_fork(
+    tmp_path: pathlib.Path, capsys: pytest.CaptureFixture
+):
+    (tmp_path / "created").touch()
+    with patch("subprocess.Popen") as popen:
+        messages = run_command_task(
+            {"command": "make install", "creates": str(tmp_path / "created")}, capsys
+        )
+        messages += run_command_task(
+            {"command": "rm -rf build", "removes": str(tmp_path / "missing")}, capsys
+        )
+
+    popen.assert_not_called()
+    assert messages == [
+        ("success", f"skipped, {tmp_path / 'created'} exists"),
+        ("success", f"skipped, {tmp_path / 'missing'} does not exist"),
+    ]
@@ -0,0 +1,112 @@
+import json
+import os
+import pathlib
+import stat
+from unittest.mock import patch
+
+import pytest
+
+from hidori_core.modules import get_module
+from hidori_core.utils import Messenger
+from hidori_core.utils.delta import get_delta, get_delta_name, get_signature
+
+
+def run_file_task(
+    exchange_path: pathlib.Path, data: dict[str, str], capsys: pytest.CaptureFixture
+) -> list[dict[str, str]]:
+    module = get_module("file")
+    assert module
+    messenger = Messenger("Push config")
+    with patch("hidori_core.utils.delta.get_exchange_path", return_value=exchange_path):
+        module.execute({"source": "app.conf", **data}, messenger)
+    messenger.flush()
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def push_delta(exchange_path: pathlib.Path, path: pathlib.Path, data: bytes) -> None:
+    delta_path = exchange_path / "files" / get_delta_name(str(path))
+    delta_path.parent.mkdir(exist_ok=True)
+    delta_path.write_bytes(get_delta(get_signature(path), data))
+
+
+@pytest.fixture
+def exchange_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "exchange"
+    path.mkdir()
+    return path
+
+
+def test_file_is_created(
+    tmp_path: pathlib.Path, exchange_path: pathlib.Path, capsys: pytest.CaptureFixture
+):
+    target = tmp_path / "app.conf"
+    push_delta(exchange_path, target, b"content")
+
+    messages = run_file_task(
+        exchange_path, {"path": str(target), "mode": "600"}, capsys
+    )
+    assert messages == [
+        {
+            "type": "affected",
+            "task": "Push config",
+            "message": f"{target} has been updated, 7 bytes sent",
+        }
+    ]
+    assert target.read_bytes() == b"content"
+    assert stat.S_IMODE(target.stat().st_mode) == 0o600
+    assert sorted(os.listdir(tmp_path)) == ["app.conf", "exchange"]
+
+
+def test_file_is_replaced(
+    tmp_path: pathlib.Path, exchange_path: pathlib.Path, capsys: pytest.CaptureFixture
+):
+    target = tmp_path / "app.conf"
+    content = os.urandom(50_000)
+    target.write_bytes(content)
+    target.chmod(0o640)
+    inode = target.stat().st_ino
+    push_delta(exchange_path, target, content + b"appended")
+
+    messages = run_file_task(exchange_path, {"path": str(target)}, capsys)
+    assert messages[0]["type"] == "affected"
+    assert target.read_bytes() == content + b"appended"
+    assert target.stat().st_ino != inode
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+
+
+def test_file_is_up_to_date(
+    tmp_path: pathlib.Path, exchange_path: pathlib.Path, capsys: pytest.CaptureFixture
+):
+    target = tmp_path / "app.conf"
+    target.write_bytes(b"content")
+    push_delta(exchange_path, target, b"content")
+
+    messages = run_file_task(exchange_path, {"path": str(target)}, capsys)
+    assert messages[0] == {
+        "type": "success",
+        "task": "Push config",
+        "message": f"{target} is up to date",
+    }
+
+
+def test_file_changed_after_push(
+    tmp_path: pathlib.Path, exchange_path: pathlib.Path, capsys: pytest.CaptureFixture
+):
+    target = tmp_path / "app.conf"
+    target.write_bytes(b"old")
+    push_delta(exchange_path, target, b"new")
+    target.write_bytes(b"changed")
+
+    messages = run_file_task(exchange_path, {"path": str(target)}, capsys)
+    assert messages[0]["type"] == "error"
+    assert "changed since its content was pushed" in messages[0]["message"]
+    assert target.read_bytes() == b"changed"
+
+
+def test_file_without_pushed_content(
+    tmp_path: pathlib.Path, exchange_path: pathlib.Path, capsys: pytest.CaptureFixture
+):
+    target = tmp_path / "app.conf"
+    messages = run_file_task(exchange_path, {"path": str(target)}, capsys)
+    assert messages[0]["message"] == f"content of {target} was not pushed"
+    assert not target.exists()
@@ -0,0 +1,62 @@
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+import hidori_core
+from hidori_core.modules import BUILTIN_MODULES, get_module
+
+SRC_PATH = pathlib.Path(hidori_core.__path__[0]).parent
+
+
+def get_imported_modules(module_name: str) -> list:
+    code = (
+        "import json, sys\n"
+        "from hidori_core.modules import get_module\n"
+        f"get_module({module_name!r})\n"
+        "print(json.dumps(sorted(m for m in sys.modules if m.startswith('hidori'))))"
+    )
+    env = {**os.environ, "PYTHONPATH": str(SRC_PATH)}
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def test_get_module_not_found():
+    assert get_module("does-not-exist") is None
+
+
+@pytest.mark.parametrize("module_name", sorted(BUILTIN_MODULES))
+def test_get_module_builtin(module_name: str):
+    module = get_module(module_name)
+    assert module is not None
+    assert get_module(module_name) is module
+
+
+@pytest.mark.parametrize("module_name", sorted(BUILTIN_MODULES))
+def test_get_module_imports_only_requested_module(module_name: str):
+    imported = get_imported_modules(module_name)
+    assert BUILTIN_MODULES[module_name] in imported
+    for other_name, other_path in BUILTIN_MODULES.items():
+        if other_name != module_name:
+            assert other_path not in imported
+
+
+@pytest.mark.parametrize("module_name", sorted(BUILTIN_MODULES))
+def test_lazy_module_attribute(module_name: str):
+    from hidori_core import modules
+
+    module_cls = type(get_module(module_name))
+    assert getattr(modules, module_cls.__name__) is module_cls
+    assert module_cls.__name__ in modules.__all__
+
+
+def test_lazy_module_attribute_not_found():
+    from hidori_core import modules
+
+    with pytest.raises(AttributeError):
+        modules.DoesNotExistModule
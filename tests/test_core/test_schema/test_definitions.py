@@ -90,12 +90,12 @@ def test_schema_definition_validate_modifiers_with_error(modifiers):
 def test_schema_definition_applies_all_modifiers(modifiers, field_name):
     definition: Definition = define(modifiers)
     definition.field_name = field_name
-    schema = Mock()
+    fields = Mock()
     data = {"a": "example", "b": 13}
-    definition.apply_modifiers(schema, data)
+    definition.apply_modifiers(fields, data)
     assert data == {"a": "example", "b": 13}
     for modifier in modifiers:
-        expected = [call.apply(schema, data)]
+        expected = [call.apply(fields, data)]
         assert modifier.mock_calls == expected
         modifier.reset_mock()
 
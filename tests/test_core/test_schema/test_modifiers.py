@@ -3,7 +3,7 @@ from typing import Any, Dict, List, Literal, Optional
 import pytest
 
 from hidori_core.schema import errors as schema_errors
-from hidori_core.schema.base import DataCondtion, Schema, SchemaModifier
+from hidori_core.schema.base import DataCondtion, Field, Schema, SchemaModifier
 from hidori_core.schema.modifiers import RequiresModifier
 
 
@@ -15,13 +15,10 @@ class SimpleModifier(SchemaModifier):
         if "throw_error" in annotations:
             raise schema_errors.ModifierError()
 
-    def apply_to_schema(self, schema: Schema, data: Dict[str, Any]) -> None:
+    def apply_to_fields(self, fields: Dict[str, Field], data: Dict[str, Any]) -> None:
         if data["state"] == "modify":
-            setattr(schema._internals_fields["a"], "modified", True)
-            setattr(schema._internals_fields["b"], "modified", True)
-        elif data["state"] == "restore":
-            delattr(schema._internals_fields["a"], "modified")
-            delattr(schema._internals_fields["b"], "modified")
+            fields["a"] = fields["a"].with_required(False)
+            fields["b"] = fields["b"].with_required(False)
 
 
 class ErrorSchema(Schema):
@@ -47,18 +44,19 @@ def test_simple_modifier_throw_error_on_schema_processing():
     assert schema_annotations == ErrorSchema.__annotations__
 
 
-def test_simple_modifier_schema_update_and_restore():
+def test_simple_modifier_fields_update_keeps_schema_intact():
     modifier = SimpleModifier()
     schema = SimpleSchema()
     schema_annotations = schema.__annotations__.copy()
     modifier.process_schema(schema.__annotations__)
     assert schema_annotations == schema.__annotations__
-    modifier.apply(schema, {"state": "modify"})
-    assert getattr(schema._internals_fields["a"], "modified") is True
-    assert getattr(schema._internals_fields["b"], "modified") is True
-    modifier.apply(schema, {"state": "restore"})
-    assert hasattr(schema._internals_fields["a"], "modified") is False
-    assert hasattr(schema._internals_fields["b"], "modified") is False
+    fields = dict(schema._internals_fields)
+    modifier.apply(fields, {"state": "modify"})
+    assert fields["a"].required is False
+    assert fields["b"].required is False
+    assert fields["state"] is schema._internals_fields["state"]
+    assert schema._internals_fields["a"].required is True
+    assert schema._internals_fields["b"].required is True
 
 
 def test_simple_modifier_do_nothing_data_conditions():
@@ -72,9 +70,9 @@ def test_simple_modifier_do_nothing_data_conditions():
     schema_annotations = schema.__annotations__.copy()
     modifier.process_schema(schema.__annotations__)
     assert schema_annotations == schema.__annotations__
-    modifier.apply(schema, {"state": "modify"})
-    assert hasattr(schema._internals_fields["a"], "modified") is False
-    assert hasattr(schema._internals_fields["b"], "modified") is False
+    fields = dict(schema._internals_fields)
+    modifier.apply(fields, {"state": "modify"})
+    assert fields == schema._internals_fields
 
 
 def test_simple_modifier_do_nothing_partial_data_conditions():
@@ -88,9 +86,9 @@ def test_simple_modifier_do_nothing_partial_data_conditions():
     schema_annotations = schema.__annotations__.copy()
     modifier.process_schema(schema.__annotations__)
     assert schema_annotations == schema.__annotations__
-    modifier.apply(schema, {"state": "modify", "a": "ok"})
-    assert hasattr(schema._internals_fields["a"], "modified") is False
-    assert hasattr(schema._internals_fields["b"], "modified") is False
+    fields = dict(schema._internals_fields)
+    modifier.apply(fields, {"state": "modify", "a": "ok"})
+    assert fields == schema._internals_fields
 
 
 def test_simple_modifier_run_on_fulfilled_data_conditions():
@@ -104,9 +102,10 @@ def test_simple_modifier_run_on_fulfilled_data_conditions():
     schema_annotations = schema.__annotations__.copy()
     modifier.process_schema(schema.__annotations__)
     assert schema_annotations == schema.__annotations__
-    modifier.apply(schema, {"state": "modify", "a": "ok", "b": "also-ok"})
-    assert getattr(schema._internals_fields["a"], "modified") is True
-    assert getattr(schema._internals_fields["b"], "modified") is True
+    fields = dict(schema._internals_fields)
+    modifier.apply(fields, {"state": "modify", "a": "ok", "b": "also-ok"})
+    assert fields["a"].required is False
+    assert fields["b"].required is False
 
 
 def test_requires_modifier_fails_missing_fields():
@@ -127,9 +126,10 @@ def test_requires_modifier_do_nothing_data_conditions():
     schema_annotations = schema.__annotations__.copy()
     modifier.process_schema(schema.__annotations__)
     assert schema_annotations == schema.__annotations__
-    modifier.apply(schema, {})
-    assert schema._internals_fields["a"].required is True
-    assert schema._internals_fields["b"].required is False
+    fields = dict(schema._internals_fields)
+    modifier.apply(fields, {})
+    assert fields["a"].required is True
+    assert fields["b"].required is False
 
 
 def test_requires_modifier_run_on_fulfilled_data_conditions():
@@ -141,8 +141,8 @@ def test_requires_modifier_run_on_fulfilled_data_conditions():
     schema_annotations = schema.__annotations__.copy()
     modifier.process_schema(schema.__annotations__)
     assert schema_annotations == schema.__annotations__
-    modifier.apply(schema, {"a": "ok"})
-    assert schema._internals_fields["a"].required is True
-    assert schema._internals_fields["b"].required is True
-    # Undo the modifier
-    schema._internals_fields["b"].required = False
+    fields = dict(schema._internals_fields)
+    modifier.apply(fields, {"a": "ok"})
+    assert fields["a"].required is True
+    assert fields["b"].required is True
+    assert schema._internals_fields["b"].required is False
@@ -1,9 +1,10 @@
-from typing import Literal, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Literal, Optional
 
 import pytest
 
 from hidori_core.schema import errors as schema_errors
-from hidori_core.schema.base import Schema, define
+from hidori_core.schema.base import Schema, ValidationResult, define
 from hidori_core.schema.modifiers import RequiresModifier
 
 
@@ -26,6 +27,17 @@ class MutuallyRequiredFieldsSchema(Schema):
     b: Optional[str] = define(modifiers=[RequiresModifier(["a"])])
 
 
+class ConditionallyRequiredFieldSchema(Schema):
+    state: Literal["installed", "upgraded"] = define(
+        modifiers=[
+            RequiresModifier(
+                ["package"], data_conditions=[lambda d: d["state"] == "installed"]
+            )
+        ]
+    )
+    package: Optional[str]
+
+
 class DefaultValueFieldsSchema(Schema):
     a: str = define(default="foo")
     b: str = define(default_factory=lambda: "bar")
@@ -61,6 +73,17 @@ def test_schema_field_unrecognized_annotation():
     assert str(e.value) == "could not determine schema field for object type"
 
 
+def test_schema_optional_literal_field():
+    class Foo(Schema):
+        a: Optional[Literal["foo", "bar"]]
+
+    assert Foo().validate({}) == {}
+    assert Foo().validate({"a": "bar"}) == {"a": "bar"}
+    with pytest.raises(schema_errors.SchemaError) as e:
+        Foo().validate({"a": "baz"})
+    assert e.value.errors == {"a": "not one of allowed values: ('foo', 'bar')"}
+
+
 @pytest.mark.parametrize("data", [{}, {"foo": "bar"}])
 def test_empty_schema_data_validation_anything_returns_empty(data):
     assert EmptySchema._internals_fields == {}
@@ -133,3 +156,86 @@ def test_schema_data_validation_default_fields():
         "b": "bar",
         "c": "example",
     }
+
+
+def test_schema_data_validation_modifiers_do_not_leak():
+    schema = RequiresFieldSchema()
+    with pytest.raises(schema_errors.SchemaError):
+        schema.validate({"a": "foo"})
+    assert RequiresFieldSchema._internals_fields["b"].required is False
+    assert schema.validate({}) == {}
+
+
+def test_schema_data_validation_defaults_do_not_leak():
+    data: Dict[str, Any] = {}
+    assert DefaultValueFieldsSchema().validate(data) == {
+        "a": "foo",
+        "b": "bar",
+        "c": "car",
+    }
+    assert data == {}
+
+
+def test_schema_data_validation_conditional_requirements_are_deterministic():
+    schema = ConditionallyRequiredFieldSchema()
+    assert schema.validate({"state": "upgraded"}) == {"state": "upgraded"}
+    with pytest.raises(schema_errors.SchemaError) as e:
+        schema.validate({"state": "installed"})
+    assert e.value.errors == {"package": "value for required field not provided"}
+    assert schema.validate({"state": "upgraded"}) == {"state": "upgraded"}
+
+
+def test_schema_data_validation_thread_safety():
+    schema = ConditionallyRequiredFieldSchema()
+    payloads = [{"state": "installed"}, {"state": "upgraded"}] * 500
+
+    def validate(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            return schema.validate(data)
+        except schema_errors.SchemaError as e:
+            return e.errors
+
+    expected = [validate(data) for data in payloads]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(validate, payloads)) == expected
+
+
+def test_schema_validate_many_empty():
+    assert RequiredFieldSchema().validate_many([]) == []
+
+
+def test_schema_validate_many_collects_results_and_errors():
+    results = RequiredFieldSchema().validate_many(
+        [
+            {"a": "foo", "b": "bar"},
+            {"a": 123, "b": "bar"},
+            {},
+            {"a": "baz", "b": "bar"},
+        ]
+    )
+    assert [result.is_valid for result in results] == [True, False, False, True]
+    assert results[0] == ValidationResult(data={"a": "foo", "b": "bar"}, errors=None)
+    assert results[1] == ValidationResult(
+        data=None, errors={"a": "expected str, got int"}
+    )
+    assert results[2] == ValidationResult(
+        data=None,
+        errors={
+            "a": "value for required field not provided",
+            "b": "value for required field not provided",
+        },
+    )
+    assert results[3] == ValidationResult(data={"a": "baz", "b": "bar"}, errors=None)
+
+
+def test_schema_validate_many_matches_validate():
+    schema = ConditionallyRequiredFieldSchema()
+    payloads = [
+        {"state": "installed"},
+        {"state": "installed", "package": "foo"},
+        {"state": "upgraded"},
+    ]
+    results = schema.validate_many(iter(payloads))
+    assert results[0].errors == {"package": "value for required field not provided"}
+    assert results[1].data == schema.validate(payloads[1])
+    assert results[2].data == schema.validate(payloads[2])
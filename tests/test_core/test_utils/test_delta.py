@@ -0,0 +1,133 @@
+import io
+import os
+import pathlib
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from hidori_core.utils.delta import (
+    DeltaError,
+    apply_delta,
+    get_cached_digest,
+    get_delta,
+    get_delta_path,
+    get_file_digest,
+    get_signature,
+    lookup_digest,
+    prepare_transfer,
+    read_delta_header,
+)
+
+
+def patch_data(base: pathlib.Path, data: bytes) -> tuple[bytes, int]:
+    delta = io.BytesIO(get_delta(get_signature(base), data))
+    header = read_delta_header(delta)
+    output = io.BytesIO()
+    with open(base, "rb") as base_file:
+        sent = apply_delta(base_file, delta, output, header["block_size"])
+    return output.getvalue(), sent
+
+
+def test_delta_sends_only_changed_blocks(tmp_path: pathlib.Path):
+    base = os.urandom(200_000)
+    (tmp_path / "base").write_bytes(base)
+    # Insertion shifts all following blocks, which are still matched.
+    data = (
+        base[:1000] + b"inserted" + base[1000:100_000] + os.urandom(10) + base[100_010:]
+    )
+
+    patched, sent = patch_data(tmp_path / "base", data)
+    assert patched == data
+    assert sent < 5 * get_signature(tmp_path / "base")["block_size"]
+
+
+def test_delta_stops_rolling_without_matches(tmp_path: pathlib.Path):
+    base = os.urandom(200_000)
+    (tmp_path / "base").write_bytes(base)
+    # Blocks past the limit aren't looked for, even if they're unchanged.
+    data = os.urandom(50_000) + base[50_000:]
+
+    with patch("hidori_core.utils.delta.ROLL_LIMIT", 10_000):
+        delta = get_delta(get_signature(tmp_path / "base"), data)
+    records = io.BytesIO(delta)
+    read_delta_header(records)
+    output = io.BytesIO()
+    assert apply_delta(None, records, output, 0) == 200_000
+    assert output.getvalue() == data
+
+
+def test_delta_of_unchanged_file(tmp_path: pathlib.Path):
+    base = os.urandom(100_000)
+    (tmp_path / "base").write_bytes(base)
+
+    delta = get_delta(get_signature(tmp_path / "base"), base)
+    header = read_delta_header(io.BytesIO(delta))
+    assert header["base"] == header["digest"]
+    assert patch_data(tmp_path / "base", base) == (base, 100_000 % 2048)
+
+
+def test_delta_of_missing_file(tmp_path: pathlib.Path):
+    assert get_signature(tmp_path / "missing") is None
+
+    delta = io.BytesIO(get_delta(None, b"content"))
+    assert read_delta_header(delta)["base"] is None
+    output = io.BytesIO()
+    assert apply_delta(None, delta, output, 0) == 7
+    assert output.getvalue() == b"content"
+
+
+def test_signature_uses_adler32(tmp_path: pathlib.Path):
+    (tmp_path / "base").write_bytes(b"a" * 5000)
+    signature = get_signature(tmp_path / "base")
+    assert signature is not None
+    assert signature["block_size"] == 2048
+    assert signature["weak"] == [zlib.adler32(b"a" * 2048)] * 2
+
+
+def test_apply_truncated_delta(tmp_path: pathlib.Path):
+    delta = io.BytesIO(get_delta(None, b"content")[:-1])
+    read_delta_header(delta)
+    with pytest.raises(DeltaError, match="truncated"):
+        apply_delta(None, delta, io.BytesIO(), 0)
+
+
+def test_prepare_transfer_of_unchanged_file(tmp_path: pathlib.Path):
+    target = tmp_path / "app.conf"
+    target.write_bytes(b"content")
+    # Files modified just now aren't cached.
+    os.utime(target, (1_000_000, 1_000_000))
+    digest = get_file_digest(target)
+
+    with patch("hidori_core.utils.delta.get_exchange_path", return_value=tmp_path):
+        stale = get_delta_path(str(target))
+        stale.parent.mkdir()
+        stale.write_bytes(b"stale")
+
+        signature = prepare_transfer(target, "0" * 64)
+        assert signature is not None and signature["digest"] == digest
+        assert not stale.exists()
+
+        # Digest is taken from the cache while size and mtime are the same.
+        with patch("hidori_core.utils.delta.get_file_digest") as get_digest:
+            assert prepare_transfer(target, digest) == {
+                "digest": digest,
+                "block_size": 0,
+                "weak": [],
+                "strong": [],
+            }
+            assert get_cached_digest(target) == digest
+        get_digest.assert_not_called()
+
+        delta = io.BytesIO(stale.read_bytes())
+        assert read_delta_header(delta) == {
+            "base": digest,
+            "digest": digest,
+            "block_size": 0,
+        }
+        assert delta.read() == b""
+
+    target.write_bytes(b"changed")
+    os.utime(target, (1_000_001, 1_000_001))
+    assert lookup_digest(target) is None
+    assert get_cached_digest(target) == get_file_digest(target)
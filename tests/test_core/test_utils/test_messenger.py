@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from hidori_core.utils import Message, MessageList, Messenger
+
+
+def test_message_round_trip():
+    message = Message("success", "Say hello", "hello")
+    assert not hasattr(message, "__dict__")
+    assert Message.from_dict(message.to_dict()) == message
+    assert message != Message("error", "Say hello", "hello")
+
+
+def test_message_list_counts_by_type():
+    messages = MessageList([Message("error", "t", "a"), Message("info", "t", "b")])
+    messages.append(Message("error", "t", "c"))
+    assert len(messages) == 3
+    assert messages.count("error") == 2
+    assert messages.count("affected") == 0
+    assert messages.counts == {"error": 2, "info": 1}
+    assert messages[2].message == "c"
+
+    messages.clear()
+    assert list(messages) == []
+    assert messages.counts == {}
+
+
+def test_messenger_flush(capsys: pytest.CaptureFixture[str]):
+    messenger = Messenger("Say hello")
+    messenger.queue_success("hello")
+    messenger.queue_error("failed")
+    assert messenger.has_errors
+
+    messenger.flush()
+    assert messenger.is_empty
+    assert not messenger.has_errors
+    assert [json.loads(line) for line in capsys.readouterr().out.splitlines()] == [
+        {"type": "success", "task": "Say hello", "message": "hello"},
+        {"type": "error", "task": "Say hello", "message": "failed"},
+    ]
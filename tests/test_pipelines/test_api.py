@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from hidori_core.utils import Message, MessageList
+from hidori_pipelines import HostResult, TaskResult, run_pipeline
+from hidori_pipelines.plan import PipelinePlan
+
+PIPELINE_DATA = {
+    "destinations": {
+        "vm1": {"target": "127.0.0.1", "user": "root"},
+        "vm2": {"target": "127.0.0.2", "user": "deploy"},
+    },
+    "tasks": {"Say hello": {"module": "hello"}, "Say hi": {"module": "hello"}},
+}
+
+
+def create_driver(config: dict[str, str], validated: bool) -> MagicMock:
+    driver = MagicMock(user=config["user"])
+    for method in ("connect", "disconnect"):
+        setattr(driver, method, AsyncMock())
+    driver.prepare_pipeline.side_effect = lambda _: MagicMock(
+        status="running", pushed=True, messages=MessageList()
+    )
+
+    async def run_task(exchange: MagicMock, task_id: str) -> None:
+        message_type = "affected" if config["target"] == "127.0.0.2" else "success"
+        exchange.messages.append(Message(message_type, "Say hello", "hello"))
+
+    driver.finalize = AsyncMock(side_effect=run_task)
+    driver.invoke_executor = AsyncMock(side_effect=run_task)
+    return driver
+
+
+@pytest.mark.asyncio
+async def test_run_pipeline_returns_results(capsys: pytest.CaptureFixture[str]):
+    received = []
+    with patch("hidori_pipelines.group.create_driver", side_effect=create_driver):
+        result = await run_pipeline(
+            PipelinePlan.from_data(PIPELINE_DATA),
+            sink=lambda pipeline, messages: received.append(pipeline.target),
+        )
+
+    assert capsys.readouterr().out == ""
+    assert sorted(received) == ["vm1", "vm1", "vm2", "vm2"]
+    assert result.status == "affected"
+    assert result.skipped == []
+    assert result.abort_summary is None
+    vm1 = result.hosts["vm1"]
+    assert vm1 == HostResult("vm1", "root", "success", vm1.tasks)
+    assert [(t.name, t.phase, t.status) for t in vm1.tasks] == [
+        ("Say hello", "push", "success"),
+        ("Say hi", "task", "success"),
+    ]
+    assert vm1.tasks[0].messages == [Message("success", "Say hello", "hello")]
+    assert isinstance(vm1.tasks[0], TaskResult)
+    assert result.hosts["vm2"].status == "affected"
+
+
+@pytest.mark.asyncio
+async def test_run_pipeline_shares_limiter():
+    limiter = asyncio.Semaphore(1)
+    running = max_running = 0
+
+    def create_counting_driver(config: dict[str, str], validated: bool) -> MagicMock:
+        driver = create_driver(config, validated)
+
+        async def connect(keep_alive: float | None) -> None:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(running, max_running)
+            await asyncio.sleep(0)
+
+        async def disconnect() -> None:
+            nonlocal running
+            running -= 1
+
+        driver.connect = connect
+        driver.disconnect = disconnect
+        return driver
+
+    with patch(
+        "hidori_pipelines.group.create_driver", side_effect=create_counting_driver
+    ):
+        results = await asyncio.gather(
+            *[
+                run_pipeline(PipelinePlan.from_data(PIPELINE_DATA), limiter=limiter)
+                for _ in range(2)
+            ]
+        )
+
+    assert [len(result.hosts) for result in results] == [2, 2]
+    assert max_running == 1
+
+
+def test_run_pipeline_rejects_relays():
+    data = {
+        **PIPELINE_DATA,
+        "relays": {"bastion": {"target": "10.0.0.1", "user": "relay"}},
+    }
+    with pytest.raises(ValueError, match="relays"):
+        asyncio.run(run_pipeline(PipelinePlan.from_data(data)))
@@ -0,0 +1,108 @@
+import hashlib
+import pathlib
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from hidori_core.utils import Message, MessageList
+from hidori_core.utils.delta import get_delta_name
+from hidori_pipelines.pipeline import FilePipelineStep, Pipeline, compile_steps
+
+
+def create_pipeline(
+    tmp_path: pathlib.Path, tasks: dict, signature: dict | None = None
+) -> tuple[Pipeline, MagicMock]:
+    transport = MagicMock()
+    transport.get_file_signature = AsyncMock(return_value=(signature, []))
+    transport.push_file = AsyncMock(return_value=[])
+    exchange = MagicMock(
+        id="42",
+        localpath=tmp_path / "exchange",
+        transport=transport,
+        status="pending",
+        pushed=False,
+        messages=MessageList(),
+    )
+    exchange.localpath.mkdir()
+
+    async def finalize(exchange: MagicMock, task_id: str | None = None) -> None:
+        exchange.pushed = True
+
+    driver = MagicMock(user="root")
+    driver.prepare_pipeline.return_value = exchange
+    driver.finalize = AsyncMock(side_effect=finalize)
+    driver.invoke_executor = AsyncMock()
+    pipeline = Pipeline({"target": "vm", "driver": driver}, compile_steps(tasks))
+    pipeline.sink = lambda pipeline, messages: None
+    pipeline.prepare()
+    return pipeline, exchange
+
+
+@pytest.mark.asyncio
+async def test_file_step_pushes_delta_before_invoke(tmp_path: pathlib.Path):
+    source = tmp_path / "app.conf"
+    source.write_bytes(b"content")
+    tasks = {
+        "Push config": {"module": "file", "source": str(source), "path": "/etc/a"},
+        "Say hello": {"module": "hello"},
+    }
+    pipeline, exchange = create_pipeline(tmp_path, tasks)
+    assert type(pipeline.steps[0]) is FilePipelineStep
+
+    await pipeline.finalize()
+
+    # Exchange is pushed on its own, as the delta is pushed into it.
+    driver = pipeline.driver
+    assert driver.finalize.call_args.args == (exchange,)
+    delta_path = exchange.localpath / "files" / get_delta_name("/etc/a")
+    assert delta_path.read_bytes().endswith(b"content")
+    exchange.transport.get_file_signature.assert_awaited_once_with(
+        "42", "/etc/a", hashlib.sha256(b"content").hexdigest()
+    )
+    exchange.transport.push_file.assert_awaited_once_with(
+        "42", delta_path, f"files/{delta_path.name}"
+    )
+    driver.invoke_executor.assert_awaited_once_with(exchange, pipeline.steps[0].task_id)
+
+    await pipeline.invoke_step()
+    assert exchange.transport.push_file.await_count == 1
+    assert driver.invoke_executor.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_file_step_with_same_digest_pushes_nothing(tmp_path: pathlib.Path):
+    source = tmp_path / "app.conf"
+    source.write_bytes(b"content")
+    tasks = {"Push config": {"module": "file", "source": str(source), "path": "/a"}}
+    digest = hashlib.sha256(b"content").hexdigest()
+    signature = {"digest": digest, "block_size": 0, "weak": [], "strong": []}
+    pipeline, exchange = create_pipeline(tmp_path, tasks, signature)
+
+    await pipeline.finalize()
+
+    exchange.transport.push_file.assert_not_awaited()
+    assert not (exchange.localpath / "files").exists()
+    pipeline.driver.invoke_executor.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_file_step_with_missing_source(tmp_path: pathlib.Path):
+    tasks = {
+        "Say hello": {"module": "hello"},
+        "Push config": {"module": "file", "source": "missing", "path": "/etc/a"},
+    }
+    pipeline, exchange = create_pipeline(tmp_path, tasks)
+    messages: list[Message] = []
+    pipeline.sink = lambda pipeline, received: messages.extend(received)
+
+    await pipeline.finalize()
+    assert pipeline.driver.finalize.call_args.args == (
+        exchange,
+        pipeline.steps[0].task_id,
+    )
+    await pipeline.invoke_step()
+
+    assert messages == [Message("error", "Push config", "source missing is not a file")]
+    assert pipeline.has_failed
+    pipeline.driver.invoke_executor.assert_not_awaited()
+    exchange.transport.get_file_signature.assert_not_awaited()
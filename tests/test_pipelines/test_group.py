@@ -0,0 +1,389 @@
+import asyncio
+import threading
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from hidori_core.schema import errors as schema_errors
+from hidori_core.utils import Message, MessageList
+from hidori_pipelines import PipelineGroup
+from hidori_pipelines.group import AbortSummary
+from hidori_pipelines.pipeline import Pipeline
+from hidori_pipelines.plan import PipelinePlan
+
+
+def create_group_data(tasks: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "destinations": {
+            "vm1": {"target": "127.0.0.1", "user": "root"},
+            "vm2": {"target": "127.0.0.2", "user": "root"},
+        },
+        "tasks": tasks,
+    }
+
+
+def create_driver_mock(status: str = "running") -> MagicMock:
+    driver = MagicMock(user="root")
+    for method in ("connect", "disconnect", "finalize", "invoke_executor"):
+        setattr(driver, method, AsyncMock())
+    driver.prepare_pipeline.side_effect = lambda _: MagicMock(
+        status=status, pushed=True, messages=MessageList()
+    )
+    return driver
+
+
+def test_group_validates_tasks_success():
+    group = PipelineGroup.from_data(
+        create_group_data(
+            {
+                "Say hello": {"module": "hello"},
+                "Set hostname": {"module": "hostname", "name": "vm"},
+                "Install vim": {
+                    "module": "apt",
+                    "state": "installed",
+                    "package": "vim",
+                },
+            }
+        )
+    )
+    assert len(list(group)) == 2
+
+
+def test_group_validates_tasks_missing_module_error():
+    with pytest.raises(schema_errors.SchemaError) as e:
+        PipelineGroup.from_data(create_group_data({"Say hello": {"name": "vm"}}))
+
+    assert e.value.errors == {
+        "tasks": {"Say hello": {"module": "value for required field not provided"}}
+    }
+
+
+def test_group_validates_tasks_unknown_module_error():
+    with pytest.raises(schema_errors.SchemaError) as e:
+        PipelineGroup.from_data(create_group_data({"Say hello": {"module": "helo"}}))
+
+    assert e.value.errors == {
+        "tasks": {"Say hello": {"module": "helo module does not exist"}}
+    }
+
+
+def test_group_validates_tasks_collects_all_errors():
+    with pytest.raises(schema_errors.SchemaError) as e:
+        PipelineGroup.from_data(
+            create_group_data(
+                {
+                    "Say hello": {"module": "hello"},
+                    "Set hostname": {"module": "hostname"},
+                    "Install vim": {"module": "apt", "state": "installed"},
+                    "Upgrade all": {"module": "apt", "state": "upgraded"},
+                    "Remove vim": {"module": "apt", "state": "purged"},
+                }
+            )
+        )
+
+    assert e.value.errors == {
+        "tasks": {
+            "Set hostname": {"name": "value for required field not provided"},
+            "Install vim": {"package": "value for required field not provided"},
+            "Remove vim": {
+                "state": "not one of allowed values: "
+                "('upgraded', 'installed', 'removed')"
+            },
+        }
+    }
+
+
+def test_group_creates_pipelines_lazily():
+    group = PipelineGroup.from_data(
+        create_group_data({"Say hello": {"module": "hello"}})
+    )
+    with patch("hidori_pipelines.group.create_driver") as create_driver:
+        next(group)
+    create_driver.assert_called_once_with(
+        {"driver": "ssh", "target": "127.0.0.1", "user": "root"}, validated=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_group_runs_pipelines_in_sliding_window():
+    data = create_group_data({"Say hello": {"module": "hello"}})
+    data["destinations"] = {
+        f"vm{i}": {"target": f"127.0.0.{i}", "user": "root"} for i in range(5)
+    }
+    group = PipelineGroup(PipelinePlan.from_data(data), window_size=2)
+    # vm0 is pushed only once all others are done, so it would time out
+    # if pipelines were started in batches.
+    others_done = asyncio.Event()
+    done: list[str] = []
+    running = max_running = 0
+
+    def create_driver(config: dict[str, str], validated: bool) -> MagicMock:
+        driver = create_driver_mock()
+
+        async def connect(keep_alive: float | None) -> None:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(running, max_running)
+
+        async def finalize(exchange: MagicMock, task_id: str) -> None:
+            nonlocal running
+            if config["target"] == "127.0.0.0":
+                await others_done.wait()
+            else:
+                done.append(config["target"])
+                if len(done) == 4:
+                    others_done.set()
+            running -= 1
+
+        driver.connect.side_effect = connect
+        driver.finalize.side_effect = finalize
+        return driver
+
+    with patch("hidori_pipelines.group.create_driver", side_effect=create_driver):
+        await asyncio.wait_for(group.run(), timeout=5)
+
+    assert len(done) == 4
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_group_abort_all_skips_pipelines_outside_window():
+    data = create_group_data({"Say hello": {"module": "hello"}})
+    data["config"] = {"on_fail": "abort-all"}
+    group = PipelineGroup(PipelinePlan.from_data(data), window_size=1)
+    with patch(
+        "hidori_pipelines.group.create_driver",
+        return_value=create_driver_mock(status="failed"),
+    ) as create_driver:
+        await group.run()
+
+    assert create_driver.call_count == 1
+    assert group.abort_summary == AbortSummary(interrupted=[], completed=["vm1"])
+
+
+def test_group_continue_drops_not_pushed_pipelines():
+    data = create_group_data({"Say hello": {"module": "hello"}})
+    data["config"] = {"on_fail": "continue"}
+    group = PipelineGroup.from_data(data)
+    pushed, failed = list(group)
+    pushed._exchange = MagicMock(status="failed", pushed=True)
+    failed._exchange = MagicMock(status="failed", pushed=False)
+    assert group._can_continue(pushed)
+    assert not group._can_continue(failed)
+
+
+@pytest.mark.asyncio
+async def test_group_connects_and_disconnects_destinations():
+    group = PipelineGroup.from_data(
+        create_group_data({"Say hello": {"module": "hello"}})
+    )
+    driver = create_driver_mock()
+    with patch("hidori_pipelines.group.create_driver", return_value=driver):
+        await group.run()
+
+    assert driver.connect.await_count == 2
+    assert driver.prepare_pipeline.call_count == 2
+    assert driver.finalize.await_count == 2
+    assert driver.disconnect.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_group_records_phases_in_journal():
+    group = PipelineGroup(
+        PipelinePlan.from_data(
+            create_group_data(
+                {"Say hello": {"module": "hello"}, "Get hostname": {"module": "hello"}}
+            )
+        ),
+        journal_run=MagicMock(),
+    )
+    with patch(
+        "hidori_pipelines.group.create_driver", return_value=create_driver_mock()
+    ):
+        await group.run()
+
+    records = [c.kwargs for c in group._journal_run.record.call_args_list]
+    for host in ("vm1", "vm2"):
+        assert [(r["phase"], r["task"]) for r in records if r["host"] == host] == [
+            ("connect", None),
+            ("prepare", None),
+            ("push", "Say hello"),
+            ("task", "Get hostname"),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_group_watch_reuses_pushed_exchanges(capsys: pytest.CaptureFixture[str]):
+    group = PipelineGroup.from_data(
+        create_group_data({"Set hostname": {"module": "hostname", "name": "vm"}})
+    )
+    # vm1 drifts in the first iteration only, vm2 never changes.
+    results = {"127.0.0.1": ["affected", "success"], "127.0.0.2": ["success"] * 2}
+    drivers: list[MagicMock] = []
+
+    def create_driver(config: dict[str, str], validated: bool) -> MagicMock:
+        driver = create_driver_mock()
+
+        async def run_task(exchange: MagicMock, task_id: str) -> None:
+            message_type = results[config["target"]].pop(0)
+            exchange.messages.append(Message(message_type, "Set hostname", "vm"))
+
+        driver.finalize.side_effect = run_task
+        driver.invoke_executor.side_effect = run_task
+        drivers.append(driver)
+        return driver
+
+    with patch("hidori_pipelines.group.create_driver", side_effect=create_driver):
+        await group.watch(interval=0, iterations=2)
+
+    out = capsys.readouterr().out
+    assert out.count("root@vm1: Set hostname") == 2
+    assert "root@vm2" not in out
+    assert not any(results.values())
+    for driver in drivers:
+        driver.connect.assert_awaited_once_with(keep_alive=0)
+        assert driver.prepare_pipeline.call_count == 1
+        assert driver.finalize.await_count == 1
+        assert driver.invoke_executor.await_count == 1
+        assert driver.disconnect.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_group_watch_runs_pipelines_in_window():
+    data = create_group_data({"Say hello": {"module": "hello"}})
+    data["destinations"] = {
+        f"vm{i}": {"target": f"127.0.0.{i}", "user": "root"} for i in range(5)
+    }
+    group = PipelineGroup(PipelinePlan.from_data(data), window_size=2)
+    running = max_running = steps = 0
+
+    async def run_task(exchange: MagicMock, task_id: str) -> None:
+        nonlocal running, max_running, steps
+        running += 1
+        max_running = max(running, max_running)
+        await asyncio.sleep(0.01)
+        steps += 1
+        running -= 1
+
+    def create_driver(config: dict[str, str], validated: bool) -> MagicMock:
+        driver = create_driver_mock()
+        driver.finalize.side_effect = run_task
+        driver.invoke_executor.side_effect = run_task
+        return driver
+
+    with patch("hidori_pipelines.group.create_driver", side_effect=create_driver):
+        await group.watch(interval=0, iterations=2)
+
+    assert steps == 10
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_group_pushes_while_other_pipelines_are_prepared():
+    group = PipelineGroup.from_data(
+        create_group_data({"Say hello": {"module": "hello"}})
+    )
+    # vm1 is prepared only once vm2 has been pushed, so it would time out
+    # if pushes waited for the preparation of all pipelines.
+    vm2_pushed = threading.Event()
+
+    def create_driver(config: dict[str, str], validated: bool) -> MagicMock:
+        driver = create_driver_mock()
+
+        def prepare_pipeline(pipeline: Pipeline) -> MagicMock:
+            if config["target"] == "127.0.0.1":
+                assert vm2_pushed.wait(timeout=5)
+            return MagicMock(status="running", pushed=True, messages=MessageList())
+
+        async def finalize(exchange: MagicMock, task_id: str) -> None:
+            if config["target"] == "127.0.0.2":
+                vm2_pushed.set()
+
+        driver.prepare_pipeline.side_effect = prepare_pipeline
+        driver.finalize.side_effect = finalize
+        return driver
+
+    with patch("hidori_pipelines.group.create_driver", side_effect=create_driver):
+        await group.run()
+
+    assert vm2_pushed.is_set()
+
+
+@pytest.mark.asyncio
+async def test_group_sends_messages_to_sink():
+    received = []
+    group = PipelineGroup(
+        PipelinePlan.from_data(create_group_data({"Say hello": {"module": "hello"}})),
+        sink=lambda pipeline, messages: received.append((pipeline.target, messages)),
+    )
+    message = Message("success", "Say hello", "hello")
+    driver = create_driver_mock()
+    driver.finalize.side_effect = lambda exchange, _: exchange.messages.append(message)
+    with patch("hidori_pipelines.group.create_driver", return_value=driver):
+        await group.run()
+
+    assert sorted(received) == [("vm1", [message]), ("vm2", [message])]
+
+
+@pytest.mark.asyncio
+async def test_group_abort_stops_remaining_steps():
+    group = PipelineGroup.from_data(
+        create_group_data(
+            {"Say hello": {"module": "hello"}, "Say hi": {"module": "hello"}}
+        )
+    )
+    driver = create_driver_mock()
+    driver.finalize.side_effect = lambda *_: group.abort()
+    with patch("hidori_pipelines.group.create_driver", return_value=driver):
+        await group.run()
+
+    assert group.aborted
+    driver.invoke_executor.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_group_abort_all_interrupts_running_steps():
+    data = create_group_data({"Say hello": {"module": "hello"}})
+    data["config"] = {"on_fail": "abort-all"}
+    group = PipelineGroup.from_data(data)
+    never_done = asyncio.Event()
+
+    def create_driver(config: dict[str, str], validated: bool) -> MagicMock:
+        driver = create_driver_mock()
+
+        async def finalize(exchange: MagicMock, task_id: str) -> None:
+            if config["target"] == "127.0.0.1":
+                await never_done.wait()
+            exchange.status = "failed"
+
+        driver.finalize.side_effect = finalize
+        return driver
+
+    with patch("hidori_pipelines.group.create_driver", side_effect=create_driver):
+        await asyncio.wait_for(group.run(), timeout=5)
+
+    assert group.abort_summary == AbortSummary(interrupted=["vm1"], completed=["vm2"])
+
+
+@pytest.mark.asyncio
+async def test_group_abort_before_pipelines_are_prepared():
+    group = PipelineGroup.from_data(
+        create_group_data({"Say hello": {"module": "hello"}})
+    )
+    connecting = asyncio.Event()
+
+    async def connect(keep_alive: float | None) -> None:
+        connecting.set()
+        await asyncio.Event().wait()
+
+    driver = create_driver_mock()
+    driver.connect.side_effect = connect
+    with patch("hidori_pipelines.group.create_driver", return_value=driver):
+        run = asyncio.create_task(group.run())
+        await connecting.wait()
+        group.abort()
+        await asyncio.wait_for(run, timeout=5)
+
+    assert group.abort_summary == AbortSummary(interrupted=[], completed=[])
+    driver.prepare_pipeline.assert_not_called()
@@ -0,0 +1,44 @@
+from hidori_pipelines.inventory import Inventory
+
+DESTINATIONS = {
+    "vm1": {"driver": "ssh", "target": "127.0.0.1", "user": "root"},
+    "vm2": {"driver": "ssh", "target": "127.0.0.2", "user": "root"},
+    "vm3": {"driver": "ssh", "target": "127.0.0.3", "user": "root", "port": "22"},
+}
+
+
+def test_inventory_round_trip():
+    inventory = Inventory.from_dict(DESTINATIONS)
+    assert len(inventory) == 3
+    assert inventory.to_dict() == DESTINATIONS
+    assert [d.name for d in inventory] == ["vm1", "vm2", "vm3"]
+
+
+def test_inventory_item_access():
+    inventory = Inventory.from_dict(DESTINATIONS)
+    destination = inventory[2]
+    assert destination.name == "vm3"
+    assert destination.config == DESTINATIONS["vm3"]
+
+
+def test_inventory_shares_layouts_and_strings():
+    inventory = Inventory()
+    for index in range(100):
+        inventory.add(
+            f"vm{index}",
+            {
+                "driver": "ssh",
+                "target": f"10.0.0.{index}",
+                "user": "".join(["ro", "ot"]),
+            },
+        )
+    assert len(inventory._layouts) == 1
+    assert inventory[0].config["user"] is inventory[99].config["user"]
+
+
+def test_inventory_shard_deals_destinations_round_robin():
+    inventory = Inventory.from_dict({f"vm{i}": {"target": f"vm{i}"} for i in range(5)})
+    shards = [inventory.shard(index, 2) for index in range(2)]
+    assert [d.name for d in shards[0]] == ["vm0", "vm2", "vm4"]
+    assert [d.name for d in shards[1]] == ["vm1", "vm3"]
+    assert shards[1][0].config == {"target": "vm1"}
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from hidori_pipelines import PipelineGroup
+from hidori_pipelines.pipeline import compile_steps
+
+
+def test_compile_steps_pre_encodes_tasks():
+    steps = compile_steps(
+        {
+            "Say hello": {"module": "hello"},
+            "Set hostname": {"module": "hostname", "name": "vm"},
+        }
+    )
+    assert len(steps) == 2
+    assert json.loads(steps[0].task_bytes) == {
+        "name": "Say hello",
+        "data": {"module": "hello"},
+    }
+    assert json.loads(steps[1].task_bytes) == {
+        "name": "Set hostname",
+        "data": {"module": "hostname", "name": "vm"},
+    }
+
+
+def test_compile_steps_content_derived_ids():
+    first = compile_steps({"Set hostname": {"module": "hostname", "name": "vm"}})
+    second = compile_steps({"Set hostname": {"name": "vm", "module": "hostname"}})
+    renamed = compile_steps({"Rename host": {"module": "hostname", "name": "vm"}})
+    changed = compile_steps({"Set hostname": {"module": "hostname", "name": "vm2"}})
+    assert first[0].task_id == second[0].task_id
+    assert first[0].task_id != renamed[0].task_id
+    assert first[0].task_id != changed[0].task_id
+
+
+def test_compile_steps_are_immutable():
+    (step,) = compile_steps({"Say hello": {"module": "hello"}})
+    with pytest.raises(AttributeError):
+        step.task_id = "42"  # type: ignore[misc]
+    with pytest.raises(AttributeError):
+        step.extra = "42"  # type: ignore[attr-defined]
+
+
+def test_group_shares_steps_between_destinations():
+    group = PipelineGroup.from_data(
+        {
+            "destinations": {
+                "vm1": {"target": "127.0.0.1", "user": "root"},
+                "vm2": {"target": "127.0.0.2", "user": "root"},
+            },
+            "tasks": {"Say hello": {"module": "hello"}},
+        }
+    )
+    first, second = list(group)
+    assert first.steps is second.steps
@@ -0,0 +1,181 @@
+import json
+import pathlib
+from unittest.mock import patch
+
+import pytest
+
+from hidori_core.schema import errors as schema_errors
+from hidori_pipelines import PipelineGroup
+from hidori_pipelines.plan import PipelinePlan
+
+PIPELINE_TOML = """
+[config]
+on_fail = "abort-all"
+
+[destinations]
+
+  [destinations.vm1]
+  target = "127.0.0.1"
+  user = "root"
+
+  [destinations.vm2]
+  target = "127.0.0.2"
+  user = "admin"
+  port = "2222"
+
+[tasks]
+
+  [tasks."Say hello"]
+  module = "hello"
+
+  [tasks."Set hostname"]
+  module = "hostname"
+  name = "vm"
+"""
+
+
+@pytest.fixture(scope="function")
+def toml_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "pipeline.toml"
+    path.write_text(PIPELINE_TOML)
+    return path
+
+
+@pytest.fixture(scope="function")
+def plan_path(toml_path: pathlib.Path) -> pathlib.Path:
+    path = toml_path.with_suffix(".plan")
+    PipelinePlan.from_toml_path(toml_path).dump(path)
+    return path
+
+
+def test_plan_resolves_destinations(toml_path: pathlib.Path):
+    plan = PipelinePlan.from_toml_path(toml_path)
+    assert plan.config == {"on_fail": "abort-all"}
+    assert plan.destinations.to_dict() == {
+        "vm1": {"driver": "ssh", "target": "127.0.0.1", "user": "root"},
+        "vm2": {
+            "driver": "ssh",
+            "target": "127.0.0.2",
+            "user": "admin",
+            "port": "2222",
+        },
+    }
+    assert [step.task_json["name"] for step in plan.steps] == [
+        "Say hello",
+        "Set hostname",
+    ]
+
+
+def test_plan_dump_and_load(toml_path: pathlib.Path, plan_path: pathlib.Path):
+    compiled = PipelinePlan.from_toml_path(toml_path)
+    loaded = PipelinePlan.from_plan_path(plan_path)
+    assert loaded.config == compiled.config
+    assert loaded.destinations.to_dict() == compiled.destinations.to_dict()
+    assert loaded.bundle_hash == compiled.bundle_hash
+    assert [(s.task_id, s.task_bytes) for s in loaded.steps] == [
+        (s.task_id, s.task_bytes) for s in compiled.steps
+    ]
+
+
+def test_plan_load_skips_validation(plan_path: pathlib.Path):
+    with patch("hidori_pipelines.plan.validate_tasks") as validate_tasks:
+        PipelinePlan.from_plan_path(plan_path)
+
+    assert validate_tasks.call_count == 0
+
+
+def test_plan_load_bundle_mismatch_error(plan_path: pathlib.Path):
+    plan_data = json.loads(plan_path.read_text())
+    plan_data["bundle_hash"] = "42"
+    plan_path.write_text(json.dumps(plan_data))
+
+    with pytest.raises(RuntimeError) as e:
+        PipelinePlan.from_plan_path(plan_path)
+
+    assert str(e.value) == (
+        f"{plan_path} was compiled for a different hidori version, compile it again"
+    )
+
+
+def test_plan_load_format_error(tmp_path: pathlib.Path):
+    path = tmp_path / "foo.plan"
+    path.write_text(json.dumps({"format": "something", "version": 1}))
+
+    with pytest.raises(RuntimeError) as e:
+        PipelinePlan.from_plan_path(path)
+
+    assert str(e.value) == f"{path} is not a supported pipeline plan"
+
+
+def test_plan_from_path_detects_format(
+    toml_path: pathlib.Path, plan_path: pathlib.Path
+):
+    with patch.object(PipelinePlan, "from_toml_path") as from_toml_path:
+        PipelinePlan.from_path(toml_path)
+    assert from_toml_path.call_count == 1
+
+    with patch.object(PipelinePlan, "from_plan_path") as from_plan_path:
+        PipelinePlan.from_path(plan_path)
+    assert from_plan_path.call_count == 1
+
+
+def test_group_from_plan_path(plan_path: pathlib.Path):
+    first, second = list(PipelineGroup.from_path(str(plan_path)))
+    assert (first.target, first.driver.user) == ("vm1", "root")
+    assert (second.target, second.driver.user) == ("vm2", "admin")
+    assert first.steps is second.steps
+
+
+RELAYS_DATA = {
+    "relays": {"bastion": {"target": "10.0.0.1", "user": "relay"}},
+    "destinations": {
+        "vm1": {"target": "127.0.0.1", "user": "root"},
+        "vm2": {"target": "192.168.0.2", "user": "root", "relay": "bastion"},
+    },
+    "tasks": {"Say hello": {"module": "hello"}},
+}
+
+
+def test_plan_splits_destinations_by_relay(tmp_path: pathlib.Path):
+    path = tmp_path / "pipeline.plan"
+    PipelinePlan.from_data(RELAYS_DATA).dump(path)
+    plan = PipelinePlan.from_plan_path(path)
+    assert plan.relays == {
+        "bastion": {"driver": "ssh", "target": "10.0.0.1", "user": "relay"}
+    }
+
+    direct, relayed = plan.split_relays()
+    assert list(direct.destinations.to_dict()) == ["vm1"]
+    assert direct.relays == {}
+    assert relayed["bastion"].destinations.to_dict() == {
+        "vm2": {"driver": "ssh", "target": "192.168.0.2", "user": "root"}
+    }
+    assert relayed["bastion"].steps is plan.steps
+
+
+def test_plan_unknown_relay_error():
+    data = {**RELAYS_DATA, "relays": {}}
+    with pytest.raises(schema_errors.SchemaError) as e:
+        PipelinePlan.from_data(data)
+
+    assert e.value.errors == {
+        "destinations": {"vm2": {"relay": "bastion relay does not exist"}}
+    }
+
+
+def test_plan_file_tasks_through_relay_error():
+    tasks = {
+        **RELAYS_DATA["tasks"],
+        "Push config": {"module": "file", "source": "app.conf", "path": "/etc/app"},
+    }
+    with pytest.raises(schema_errors.SchemaError) as e:
+        PipelinePlan.from_data({**RELAYS_DATA, "tasks": tasks})
+
+    assert e.value.errors == {
+        "destinations": {
+            "vm2": {
+                "relay": "Push config can't be run through relays, "
+                "as they push files of the controller"
+            }
+        }
+    }
@@ -0,0 +1,41 @@
+import pathlib
+
+from hidori_pipelines.plan import PipelinePlan
+from hidori_pipelines.relays import Relay, build_relay_bundle
+
+PIPELINE_DATA = {
+    "relays": {"bastion": {"target": "10.0.0.1", "user": "relay"}},
+    "destinations": {
+        "vm1": {"target": "127.0.0.1", "user": "root"},
+        "vm2": {"target": "192.168.0.2", "user": "root", "relay": "bastion"},
+    },
+    "tasks": {"Say hello": {"module": "hello"}},
+}
+
+
+def test_relay_bundle_runs_without_controller(tmp_path: pathlib.Path):
+    _, relayed = PipelinePlan.from_data(PIPELINE_DATA).split_relays()
+    build_relay_bundle(tmp_path / "bundle", relayed["bastion"])
+
+    assert sorted(p.name for p in (tmp_path / "bundle").iterdir()) == [
+        "hidori_common",
+        "hidori_core",
+        "hidori_pipelines",
+        "hidori_runner",
+        "plan.json",
+    ]
+    assert not list((tmp_path / "bundle").rglob("__pycache__"))
+    plan = PipelinePlan.from_plan_path(tmp_path / "bundle" / "plan.json")
+    assert plan.destinations.to_dict() == {
+        "vm2": {"driver": "ssh", "target": "192.168.0.2", "user": "root"}
+    }
+
+
+def test_relay_worker_command_runs_from_exchange():
+    plan = PipelinePlan.from_data(PIPELINE_DATA)
+    relay = Relay("bastion", plan.relays["bastion"], plan)
+    command = relay.get_worker_command()
+
+    assert "relay@10.0.0.1" in command
+    assert f"cd /tmp/hidori-exchange-{relay.exchange_id} && " in command
+    assert "python3 -m hidori_pipelines.workers plan.json --shard 0/1" in command
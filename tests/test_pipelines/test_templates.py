@@ -0,0 +1,124 @@
+import pathlib
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from hidori_core.schema import errors as schema_errors
+from hidori_pipelines import PipelineGroup
+from hidori_pipelines.pipeline import compile_steps
+from hidori_pipelines.plan import PipelinePlan
+from hidori_pipelines.templates import StepRenderer, Template
+
+
+def create_pipeline_data(destinations: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "destinations": destinations,
+        "tasks": {
+            "Say hello": {"module": "hello"},
+            "Set hostname": {"module": "hostname", "name": "{{ hostname }}"},
+            "Install package": {
+                "module": "apt",
+                "state": "{{state}}",
+                "package": "vim",
+            },
+        },
+    }
+
+
+def test_template_render_escapes_values():
+    template = Template('{"name": "{{ name }}-{{name}}", "data": "{{ other }}"}')
+    assert template.variables == ("name", "other")
+    assert template.render({"name": 'a"b', "other": 1}) == (
+        '{"name": "a\\"b-a\\"b", "data": "1"}'
+    )
+
+
+def test_step_renderer_shares_steps_of_identical_values():
+    steps = compile_steps(
+        {
+            "Say hello": {"module": "hello"},
+            "Set hostname": {"module": "hostname", "name": "{{hostname}}"},
+        }
+    )
+    renderer = StepRenderer(steps)
+    assert renderer.variables == ("hostname",)
+
+    web1 = renderer.render({"hostname": "web1", "unused": "a"})
+    assert web1[1] is renderer.render({"hostname": "web1", "unused": "b"})[1]
+    web2 = renderer.render({"hostname": "web2"})
+    assert web1[0] is web2[0] is steps[0]
+    assert web1[1].task_json["data"]["name"] == "web1"
+    assert web1[1].task_id != web2[1].task_id
+    assert type(web1[1]) is type(steps[1])
+
+
+def test_step_renderer_without_variables():
+    steps = compile_steps({"Say hello": {"module": "hello"}})
+    assert StepRenderer(steps).render({}) is steps
+
+
+def test_plan_validates_variables_of_destinations():
+    data = create_pipeline_data(
+        {
+            "vm1": {
+                "target": "127.0.0.1",
+                "user": "root",
+                "vars": {"hostname": "vm1", "state": "installed"},
+            },
+            "vm2": {"target": "127.0.0.2", "user": "root", "vars": {"hostname": "vm2"}},
+            "vm3": {
+                "target": "127.0.0.3",
+                "user": "root",
+                "vars": {"hostname": "vm3", "state": "broken"},
+            },
+        }
+    )
+    with pytest.raises(schema_errors.SchemaError) as exc_info:
+        PipelinePlan.from_data(data)
+
+    assert exc_info.value.errors == {
+        "destinations": {
+            "vm2": {"vars": "state not defined"},
+            "vm3": {
+                "tasks": {
+                    "Install package": {
+                        "state": "not one of allowed values: "
+                        "('upgraded', 'installed', 'removed')"
+                    }
+                }
+            },
+        }
+    }
+
+
+def test_group_renders_steps_per_destination(tmp_path: pathlib.Path):
+    data = create_pipeline_data(
+        {
+            f"vm{i}": {
+                "target": f"127.0.0.{i}",
+                "user": "root",
+                "vars": {"hostname": f"vm{i}", "state": "installed", "unused": i},
+            }
+            for i in range(3)
+        }
+    )
+    plan = PipelinePlan.from_data(data)
+    # Variables survive a compiled plan, only those used by tasks are kept.
+    plan.dump(tmp_path / "plan.json")
+    plan = PipelinePlan.from_plan_path(tmp_path / "plan.json")
+    assert plan.destinations[0].config["vars"] == {
+        "hostname": "vm0",
+        "state": "installed",
+    }
+
+    with patch("hidori_pipelines.group.create_driver") as create_driver:
+        pipelines = list(PipelineGroup(plan))
+
+    assert "vars" not in create_driver.call_args.args[0]
+    assert [p.steps[1].task_json["data"]["name"] for p in pipelines] == [
+        "vm0",
+        "vm1",
+        "vm2",
+    ]
+    assert pipelines[0].steps[2] is pipelines[1].steps[2]
@@ -0,0 +1,149 @@
+import pathlib
+import shlex
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from hidori_pipelines.plan import PipelinePlan
+from hidori_pipelines.relays import Relay
+from hidori_pipelines.workers import Coordinator, get_worker_command, run_workers
+
+MESSAGE = '{"type": "success", "task": "Say hello", "message": "hello"}'
+RESULT = (
+    '{"event": "result", "user": "root", "host": "vm1", "phase": "task", '
+    '"task": "Say hello", "counts": {"success": 1}, "started_at": 1.0, '
+    '"duration": 0.5, "status": null}'
+)
+FAILING_WORKER = f"""
+print('{{"event": "messages", "user": "root", "target": "vm1", '
+      '"messages": [{MESSAGE}]}}')
+print('{RESULT}')
+print('{{"event": "aborted"}}', flush=True)
+"""
+ABORTED_WORKER = """
+import sys
+assert sys.stdin.readline() == "abort\\n"
+"""
+
+
+def python_command(code: str) -> str:
+    return shlex.join([sys.executable, "-c", code])
+
+
+def test_get_worker_command():
+    assert shlex.split(get_worker_command(pathlib.Path("plan.json"), 1, 4))[1:] == [
+        "-m",
+        "hidori_pipelines.workers",
+        "plan.json",
+        "--shard",
+        "1/4",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coordinator_relays_output_and_aborts_all_workers(
+    capsys: pytest.CaptureFixture[str],
+):
+    journal_run = MagicMock()
+    coordinator = Coordinator(
+        {
+            "worker 0": python_command(FAILING_WORKER),
+            "worker 1": python_command(ABORTED_WORKER),
+        },
+        journal_run,
+    )
+    await coordinator.run()
+
+    assert coordinator.aborted
+    output = capsys.readouterr().out
+    assert "root@vm1" in output
+    assert "hello" in output
+    journal_run.record.assert_called_once_with(
+        user="root",
+        host="vm1",
+        phase="task",
+        task="Say hello",
+        counts={"success": 1},
+        started_at=1.0,
+        duration=0.5,
+        status=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_coordinator_reports_failed_workers():
+    coordinator = Coordinator(
+        {
+            "worker 0": python_command("pass"),
+            "relay bastion": python_command("raise SystemExit(1)"),
+        }
+    )
+    with pytest.raises(RuntimeError, match="^relay bastion exited with an error$"):
+        await coordinator.run()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_reads_large_events(capsys: pytest.CaptureFixture[str]):
+    # Messages of a step are sent as a single line, which may exceed the
+    # default limit of stream readers.
+    worker = (
+        "import json\n"
+        "message = {'type': 'info', 'task': 'Run', 'message': 'x' * 100_000}\n"
+        "print(json.dumps({'event': 'messages', 'user': 'root', 'target': 'vm1', "
+        "'messages': [message]}))"
+    )
+    await Coordinator({"worker 0": python_command(worker)}).run()
+    assert "x" * 100_000 in capsys.readouterr().out
+
+
+def test_coordinator_collects_abort_summaries():
+    coordinator = Coordinator({})
+    assert coordinator.abort_summary is None
+
+    coordinator.abort()
+    for interrupted, completed in [(["vm1"], ["vm3"]), (["vm2"], [])]:
+        coordinator.handle_event(
+            {"event": "summary", "interrupted": interrupted, "completed": completed}
+        )
+    assert coordinator.abort_summary == (["vm1", "vm2"], ["vm3"])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("on_fail", ["abort-all", "continue"])
+async def test_run_workers_reports_destinations_of_failed_relays(
+    capsys: pytest.CaptureFixture[str], tmp_path: pathlib.Path, on_fail: str
+):
+    plan = PipelinePlan.from_data(
+        {
+            "config": {"on_fail": on_fail},
+            "relays": {"bastion": {"target": "10.0.0.1", "user": "relay"}},
+            "destinations": {
+                "vm1": {"target": "127.0.0.1", "user": "root"},
+                "vm2": {"target": "192.168.0.2", "user": "root", "relay": "bastion"},
+            },
+            "tasks": {"Say hello": {"module": "hello"}},
+        }
+    )
+    started = tmp_path / "started"
+    journal_run = MagicMock()
+    with patch.object(Relay, "push", AsyncMock()), patch(
+        "hidori_pipelines.workers.get_worker_command",
+        return_value=python_command(f"open({str(started)!r}, 'w')"),
+    ):
+        with pytest.raises(RuntimeError, match="^relay bastion could not be pushed$"):
+            await run_workers(plan, 1, journal_run)
+
+    # With abort-all, the failed relay stops the workers before they start.
+    assert started.exists() is (on_fail == "continue")
+    assert "root@vm2" in capsys.readouterr().out
+    journal_run.record.assert_called_once_with(
+        user="root",
+        host="vm2",
+        phase="push",
+        task=None,
+        counts={"error": 1},
+        started_at=journal_run.record.call_args.kwargs["started_at"],
+        duration=0.0,
+        status="error",
+    )
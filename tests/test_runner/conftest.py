@@ -8,11 +8,11 @@ import pytest
 
 from hidori_common.dirs import get_user_cache_path
 from hidori_common.typings import Transport
-from hidori_core.modules import MODULES_REGISTRY
+from hidori_core.modules import get_module
 from hidori_core.modules.base import Module
 from hidori_core.schema.base import Schema
-from hidori_core.utils.messenger import Messenger
-from hidori_pipelines.pipeline import DestinationData, Pipeline
+from hidori_core.utils.messenger import Message, Messenger
+from hidori_pipelines.pipeline import DestinationData, Pipeline, compile_steps
 from hidori_runner.drivers.base import Driver
 from hidori_runner.transports.utils import get_messages
 
@@ -38,7 +38,7 @@ class ExampleTransport(Transport["ExampleDriver"], name="example"):
     def get_destination(self, source: str) -> str:
         return str(pathlib.Path("/example") / pathlib.Path(source).name)
 
-    def push(self, source: str) -> list[dict[str, str]]:
+    def push(self, source: str) -> list[Message]:
         dest = self.get_destination(source)
         os.makedirs(os.path.dirname(dest), exist_ok=True)
         try:
@@ -50,7 +50,7 @@ class ExampleTransport(Transport["ExampleDriver"], name="example"):
 
         return []
 
-    def invoke(self, path: str, args: list[str]) -> list[dict[str, str]]:
+    def invoke(self, path: str, args: list[str]) -> list[Message]:
         try:
             with open(path) as f:
                 out = f.read()
@@ -62,7 +62,7 @@ class ExampleTransport(Transport["ExampleDriver"], name="example"):
         for arg in args:
             out: str = getattr(out, arg)()
         out += f"-{self._driver.value}"
-        return [{"type": "success", "task": "example", "message": out}]
+        return [Message("success", "example", out)]
 
 
 class ExampleDriver(Driver, name="example"):
@@ -103,14 +103,14 @@ def example_messenger():
 
 @pytest.fixture(scope="session")
 def example_module():
-    return MODULES_REGISTRY["example"]
+    return get_module("example")
 
 
 @pytest.fixture(scope="session")
 def example_pipeline(example_driver: ExampleDriver):
     destination_data: DestinationData = {"target": "example", "driver": example_driver}
     tasks_data = {"Hello world": {"module": "hello"}}
-    return Pipeline(destination_data, tasks_data)
+    return Pipeline(destination_data, compile_steps(tasks_data))
 
 
 @pytest.fixture(scope="function")
@@ -0,0 +1,90 @@
+import os
+import pathlib
+import subprocess
+import sys
+import tarfile
+
+import pytest
+
+from hidori_runner.drivers.bundle import (
+    get_bytecode_bundle,
+    get_core_archive,
+    get_core_hash,
+    get_core_path,
+    iter_core_sources,
+)
+
+
+@pytest.fixture(scope="function")
+def cache_home(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    return tmp_path / "hidori"
+
+
+def test_core_sources_skip_bytecode():
+    sources = iter_core_sources()
+    assert get_core_path() / "__init__.py" in sources
+    assert all(path.suffix != ".pyc" for path in sources)
+    assert all("__pycache__" not in path.parts for path in sources)
+
+
+def test_core_hash_is_stable():
+    assert get_core_hash() == get_core_hash()
+    assert len(get_core_hash()) == 64
+
+
+@pytest.mark.parametrize("cache_tag", [None, "cpython-27", "pypy-38"])
+def test_bytecode_bundle_version_mismatch(cache_home: pathlib.Path, cache_tag):
+    assert get_bytecode_bundle(cache_tag) is None
+    assert not (cache_home / "bundles").exists()
+
+
+def test_bytecode_bundle_is_sourceless(cache_home: pathlib.Path):
+    bundle_path = get_bytecode_bundle(sys.implementation.cache_tag)
+    assert bundle_path is not None
+    assert bundle_path.name == "hidori_core"
+    assert bundle_path.parent.parent == cache_home / "bundles"
+    assert (bundle_path / "__init__.pyc").is_file()
+    assert (bundle_path / "modules/hello.pyc").is_file()
+    assert (bundle_path / "py.typed").is_file()
+    assert not list(bundle_path.rglob("*.py"))
+
+
+def test_bytecode_bundle_is_reused(cache_home: pathlib.Path):
+    bundle_path = get_bytecode_bundle(sys.implementation.cache_tag)
+    assert bundle_path is not None
+    marker = bundle_path / "marker"
+    marker.touch()
+    assert get_bytecode_bundle(sys.implementation.cache_tag) == bundle_path
+    assert marker.exists()
+    assert len(list((cache_home / "bundles").iterdir())) == 1
+
+
+def test_bytecode_bundle_is_importable(cache_home: pathlib.Path):
+    bundle_path = get_bytecode_bundle(sys.implementation.cache_tag)
+    assert bundle_path is not None
+    code = "from hidori_core.modules import get_module; print(get_module('hello'))"
+    env = {**os.environ, "PYTHONPATH": str(bundle_path.parent)}
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        cwd=bundle_path.parent,
+        capture_output=True,
+        check=True,
+    )
+    assert b"HelloModule" in result.stdout
+
+
+@pytest.mark.parametrize(
+    "cache_tag,init_name",
+    [(None, "__init__.py"), (sys.implementation.cache_tag, "__init__.pyc")],
+)
+def test_core_archive(cache_home: pathlib.Path, cache_tag, init_name: str):
+    archive_path = get_core_archive(cache_tag)
+    assert archive_path.parent == cache_home / "bundles"
+    with tarfile.open(archive_path) as tar:
+        names = tar.getnames()
+
+    assert f"./hidori_core/{init_name}" in names
+    assert not any("__pycache__" in name for name in names)
+    assert get_core_archive(cache_tag) == archive_path
@@ -1,10 +1,18 @@
-from unittest.mock import Mock
+import pathlib
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from hidori_common.typings import Connection
 from hidori_core.schema import errors as schema_errors
+from hidori_core.utils import Message, MessageList
 from hidori_pipelines.pipeline import Pipeline
-from hidori_runner.drivers.base import DRIVERS_REGISTRY, Driver, create_driver
+from hidori_runner.drivers.base import (
+    DRIVERS_REGISTRY,
+    Driver,
+    PreparedExchange,
+    create_driver,
+)
 from hidori_runner.drivers.utils import create_pipeline_dir, get_pipelines_path
 
 
@@ -57,7 +65,90 @@ def test_driver_prepare_pipeline_success(
 ):
     exchange = example_driver.prepare_pipeline(example_pipeline)
     assert not exchange.has_errors
-    assert exchange.messages == []
+    assert len(exchange.messages) == 0
     expected_localpath = get_pipelines_path() / "example-target/hidori-42"
     assert exchange.localpath == expected_localpath
     assert exchange.transport.name == "example"
+    for step in example_pipeline.steps:
+        task_path = expected_localpath / f"task-{step.task_id}.json"
+        assert task_path.read_bytes() == step.task_bytes
+
+
+def test_driver_share_exchange_keeps_localpath(example_driver: Driver):
+    exchange = PreparedExchange(
+        id="42", localpath=pathlib.Path("/exchanges/42"), transport=Mock()
+    )
+    first = example_driver.share_exchange(exchange)
+    second = example_driver.share_exchange(exchange)
+    assert first.localpath == second.localpath == exchange.localpath
+    assert len({exchange.id, first.id, second.id}) == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "pushed,messages,status",
+    [
+        (True, [Message("success", "t", "ok")], "running"),
+        (True, [Message("error", "t", "failed")], "failed"),
+        (False, [Message("error", "t", "unreachable")], "failed"),
+    ],
+)
+async def test_driver_finalize_invokes_first_task(
+    example_driver: Driver, pushed: bool, messages: list, status: str
+):
+    exchange = Mock(id="42", localpath="/foo", messages=MessageList())
+    exchange.transport.push_and_invoke = AsyncMock(return_value=(pushed, messages))
+    exchange.has_errors = messages[0].type == "error"
+    await example_driver.finalize(exchange, "TASK-ID")
+
+    exchange.transport.push_and_invoke.assert_awaited_once_with(
+        "42", "/foo", "executor.py", "TASK-ID"
+    )
+    exchange.transport.push.assert_not_called()
+    assert exchange.pushed is pushed
+    assert exchange.status == status
+    assert list(exchange.messages) == messages
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("found", [True, False])
+async def test_driver_invoke_executor_pushes_missing_exchange(
+    example_driver: Driver, found: bool
+):
+    messages = [Message("success", "t", "ok")]
+    exchange = PreparedExchange(
+        id="42", localpath=pathlib.Path("/foo"), transport=Mock(), pushed=True
+    )
+    exchange.transport.invoke = AsyncMock(return_value=(found, messages))
+    exchange.transport.push_and_invoke = AsyncMock(return_value=(True, messages))
+    await example_driver.invoke_executor(exchange, "TASK-ID")
+
+    exchange.transport.invoke.assert_awaited_once_with("42", "executor.py", "TASK-ID")
+    assert exchange.transport.push_and_invoke.await_count == (0 if found else 1)
+    assert exchange.pushed
+    assert exchange.status == "running"
+    assert list(exchange.messages) == messages
+
+
+@pytest.mark.asyncio
+async def test_driver_connect_and_disconnect_once(example_driver_cls: type[Driver]):
+    driver = example_driver_cls(config={"value": "42"})
+    transport_cls = driver.transport_cls
+    with patch.object(
+        transport_cls,
+        "connect",
+        AsyncMock(return_value=Connection(0.5, "cpython-38")),
+        create=True,
+    ) as connect, patch.object(
+        transport_cls, "disconnect", AsyncMock(), create=True
+    ) as disconnect:
+        await driver.disconnect()
+        await driver.connect()
+        await driver.connect()
+        await driver.disconnect()
+        await driver.disconnect()
+
+    assert driver.handshake_time == 0.5
+    assert driver.python_cache_tag == "cpython-38"
+    assert connect.call_count == 1
+    assert disconnect.call_count == 1
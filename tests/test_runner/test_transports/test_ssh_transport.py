@@ -1,10 +1,16 @@
+import asyncio
 import json
 import pathlib
+import threading
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
-from hidori_runner.transports.ssh import SSHTransport
+from hidori_runner.transports.ssh import (
+    CONTROL_MASTERS,
+    SSHTransport,
+    run_command_status,
+)
 
 SUCCESS_EXEC_MSG = json.dumps(
     {"type": "success", "task": "Test task", "message": "test task succeeded"}
@@ -30,9 +36,22 @@ def subproc_coro_patch(retcode: int, stdout: bytes = b"", stderr: bytes = b""):
     )
 
 
+@pytest.fixture(autouse=True)
+def control_path():
+    with patch.object(CONTROL_MASTERS, "_path", pathlib.Path("/tmp/hidori-ssh")):
+        yield
+
+
 @pytest.fixture(scope="module")
 def ssh_transport():
-    driver = Mock(ssh_user="user", ssh_target="127.0.0.1", ssh_port="50022")
+    driver = Mock(
+        keep_alive=None,
+        ssh_user="user",
+        ssh_target="127.0.0.1",
+        ssh_port="50022",
+        ssh_compression="auto",
+        handshake_time=None,
+    )
     return SSHTransport(driver)
 
 
@@ -44,11 +63,15 @@ async def test_transport_push_ok(ssh_transport: SSHTransport):
     assert messages == []
     assert proc.call_count == 1
     assert proc.call_args.args == (
-        "scp -o ControlMaster=auto -o ControlPath=~/.ssh/control-%r@%h:%p "
-        "-o ControlPersist=yes -prq -P 50022 /foo/bar "
+        "scp -o ControlMaster=auto -o ControlPath=/tmp/hidori-ssh/%C "
+        "-o ControlPersist=60 -prq -P 50022 /foo/bar "
         "user@127.0.0.1:/tmp/hidori-exchange-42",
     )
-    assert proc.call_args.kwargs == {"stdout": -1, "stderr": -1}
+    assert proc.call_args.kwargs == {
+        "stdout": -1,
+        "stderr": -1,
+        "start_new_session": True,
+    }
 
 
 @pytest.mark.asyncio
@@ -56,7 +79,7 @@ async def test_transport_push_con_error(ssh_transport: SSHTransport):
     with subproc_coro_patch(retcode=255, stderr=b"scp: Connection closed") as proc:
         messages = await ssh_transport.push("42", pathlib.Path("/foo/bar"))
 
-    assert messages == [
+    assert [m.to_dict() for m in messages] == [
         {
             "type": "error",
             "task": "INTERNAL-SSH-TRANSPORT",
@@ -71,7 +94,7 @@ async def test_transport_push_generic_error(ssh_transport: SSHTransport):
     with subproc_coro_patch(retcode=1, stderr=b"scp: Some generic error") as proc:
         messages = await ssh_transport.push("42", pathlib.Path("/foo/bar"))
 
-    assert messages == [
+    assert [m.to_dict() for m in messages] == [
         {
             "type": "error",
             "task": "INTERNAL-SSH-TRANSPORT",
@@ -84,25 +107,31 @@ async def test_transport_push_generic_error(ssh_transport: SSHTransport):
 @pytest.mark.asyncio
 async def test_transport_invoke_executor_ok(ssh_transport: SSHTransport):
     with subproc_coro_patch(retcode=0, stdout=SUCCESS_EXEC_MSG) as proc:
-        messages = await ssh_transport.invoke("42", "executor.py", "TASK-ID")
+        found, messages = await ssh_transport.invoke("42", "executor.py", "TASK-ID")
 
-    assert messages == [json.loads(SUCCESS_EXEC_MSG)]
+    assert found
+    assert [m.to_dict() for m in messages] == [json.loads(SUCCESS_EXEC_MSG)]
     assert proc.call_count == 1
     assert proc.call_args.args == (
-        "ssh -o ControlMaster=auto -o ControlPath=~/.ssh/control-%r@%h:%p "
-        "-o ControlPersist=yes -qT -p 50022 user@127.0.0.1 "
-        "python3 /tmp/hidori-exchange-42/executor.py TASK-ID",
+        "ssh -o ControlMaster=auto -o ControlPath=/tmp/hidori-ssh/%C "
+        "-o ControlPersist=60 -qT -p 50022 user@127.0.0.1 "
+        '"test -f /tmp/hidori-exchange-42/executor.py || exit 98; '
+        'python3 /tmp/hidori-exchange-42/executor.py TASK-ID"',
     )
-    assert proc.call_args.kwargs == {"stdout": -1, "stderr": -1}
+    assert proc.call_args.kwargs == {
+        "stdout": -1,
+        "stderr": -1,
+        "start_new_session": True,
+    }
 
 
 @pytest.mark.asyncio
 async def test_transport_invoke_no_executor_error(ssh_transport: SSHTransport):
     expected_stdout = b"python3: can't open file '/foo'"
     with subproc_coro_patch(retcode=2, stdout=expected_stdout) as proc:
-        messages = await ssh_transport.invoke("42", "/foo", "")
+        found, messages = await ssh_transport.invoke("42", "/foo", "")
 
-    assert messages == [
+    assert [m.to_dict() for m in messages] == [
         {
             "type": "error",
             "task": "INTERNAL-SSH-TRANSPORT",
@@ -112,12 +141,36 @@ async def test_transport_invoke_no_executor_error(ssh_transport: SSHTransport):
     assert proc.call_count == 1
 
 
+@pytest.mark.asyncio
+async def test_transport_invoke_exchange_missing(ssh_transport: SSHTransport):
+    with subproc_coro_patch(retcode=98):
+        found, messages = await ssh_transport.invoke("42", "executor.py", "TASK-ID")
+
+    assert not found
+    assert messages == []
+
+
+@pytest.mark.asyncio
+async def test_transport_connect_keep_alive():
+    driver = Mock(
+        keep_alive=300.5,
+        ssh_user="user",
+        ssh_target="127.0.0.1",
+        ssh_port="50022",
+        ssh_compression="none",
+    )
+    with subproc_coro_patch(retcode=0) as proc:
+        await SSHTransport(driver).connect()
+
+    assert "-o ControlPersist=361 " in proc.call_args.args[0]
+
+
 @pytest.mark.asyncio
 async def test_transport_invoke_executor_failed_exec_error(ssh_transport: SSHTransport):
     with subproc_coro_patch(retcode=0, stdout=FAILED_EXEC_MSG) as proc:
-        messages = await ssh_transport.invoke("42", "executor.py", "TASK-ID")
+        found, messages = await ssh_transport.invoke("42", "executor.py", "TASK-ID")
 
-    assert messages == [json.loads(FAILED_EXEC_MSG)]
+    assert [m.to_dict() for m in messages] == [json.loads(FAILED_EXEC_MSG)]
     assert proc.call_count == 1
 
 
@@ -126,7 +179,253 @@ async def test_transport_invoke_executor_exec_failed_system_error(
     ssh_transport: SSHTransport,
 ):
     with subproc_coro_patch(retcode=1, stdout=FAILED_SYSTEM_MSG) as proc:
-        messages = await ssh_transport.invoke("42", "executor.py", "TASK-ID")
+        found, messages = await ssh_transport.invoke("42", "executor.py", "TASK-ID")
+
+    assert [m.to_dict() for m in messages] == [json.loads(FAILED_SYSTEM_MSG)]
+    assert proc.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_transport_push_and_invoke_ok(ssh_transport: SSHTransport):
+    with subproc_coro_patch(retcode=0, stdout=SUCCESS_EXEC_MSG) as proc:
+        pushed, messages = await ssh_transport.push_and_invoke(
+            "42", pathlib.Path("/foo/bar"), "executor.py", "TASK-ID"
+        )
 
-    assert messages == [json.loads(FAILED_SYSTEM_MSG)]
+    assert pushed
+    assert [m.to_dict() for m in messages] == [json.loads(SUCCESS_EXEC_MSG)]
     assert proc.call_count == 1
+    assert proc.call_args.args == (
+        "tar -C /foo/bar -cf - . | "
+        "ssh -o ControlMaster=auto -o ControlPath=/tmp/hidori-ssh/%C "
+        "-o ControlPersist=60 -qT -p 50022 user@127.0.0.1 "
+        '"mkdir -p /tmp/hidori-exchange-42 && '
+        "tar -xf - -C /tmp/hidori-exchange-42 || exit 97; "
+        'python3 /tmp/hidori-exchange-42/executor.py TASK-ID"',
+    )
+    assert proc.call_args.kwargs == {
+        "stdout": -1,
+        "stderr": -1,
+        "start_new_session": True,
+    }
+
+
+@pytest.mark.asyncio
+async def test_transport_push_and_invoke_exec_failed_error(
+    ssh_transport: SSHTransport,
+):
+    with subproc_coro_patch(retcode=1, stdout=FAILED_EXEC_MSG):
+        pushed, messages = await ssh_transport.push_and_invoke(
+            "42", pathlib.Path("/foo/bar"), "executor.py", "TASK-ID"
+        )
+
+    assert pushed
+    assert [m.to_dict() for m in messages] == [json.loads(FAILED_EXEC_MSG)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "retcode,stderr",
+    [(97, b"tar: Cannot open: Permission denied"), (255, b"Connection refused")],
+)
+async def test_transport_push_and_invoke_push_error(
+    ssh_transport: SSHTransport, retcode: int, stderr: bytes
+):
+    with subproc_coro_patch(retcode=retcode, stderr=stderr):
+        pushed, messages = await ssh_transport.push_and_invoke(
+            "42", pathlib.Path("/foo/bar"), "executor.py", "TASK-ID"
+        )
+
+    assert not pushed
+    assert [m.to_dict() for m in messages] == [
+        {
+            "type": "error",
+            "task": "INTERNAL-SSH-TRANSPORT",
+            "message": stderr.decode(),
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_transport_connect_ok(ssh_transport: SSHTransport):
+    with subproc_coro_patch(retcode=0, stdout=b"cpython-38") as proc:
+        connection = await ssh_transport.connect()
+
+    assert connection is not None
+    assert connection.python_cache_tag == "cpython-38"
+    assert proc.call_count == 1
+    assert proc.call_args.args == (
+        "ssh -o ControlMaster=auto -o ControlPath=/tmp/hidori-ssh/%C "
+        "-o ControlPersist=60 -qT -p 50022 user@127.0.0.1 "
+        "\"python3 -c 'import sys; print(sys.implementation.cache_tag)' "
+        '2>/dev/null || true"',
+    )
+
+    with subproc_coro_patch(retcode=0) as proc:
+        await ssh_transport.disconnect()
+
+    assert proc.call_args.args == (
+        "ssh -o ControlMaster=auto -o ControlPath=/tmp/hidori-ssh/%C "
+        "-o ControlPersist=60 -q -O exit -p 50022 user@127.0.0.1",
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stdout", [b"", b"junk output"])
+async def test_transport_connect_without_cache_tag(
+    ssh_transport: SSHTransport, stdout: bytes
+):
+    with subproc_coro_patch(retcode=0, stdout=stdout):
+        connection = await ssh_transport.connect()
+
+    assert connection is not None
+    assert connection.python_cache_tag is None
+    with subproc_coro_patch(retcode=0):
+        await ssh_transport.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_transport_connect_error(ssh_transport: SSHTransport):
+    with subproc_coro_patch(retcode=255, stderr=b"Connection refused"):
+        assert await ssh_transport.connect() is None
+
+    with subproc_coro_patch(retcode=255):
+        await ssh_transport.disconnect()
+
+
+def test_control_masters_remove_directory_on_last_release():
+    control_masters = type(CONTROL_MASTERS)()
+    path = control_masters.path
+    assert path.is_dir()
+    control_masters.acquire()
+    control_masters.acquire()
+    control_masters.release()
+    assert path.is_dir()
+    control_masters.release()
+    assert not path.exists()
+
+
+@pytest.mark.asyncio
+async def test_transport_push_and_invoke_ssh_compression():
+    driver = Mock(
+        keep_alive=None,
+        ssh_user="user",
+        ssh_target="127.0.0.1",
+        ssh_port="50022",
+        ssh_compression="ssh",
+    )
+    with subproc_coro_patch(retcode=0) as proc:
+        await SSHTransport(driver).push_and_invoke(
+            "42", pathlib.Path("/foo/bar"), "executor.py", "TASK-ID"
+        )
+
+    assert proc.call_args.args == (
+        "tar -C /foo/bar -cf - . | "
+        "ssh -o ControlMaster=auto -o ControlPath=/tmp/hidori-ssh/%C "
+        "-o ControlPersist=60 -C -qT -p 50022 user@127.0.0.1 "
+        '"mkdir -p /tmp/hidori-exchange-42 && '
+        "tar -xf - -C /tmp/hidori-exchange-42 || exit 97; "
+        'python3 /tmp/hidori-exchange-42/executor.py TASK-ID"',
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("compression,handshake_time", [("gzip", None), ("auto", 0.3)])
+async def test_transport_push_and_invoke_gzip_compression(
+    compression: str, handshake_time: float | None
+):
+    driver = Mock(
+        keep_alive=None,
+        ssh_user="user",
+        ssh_target="127.0.0.1",
+        ssh_port="50022",
+        ssh_compression=compression,
+        handshake_time=handshake_time,
+        python_cache_tag="cpython-38",
+    )
+    threads = []
+
+    def get_core_archive(cache_tag: str) -> pathlib.Path:
+        threads.append(threading.current_thread())
+        return pathlib.Path("/cache/core.tar.gz")
+
+    with subproc_coro_patch(retcode=0) as proc, patch(
+        "hidori_runner.drivers.bundle.get_core_archive",
+        side_effect=get_core_archive,
+    ) as get_core_archive_mock:
+        await SSHTransport(driver).push_and_invoke(
+            "42", pathlib.Path("/foo/bar"), "executor.py", "TASK-ID"
+        )
+
+    # Archive is built off the event loop.
+    get_core_archive_mock.assert_called_once_with("cpython-38")
+    assert threads[0] is not threading.current_thread()
+    assert proc.call_args.args == (
+        "{ cat /cache/core.tar.gz; "
+        "tar -C /foo/bar --exclude=./hidori_core -czf - .; } | "
+        "ssh -o ControlMaster=auto -o ControlPath=/tmp/hidori-ssh/%C "
+        "-o ControlPersist=60 -qT -p 50022 user@127.0.0.1 "
+        '"mkdir -p /tmp/hidori-exchange-42 && '
+        "tar -xzif - -C /tmp/hidori-exchange-42 || exit 97; "
+        'python3 /tmp/hidori-exchange-42/executor.py TASK-ID"',
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_command_cancel_terminates_whole_command(tmp_path: pathlib.Path):
+    marker = tmp_path / "marker"
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(
+            run_command_status(f"sleep 0.5 | cat; touch {marker}"), timeout=0.1
+        )
+
+    await asyncio.sleep(1)
+    assert not marker.exists()
+
+
+@pytest.mark.asyncio
+async def test_transport_get_file_signature(ssh_transport: SSHTransport):
+    signature = {"digest": "abc", "block_size": 2048, "weak": [], "strong": []}
+    with subproc_coro_patch(retcode=0, stdout=json.dumps(signature).encode()) as proc:
+        result = await ssh_transport.get_file_signature("42", "/etc/app conf", "abc")
+
+    assert result == (signature, [])
+    assert proc.call_args.args == (
+        "ssh -o ControlMaster=auto -o ControlPath=/tmp/hidori-ssh/%C "
+        "-o ControlPersist=60 -qT -p 50022 user@127.0.0.1 "
+        "'cd /tmp/hidori-exchange-42 && python3 -m hidori_core.utils.delta "
+        "prepare '\"'\"'/etc/app conf'\"'\"' abc'",
+    )
+
+
+@pytest.mark.asyncio
+async def test_transport_get_file_signature_error(ssh_transport: SSHTransport):
+    with subproc_coro_patch(retcode=1, stderr=b"Permission denied"):
+        signature, messages = await ssh_transport.get_file_signature(
+            "42", "/etc/a", "abc"
+        )
+
+    assert signature is None
+    assert [m.message for m in messages] == ["Permission denied"]
+
+
+@pytest.mark.asyncio
+async def test_transport_push_file(ssh_transport: SSHTransport):
+    with subproc_coro_patch(retcode=0) as proc:
+        messages = await ssh_transport.push_file(
+            "42", pathlib.Path("/local/files/x.delta"), "files/x.delta"
+        )
+
+    assert messages == []
+    assert proc.call_args.args == (
+        "ssh -o ControlMaster=auto -o ControlPath=/tmp/hidori-ssh/%C "
+        "-o ControlPersist=60 -qT -p 50022 user@127.0.0.1 "
+        "'cd /tmp/hidori-exchange-42 && mkdir -p files && cat > files/x.delta' "
+        "< /local/files/x.delta",
+    )
+
+    with subproc_coro_patch(retcode=255):
+        messages = await ssh_transport.push_file(
+            "42", pathlib.Path("/local/files/x.delta"), "files/x.delta"
+        )
+    assert [m.message for m in messages] == ["unable to push files/x.delta"]
@@ -10,7 +10,7 @@ from hidori_common.typings import Transport
 @pytest.mark.usefixtures("fs")
 def test_transport_push_file_does_not_exist_error(example_transport: Transport[Any]):
     messages = example_transport.push("/foo/hidori")
-    assert messages == [
+    assert [m.to_dict() for m in messages] == [
         {
             "type": "error",
             "task": "INTERNAL-EXAMPLE-TRANSPORT",
@@ -26,7 +26,7 @@ def test_transport_pushed_file_no_read_error(
     os.chmod("/foo/hidori", 0o000)
 
     messages = example_transport.push("/foo/hidori")
-    assert messages == [
+    assert [m.to_dict() for m in messages] == [
         {
             "type": "error",
             "task": "INTERNAL-EXAMPLE-TRANSPORT",
@@ -49,7 +49,7 @@ def test_transport_pushed_file_read_ok(
 @pytest.mark.usefixtures("fs")
 def test_transport_invoke_file_does_not_exist_error(example_transport: Transport[Any]):
     messages = example_transport.invoke("/example/hidori", [])
-    assert messages == [
+    assert [m.to_dict() for m in messages] == [
         {
             "type": "error",
             "task": "INTERNAL-EXAMPLE-TRANSPORT",
@@ -65,7 +65,7 @@ def test_transport_invoke_no_file_permission_error(
     os.chmod("/example/hidori", 0o000)
 
     messages = example_transport.invoke("/example/hidori", [])
-    assert messages == [
+    assert [m.to_dict() for m in messages] == [
         {
             "type": "error",
             "task": "INTERNAL-EXAMPLE-TRANSPORT",
@@ -79,4 +79,6 @@ def test_transport_invoke_success_ok(
 ):
     fs.create_file("/example/hidori", contents="data")
     messages = example_transport.invoke("/example/hidori", ["upper"])
-    assert messages == [{"type": "success", "task": "example", "message": "DATA-42"}]
+    assert [m.to_dict() for m in messages] == [
+        {"type": "success", "task": "example", "message": "DATA-42"}
+    ]